@@ -1,89 +1,140 @@
 from __future__ import annotations
 
+import json
 import sqlite3
 
+from pathlib import Path
+
 from doj_disclosures.core.config import AppConfig
 
+# Inspect reads several large aggregates on one connection; keep them warm in the page cache.
+# The connection is read-only, so nothing here may change the journal mode or the file.
+_PRAGMAS_SQL = """
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+"""
+
+_SQL_DONE_BY_CONTENT_TYPE = (
+    "SELECT COUNT(*), COALESCE(content_type,'') "
+    "FROM urls WHERE status='done' "
+    "GROUP BY COALESCE(content_type,'') "
+    "ORDER BY COUNT(*) DESC LIMIT 10"
+)
+_SQL_RECENT_DONE = (
+    "SELECT url,status,COALESCE(http_status,0),COALESCE(content_type,''),"
+    "SUBSTR(COALESCE(error,''),1,80),COALESCE(sha256,''),COALESCE(local_path,'') "
+    "FROM urls WHERE status='done' ORDER BY discovered_at DESC LIMIT 10"
+)
+_SQL_RECENT_DOCUMENTS = "SELECT id,url,sha256,local_path FROM documents ORDER BY id DESC LIMIT 10"
+_SQL_DOCUMENTS_COUNT = "SELECT COUNT(*) FROM documents"
+_SQL_MATCHES_COUNT = "SELECT COUNT(*) FROM matches"
+_SQL_PDF_BY_STATUS = "SELECT status, COUNT(*) FROM urls WHERE is_pdf=1 GROUP BY status ORDER BY COUNT(*) DESC"
+_SQL_PDF_DONE_DETAIL = (
+    "SELECT "
+    "COUNT(*) AS done_cnt, "
+    "COUNT(*) FILTER (WHERE local_path IS NULL OR local_path='') AS done_no_path, "
+    "COUNT(*) FILTER (WHERE sha256 IS NULL OR sha256='') AS done_no_sha, "
+    "COUNT(*) FILTER (WHERE COALESCE(content_type,'')='') AS done_no_ct, "
+    "COUNT(*) FILTER (WHERE COALESCE(http_status,0)=0) AS done_no_http "
+    "FROM urls WHERE is_pdf=1 AND status='done'"
+)
+_SQL_RECENT_DONE_PDF = (
+    "SELECT url,status,COALESCE(http_status,0),COALESCE(content_type,''),"
+    "SUBSTR(COALESCE(error,''),1,120),COALESCE(sha256,''),COALESCE(local_path,'') "
+    "FROM urls WHERE is_pdf=1 AND status='done' "
+    "ORDER BY discovered_at DESC LIMIT 15"
+)
+_SQL_PDF_URL_COUNT = "SELECT COUNT(*) FROM urls WHERE is_pdf=1"
+
+
+# (tag, query, column names). Scalar sections have a single column and are unwrapped.
+_SECTIONS: tuple[tuple[str, str, tuple[str, ...]], ...] = (
+    ("done_by_content_type", _SQL_DONE_BY_CONTENT_TYPE, ("count", "content_type")),
+    ("recent_done", _SQL_RECENT_DONE, ("url", "status", "http_status", "content_type", "error", "sha256", "local_path")),
+    ("documents", _SQL_RECENT_DOCUMENTS, ("id", "url", "sha256", "local_path")),
+    ("documents_count", _SQL_DOCUMENTS_COUNT, ("count",)),
+    ("matches_count", _SQL_MATCHES_COUNT, ("count",)),
+    ("pdf_by_status", _SQL_PDF_BY_STATUS, ("status", "count")),
+    (
+        "pdf_done_detail",
+        _SQL_PDF_DONE_DETAIL,
+        ("done", "done_no_local_path", "done_no_sha256", "done_no_content_type", "done_no_http_status"),
+    ),
+    ("recent_done_pdf", _SQL_RECENT_DONE_PDF, ("url", "status", "http_status", "content_type", "error", "sha256", "local_path")),
+    ("pdf_url_count", _SQL_PDF_URL_COUNT, ("count",)),
+)
+_WIDTH = max(len(cols) for _tag, _sql, cols in _SECTIONS)
+
+
+def _union_sql(indices: list[int]) -> str:
+    # One statement for every section: each row is tagged and NULL-padded to a common width.
+    parts = []
+    for idx in indices:
+        _tag, sql, cols = _SECTIONS[idx]
+        pad = ", NULL" * (_WIDTH - len(cols))
+        parts.append(f"SELECT {idx} AS section, *{pad} FROM ({sql})")
+    return " UNION ALL ".join(parts)
+
+
+def _unavailable_sections(conn: sqlite3.Connection) -> dict[str, str]:
+    """Sections whose query does not compile against this schema (e.g. an unmigrated DB), with the reason."""
+
+    missing: dict[str, str] = {}
+    for tag, sql, _cols in _SECTIONS:
+        try:
+            # EXPLAIN compiles the query without running it.
+            conn.execute(f"EXPLAIN {sql}").fetchall()
+        except sqlite3.OperationalError as e:
+            missing[tag] = str(e)
+    return missing
+
+
+def inspect(conn: sqlite3.Connection) -> dict[str, object]:
+    """Run every inspect query in a single round-trip and group rows by section.
+
+    Sections the schema cannot answer are listed under "unavailable" instead of failing the report.
+    """
+
+    missing = _unavailable_sections(conn)
+    indices = [idx for idx, (tag, _sql, _cols) in enumerate(_SECTIONS) if tag not in missing]
+    grouped: list[list[dict[str, object]]] = [[] for _ in _SECTIONS]
+    if indices:
+        for row in conn.execute(_union_sql(indices)):
+            _tag, _sql, cols = _SECTIONS[row[0]]
+            grouped[row[0]].append(dict(zip(cols, row[1:])))
+
+    result: dict[str, object] = {}
+    for (tag, _sql, cols), rows in zip(_SECTIONS, grouped):
+        if tag in missing:
+            continue
+        if len(cols) == 1:
+            result[tag] = rows[0][cols[0]] if rows else None
+        elif tag == "pdf_done_detail":
+            result[tag] = rows[0] if rows else None
+        else:
+            result[tag] = rows
+    if missing:
+        result["unavailable"] = missing
+    return result
+
 
 def main() -> None:
     cfg = AppConfig.load()
-    print("db:", cfg.paths.db_path)
-
-    conn = sqlite3.connect(cfg.paths.db_path)
+    db_path = Path(cfg.paths.db_path).resolve()
+    # Read-only: inspecting must never create, migrate or otherwise touch the state DB.
     try:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT COUNT(*), COALESCE(content_type,'') "
-            "FROM urls WHERE status='done' "
-            "GROUP BY COALESCE(content_type,'') "
-            "ORDER BY COUNT(*) DESC"
-        )
-        rows = cur.fetchall()
-        print("done by content_type (top 10):")
-        for r in rows[:10]:
-            print(" ", r)
-
-        cur.execute(
-            "SELECT url,status,COALESCE(http_status,0),COALESCE(content_type,''),"
-            "SUBSTR(COALESCE(error,''),1,80),COALESCE(sha256,''),COALESCE(local_path,'') "
-            "FROM urls WHERE status='done' ORDER BY discovered_at DESC LIMIT 10"
-        )
-        print("recent done:")
-        for r in cur.fetchall():
-            print(" ", r)
-
-        cur.execute("SELECT id,url,sha256,local_path FROM documents ORDER BY id DESC LIMIT 10")
-        print("documents:")
-        for r in cur.fetchall():
-            print(" ", r)
-
-        cur.execute("SELECT COUNT(*) FROM documents")
-        print("documents_count:", cur.fetchone()[0])
-        cur.execute("SELECT COUNT(*) FROM matches")
-        print("matches_count:", cur.fetchone()[0])
-
-        cur.execute("SELECT status, COUNT(*) FROM urls WHERE url LIKE '%.pdf' GROUP BY status ORDER BY COUNT(*) DESC")
-        print("pdf urls by status:")
-        for r in cur.fetchall():
-            print(" ", r)
-
-        cur.execute(
-            "SELECT "
-            "SUM(CASE WHEN status='done' THEN 1 ELSE 0 END) AS done_cnt, "
-            "SUM(CASE WHEN status='done' AND (local_path IS NULL OR local_path='') THEN 1 ELSE 0 END) AS done_no_path, "
-            "SUM(CASE WHEN status='done' AND (sha256 IS NULL OR sha256='') THEN 1 ELSE 0 END) AS done_no_sha, "
-            "SUM(CASE WHEN status='done' AND COALESCE(content_type,'')='' THEN 1 ELSE 0 END) AS done_no_ct, "
-            "SUM(CASE WHEN status='done' AND COALESCE(http_status,0)=0 THEN 1 ELSE 0 END) AS done_no_http "
-            "FROM urls WHERE url LIKE '%.pdf'"
-        )
-        done_cnt, done_no_path, done_no_sha, done_no_ct, done_no_http = cur.fetchone()
-        print(
-            "pdf done detail:",
-            {
-                "done": done_cnt,
-                "done_no_local_path": done_no_path,
-                "done_no_sha256": done_no_sha,
-                "done_no_content_type": done_no_ct,
-                "done_no_http_status": done_no_http,
-            },
-        )
-
-        cur.execute(
-            "SELECT url,status,COALESCE(http_status,0),COALESCE(content_type,''),"
-            "SUBSTR(COALESCE(error,''),1,120),COALESCE(sha256,''),COALESCE(local_path,'') "
-            "FROM urls WHERE url LIKE '%.pdf' AND status='done' "
-            "ORDER BY discovered_at DESC LIMIT 15"
-        )
-        print("recent done pdf rows:")
-        for r in cur.fetchall():
-            print(" ", r)
-
-        cur.execute("SELECT COUNT(*) FROM urls WHERE url LIKE '%.pdf'")
-        print("pdf_url_count:", cur.fetchone()[0])
-
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    except sqlite3.OperationalError as e:
+        print(json.dumps({"db": str(db_path), "error": str(e)}, indent=2))
+        return
+    try:
+        conn.executescript(_PRAGMAS_SQL)
+        result = {"db": str(db_path), **inspect(conn)}
     finally:
         conn.close()
 
+    print(json.dumps(result, indent=2, default=str))
+
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from PySide6.QtWidgets import QApplication
-
 from doj_disclosures.core.config import AppConfig
 from doj_disclosures.core.db import Database
 from doj_disclosures.core.logging_config import configure_logging
-from doj_disclosures.gui.main_window import MainWindow
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    # Hardlink when the app data dir is on the same volume as PySide6; otherwise copy.
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 
 def _ensure_qt_plugins_without_accessibility(*, config: AppConfig) -> Path:
@@ -44,14 +51,18 @@ def _ensure_qt_plugins_without_accessibility(*, config: AppConfig) -> Path:
         "tls",
     ]
 
-    for name in include_dirs:
+    def _copy_one(name: str) -> None:
         src = src_root / name
         if not src.exists():
-            continue
+            return
         dst = dest_root / name
         if dst.exists():
             shutil.rmtree(dst, ignore_errors=True)
-        shutil.copytree(src, dst)
+        shutil.copytree(src, dst, copy_function=_link_or_copy)
+
+    # The folders are independent and mostly many small files; copy them concurrently.
+    with ThreadPoolExecutor(max_workers=len(include_dirs)) as ex:
+        list(ex.map(_copy_one, include_dirs))
 
     marker.write_text("ok", encoding="utf-8")
     return dest_root
@@ -78,6 +89,12 @@ def _configure_qt_library_paths(*, config: AppConfig) -> None:
 
 
 def main() -> int:
+    # Qt and the GUI package are imported here so importing this module (or the
+    # headless entrypoints that share `doj_disclosures`) doesn't pay for them.
+    from PySide6.QtWidgets import QApplication
+
+    from doj_disclosures.gui.main_window import MainWindow
+
     config = AppConfig.load()
     configure_logging(config)
 
@@ -87,12 +104,15 @@ def main() -> int:
     app.setApplicationName("DOJ Disclosures Crawler")
     app.setOrganizationName("Local")
 
-    db = Database(config.paths.db_path)
+    db = Database(config.paths.db_path, synchronous=getattr(config.crawl, "db_synchronous", "NORMAL"))
     db.initialize_sync()
 
     window = MainWindow(config=config, db=db)
     window.show()
-    return app.exec()
+    try:
+        return app.exec()
+    finally:
+        asyncio.run(db.aclose())
 
 
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ from pathlib import Path
 import aiohttp
 
 from doj_disclosures.core.ai_flagger import load_training_rows_from_flagged_dir, save_ai_flagger_model, train_flagger_from_rows
+from doj_disclosures.core.browser_fetch import close_browser_pool
 from doj_disclosures.core.config import AppConfig, CrawlSettings
 from doj_disclosures.core.crawler import Crawler, looks_downloadable
 from doj_disclosures.core.db import Database
@@ -23,6 +24,7 @@ from doj_disclosures.core.storage_gating import plan_storage
 from doj_disclosures.core.feedback import PHRASE_BLACKLIST_KEY, URL_PENALTIES_KEY
 from doj_disclosures.core.release_monitor import store_snapshot_and_diff
 from doj_disclosures.core.triage_index import write_semantic_sorted_index
+from doj_disclosures.core.utils import epoch_us
 
 
 logger = logging.getLogger(__name__)
@@ -35,7 +37,7 @@ async def train_flagger_cli(*, config: AppConfig, flagged_dir: Path, model_name:
     """
 
     config.paths.output_dir.mkdir(parents=True, exist_ok=True)
-    db = Database(config.paths.db_path)
+    db = Database(config.paths.db_path, synchronous=getattr(config.crawl, "db_synchronous", "NORMAL"))
     db.initialize_sync()
 
     s = config.crawl
@@ -56,6 +58,7 @@ async def train_flagger_cli(*, config: AppConfig, flagged_dir: Path, model_name:
         ocr_preprocess=bool(getattr(s, "ocr_preprocess", True)),
         ocr_median_filter=bool(getattr(s, "ocr_median_filter", True)),
         ocr_threshold=getattr(s, "ocr_threshold", None),
+        ocr_workers=int(getattr(s, "ocr_workers", 0)),
     )
 
     res = train_flagger_from_rows(
@@ -101,158 +104,171 @@ def _load_keywords_sync(path: Path) -> list[str]:
 
 async def run_headless(*, config: AppConfig, seed_urls: list[str]) -> int:
     config.paths.output_dir.mkdir(parents=True, exist_ok=True)
-    db = Database(config.paths.db_path)
+    db = Database(config.paths.db_path, synchronous=getattr(config.crawl, "db_synchronous", "NORMAL"))
     db.initialize_sync()
 
-    s = config.crawl
-
-    timeout = aiohttp.ClientTimeout(total=None)
-    connector = aiohttp.TCPConnector(limit=s.max_concurrency)
-    pause = asyncio.Event(); pause.set()
-    stop = asyncio.Event()
-
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
-        crawler = Crawler(db=db, settings=s, session=session, pause_event=pause, stop_event=stop)
-        await db.clear_pending_urls()
-        await crawler.initialize(seed_urls=seed_urls)
+    try:
+        s = config.crawl
 
-        storage = plan_storage(config.paths.output_dir)
-        downloader = Downloader(settings=s, session=session, output_dir=storage.raw_dir, pause_event=pause, stop_event=stop)
+        timeout = aiohttp.ClientTimeout(total=None)
+        connector = aiohttp.TCPConnector(limit=s.max_concurrency)
+        pause = asyncio.Event(); pause.set()
+        stop = asyncio.Event()
 
-        penalties = load_url_penalties(await db.kv_get(URL_PENALTIES_KEY))
-        semantic = await build_semantic_context_async(settings=s, db=db)
-
-        keywords = _load_keywords_sync(config.paths.keywords_path)
-        # Phrase blacklist learned from feedback.
-        blacklist: set[str] = set()
-        raw_bl = await db.kv_get(PHRASE_BLACKLIST_KEY)
-        try:
-            data = json.loads(raw_bl) if raw_bl else []
-            if isinstance(data, list):
-                blacklist = {str(x).strip() for x in data if str(x).strip()}
-        except Exception:
-            blacklist = set()
-        if blacklist:
-            keywords = [k for k in keywords if str(k).strip() and str(k).strip() not in blacklist]
-        matcher = KeywordMatcher(
-            keywords=keywords,
-            query=s.query,
-            fuzzy_enabled=True,
-            semantic_enabled=s.semantic_enabled,
-            semantic_threshold=s.semantic_threshold,
-            stopwords={w.strip().lower() for w in s.stopwords.split(",") if w.strip()},
-        )
-        parser = DocumentParser(
-            ocr_enabled=s.ocr_enabled,
-            ocr_engine=getattr(s, "ocr_engine", "tesseract"),
-            ocr_dpi=int(getattr(s, "ocr_dpi", 200)),
-            ocr_preprocess=bool(getattr(s, "ocr_preprocess", True)),
-            ocr_median_filter=bool(getattr(s, "ocr_median_filter", True)),
-            ocr_threshold=getattr(s, "ocr_threshold", None),
-        )
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            crawler = Crawler(db=db, settings=s, session=session, pause_event=pause, stop_event=stop)
+            await db.clear_pending_urls()
+            await crawler.initialize(seed_urls=seed_urls)
 
-        pipeline_deps = PipelineDeps(
-            settings=s,
-            db=db,
-            storage=storage,
-            parser=parser,
-            matcher=matcher,
-            penalties=penalties,
-            semantic=semantic,
-        )
-
-        processed = 0
-        downloaded = 0
-        flagged = 0
-
-        async for item in crawler.iter_discovered():
-            item_url = item.url
-            kind = "document" if looks_downloadable(item_url) else "page"
-            now = datetime.now(timezone.utc).isoformat()
-            await db.update_url_attempt(url=item_url, status="processing", last_attempt_at=now, http_status=None, error=None)
+            storage = plan_storage(config.paths.output_dir)
+            downloader = Downloader(settings=s, session=session, output_dir=storage.raw_dir, pause_event=pause, stop_event=stop)
             try:
-                if kind == "page":
-                    await crawler.process_page(item_url)
-                else:
-                    etag, last_modified = await db.get_url_cache_headers(url=item_url)
-                    cache_headers: dict[str, str] = {}
-                    if etag:
-                        cache_headers["If-None-Match"] = etag
-                    if last_modified:
-                        cache_headers["If-Modified-Since"] = last_modified
-
-                    dl = await downloader.download(item_url, cache_headers=(cache_headers or None))
-                    downloaded += 1
-
-                    out = await process_document(
-                        deps=pipeline_deps,
-                        inp=PipelineInput(
-                            url=item_url,
-                            final_url=dl.final_url,
-                            local_path=Path(str(dl.local_path)),
-                            content_type=dl.content_type,
-                            file_size=dl.file_size,
-                            sha256=dl.sha256,
-                            fetched_at=dl.fetched_at,
-                            etag=dl.etag,
-                            last_modified=dl.last_modified,
-                        ),
-                        now=now,
-                        allow_move=True,
-                        reprocess_existing=False,
-                        log=lambda m: logger.info("%s", m),
-                    )
-
-                    if out.hits:
-                        flagged += 1
-
-                    await db.update_url_attempt(
-                        url=item_url,
-                        status="done",
-                        last_attempt_at=now,
-                        http_status=200,
-                        error=None,
-                        content_type=dl.content_type,
-                        title=out.parsed.title,
-                        final_url=dl.final_url,
-                        local_path=str(out.final_path),
-                        sha256=dl.sha256,
-                        etag=dl.etag,
-                        last_modified=dl.last_modified,
-                    )
-
-                processed += 1
-                if processed % 25 == 0:
-                    logger.info("processed=%s downloaded=%s flagged=%s", processed, downloaded, flagged)
-            except NotModifiedError:
-                processed += 1
-                await db.update_url_attempt(url=item_url, status="done", last_attempt_at=now, http_status=304, error=None)
-            except Exception as e:
-                processed += 1
-                await db.update_url_attempt(url=item_url, status="retry", last_attempt_at=now, http_status=None, error=str(e))
-
-        # Release snapshot + diff (best-effort)
-        try:
-            diff = await store_snapshot_and_diff(db)
-            logger.info(
-                "release_diff added=%s changed=%s removed=%s",
-                len(diff.added),
-                len(diff.changed),
-                len(diff.removed),
-            )
-        except Exception:
-            pass
+                penalties = load_url_penalties(await db.kv_get(URL_PENALTIES_KEY))
+                semantic = await build_semantic_context_async(settings=s, db=db)
+
+                keywords = _load_keywords_sync(config.paths.keywords_path)
+                # Phrase blacklist learned from feedback.
+                blacklist: set[str] = set()
+                raw_bl = await db.kv_get(PHRASE_BLACKLIST_KEY)
+                try:
+                    data = json.loads(raw_bl) if raw_bl else []
+                    if isinstance(data, list):
+                        blacklist = {str(x).strip() for x in data if str(x).strip()}
+                except Exception:
+                    blacklist = set()
+                if blacklist:
+                    keywords = [k for k in keywords if str(k).strip() and str(k).strip() not in blacklist]
+                matcher = KeywordMatcher(
+                    keywords=keywords,
+                    query=s.query,
+                    fuzzy_enabled=True,
+                    semantic_enabled=s.semantic_enabled,
+                    semantic_threshold=s.semantic_threshold,
+                    stopwords={w.strip().lower() for w in s.stopwords.split(",") if w.strip()},
+                )
+                parser = DocumentParser(
+                    ocr_enabled=s.ocr_enabled,
+                    ocr_engine=getattr(s, "ocr_engine", "tesseract"),
+                    ocr_dpi=int(getattr(s, "ocr_dpi", 200)),
+                    ocr_preprocess=bool(getattr(s, "ocr_preprocess", True)),
+                    ocr_median_filter=bool(getattr(s, "ocr_median_filter", True)),
+                    ocr_threshold=getattr(s, "ocr_threshold", None),
+                    ocr_workers=int(getattr(s, "ocr_workers", 0)),
+                )
+
+                pipeline_deps = PipelineDeps(
+                    settings=s,
+                    db=db,
+                    storage=storage,
+                    parser=parser,
+                    matcher=matcher,
+                    penalties=penalties,
+                    semantic=semantic,
+                )
+
+                processed = 0
+                downloaded = 0
+                flagged = 0
+
+                async for item in crawler.iter_discovered():
+                    item_url = item.url
+                    kind = "document" if looks_downloadable(item_url) else "page"
+                    now = datetime.now(timezone.utc).isoformat()
+                    # iter_discovered already claimed the URL (status "processing").
+                    attempt_at = epoch_us()
+                    try:
+                        if kind == "page":
+                            await crawler.process_page(item_url)
+                        else:
+                            etag, last_modified = await db.get_url_cache_headers(url=item_url)
+                            cache_headers: dict[str, str] = {}
+                            if etag:
+                                cache_headers["If-None-Match"] = etag
+                            if last_modified:
+                                cache_headers["If-Modified-Since"] = last_modified
+
+                            dl = await downloader.download(item_url, cache_headers=(cache_headers or None))
+                            downloaded += 1
+
+                            out = await process_document(
+                                deps=pipeline_deps,
+                                inp=PipelineInput(
+                                    url=item_url,
+                                    final_url=dl.final_url,
+                                    local_path=Path(str(dl.local_path)),
+                                    content_type=dl.content_type,
+                                    file_size=dl.file_size,
+                                    sha256=dl.sha256,
+                                    fetched_at=dl.fetched_at,
+                                    etag=dl.etag,
+                                    last_modified=dl.last_modified,
+                                ),
+                                now=now,
+                                allow_move=True,
+                                reprocess_existing=False,
+                                log=lambda m: logger.info("%s", m),
+                            )
+
+                            if out.hits:
+                                flagged += 1
+
+                            await db.update_url_attempt(
+                                url=item_url,
+                                status="done",
+                                last_attempt_at=attempt_at,
+                                http_status=200,
+                                error=None,
+                                content_type=dl.content_type,
+                                title=out.parsed.title,
+                                final_url=dl.final_url,
+                                local_path=str(out.final_path),
+                                sha256=dl.sha256,
+                                etag=dl.etag,
+                                last_modified=dl.last_modified,
+                            )
+
+                        processed += 1
+                        if processed % 25 == 0:
+                            logger.info("processed=%s downloaded=%s flagged=%s", processed, downloaded, flagged)
+                    except NotModifiedError:
+                        processed += 1
+                        await db.update_url_attempt(url=item_url, status="done", last_attempt_at=attempt_at, http_status=304, error=None)
+                    except Exception as e:
+                        processed += 1
+                        await db.update_url_attempt(url=item_url, status="retry", last_attempt_at=attempt_at, http_status=None, error=str(e))
+            finally:
+                await downloader.aclose()
+
+            # Release snapshot + diff (best-effort)
+            try:
+                diff = await store_snapshot_and_diff(db)
+                logger.info(
+                    "release_diff added=%s changed=%s removed=%s",
+                    len(diff.added),
+                    len(diff.changed),
+                    len(diff.removed),
+                )
+            except Exception:
+                pass
 
-        # Write semantic index files
+            # Write semantic index files
+            try:
+                rows = await db.query_flagged_with_metrics(limit=100000)
+                write_semantic_sorted_index(out_dir=storage.flagged_dir, rows=rows)
+                hv = [r for r in rows if str(r.get("review_status") or "").lower() == "high_value"]
+                ir = [r for r in rows if str(r.get("review_status") or "").lower() == "irrelevant"]
+                write_semantic_sorted_index(out_dir=storage.flagged_dir / "high_value", rows=hv)
+                write_semantic_sorted_index(out_dir=storage.flagged_dir / "irrelevant", rows=ir)
+            except Exception:
+                pass
+    finally:
+        # Also on errors, Ctrl-C and cancellation: otherwise Chromium outlives the run and
+        # buffered URL outcomes are never written.
         try:
-            rows = await db.query_flagged_with_metrics(limit=100000)
-            write_semantic_sorted_index(out_dir=storage.flagged_dir, rows=rows)
-            hv = [r for r in rows if str(r.get("review_status") or "").lower() == "high_value"]
-            ir = [r for r in rows if str(r.get("review_status") or "").lower() == "irrelevant"]
-            write_semantic_sorted_index(out_dir=storage.flagged_dir / "high_value", rows=hv)
-            write_semantic_sorted_index(out_dir=storage.flagged_dir / "irrelevant", rows=ir)
+            await close_browser_pool()
         except Exception:
             pass
+        await db.aclose()
 
     logger.info("done processed=%s downloaded=%s flagged=%s", processed, downloaded, flagged)
     return 0
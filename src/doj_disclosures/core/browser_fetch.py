@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -10,6 +14,131 @@ class BrowserFetchResult:
     html: str
 
 
+NETWORKIDLE_GRACE_MS = 5000
+
+# Only the HTML matters; skipping these keeps `networkidle` from waiting on them.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet", "websocket"})
+
+
+async def _route_request(route: Any) -> None:
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class _BrowserPool:
+    """Lazily-started Chromium shared across fallback fetches.
+
+    Launching a browser costs seconds; keeping one alive and handing out a bounded
+    set of contexts makes repeated fallbacks cheap. Playwright objects are bound to
+    the event loop that created them, so the pool restarts if the loop changes
+    (e.g. a new crawl run via `asyncio.run`).
+    """
+
+    def __init__(self, *, max_contexts: int = 2) -> None:
+        self._max_contexts = max(1, int(max_contexts))
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pw: Any = None
+        self._browser: Any = None
+        self._contexts: asyncio.Queue[Any] | None = None
+        self._user_agent: str | None = None
+
+    async def _ensure_started(self, *, user_agent: str) -> asyncio.Queue[Any]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Objects from a previous loop are unusable; drop them without awaiting.
+            self._abandon()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+        assert self._lock is not None
+        async with self._lock:
+            if self._contexts is not None and self._user_agent == user_agent:
+                return self._contexts
+            if self._browser is not None:
+                await self._close_locked()
+
+            try:
+                from playwright.async_api import async_playwright  # type: ignore
+            except Exception as e:  # pragma: no cover
+                raise RuntimeError(
+                    "Playwright is not installed. Install with: pip install playwright ; playwright install chromium"
+                ) from e
+
+            self._pw = await async_playwright().start()
+            try:
+                self._browser = await self._pw.chromium.launch(headless=True)
+                contexts: asyncio.Queue[Any] = asyncio.Queue(maxsize=self._max_contexts)
+                for _ in range(self._max_contexts):
+                    context = await self._browser.new_context(user_agent=user_agent)
+                    await context.route("**/*", _route_request)
+                    contexts.put_nowait(context)
+            except Exception:
+                await self._close_locked()
+                raise
+            self._contexts = contexts
+            self._user_agent = user_agent
+            return contexts
+
+    async def fetch(self, url: str, *, user_agent: str, timeout_seconds: float) -> BrowserFetchResult:
+        contexts = await self._ensure_started(user_agent=user_agent)
+        context = await contexts.get()
+        try:
+            page = await context.new_page()
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=int(timeout_seconds * 1000))
+                try:
+                    # Give scripts a short window to settle; some pages never reach networkidle.
+                    await page.wait_for_load_state("networkidle", timeout=NETWORKIDLE_GRACE_MS)
+                except Exception:
+                    pass
+
+                final_url = page.url
+                html = await page.content()
+                return BrowserFetchResult(final_url=final_url, html=html)
+            finally:
+                await page.close()
+        finally:
+            contexts.put_nowait(context)
+
+    async def _close_locked(self) -> None:
+        browser, pw = self._browser, self._pw
+        self._reset()
+        try:
+            if browser is not None:
+                await browser.close()
+        finally:
+            if pw is not None:
+                await pw.stop()
+
+    def _reset(self) -> None:
+        self._pw = None
+        self._browser = None
+        self._contexts = None
+        self._user_agent = None
+
+    def _abandon(self) -> None:
+        # Closing needs the loop that started the browser, which is gone by now.
+        if self._browser is not None:
+            logger.warning(
+                "Dropping a Playwright browser started on another event loop; "
+                "its Chromium process keeps running until the app exits"
+            )
+        self._reset()
+
+    async def aclose(self) -> None:
+        if self._lock is None or self._loop is not asyncio.get_running_loop():
+            self._abandon()
+            return
+        async with self._lock:
+            await self._close_locked()
+
+
+_POOL = _BrowserPool()
+
+
 async def fetch_html_with_playwright(
     url: str,
     *,
@@ -19,30 +148,14 @@ async def fetch_html_with_playwright(
     """Fetch fully-rendered HTML using Playwright.
 
     This is intended as a fallback for pages that block non-browser HTTP clients.
-    Import is lazy so Playwright remains an optional dependency.
+    Import is lazy so Playwright remains an optional dependency. The browser is kept
+    alive between calls; call `close_browser_pool()` when the crawl finishes.
     """
 
-    try:
-        from playwright.async_api import async_playwright  # type: ignore
-    except Exception as e:  # pragma: no cover
-        raise RuntimeError(
-            "Playwright is not installed. Install with: pip install playwright ; playwright install chromium"
-        ) from e
+    return await _POOL.fetch(url, user_agent=user_agent, timeout_seconds=timeout_seconds)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        try:
-            context = await browser.new_context(user_agent=user_agent)
-            page = await context.new_page()
-            try:
-                await page.goto(url, wait_until="networkidle", timeout=int(timeout_seconds * 1000))
-            except Exception:
-                # Some pages never reach networkidle; fall back to a shorter load wait.
-                await page.goto(url, wait_until="domcontentloaded", timeout=int(timeout_seconds * 1000))
-                await asyncio.sleep(1.0)
 
-            final_url = page.url
-            html = await page.content()
-            return BrowserFetchResult(final_url=final_url, html=html)
-        finally:
-            await browser.close()
+async def close_browser_pool() -> None:
+    """Shut down the shared Playwright browser (no-op if it was never started)."""
+
+    await _POOL.aclose()
@@ -36,6 +36,8 @@ class CrawlSettings:
     ocr_median_filter: bool = True
     # If None, use an automatic (Otsu) threshold.
     ocr_threshold: int | None = None
+    # Pages OCR'd concurrently per document; 0 picks min(4, CPU count).
+    ocr_workers: int = 0
     # Named Entity Recognition (NER)
     ner_enabled: bool = True
     ner_engine: str = "spacy"  # "spacy" or "regex"
@@ -43,8 +45,13 @@ class CrawlSettings:
     # Embedding index + hybrid search (optional; requires semantic extra)
     embedding_index_enabled: bool = False
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Stored chunk vector format: "int8" (1 byte/dim plus a per-vector scale) or "fp32" (exact, 4x larger).
+    embedding_quant: str = "int8"
     # Storage layout
     storage_layout: str = "flat"  # "flat" or "hashed"
+    # Directory for in-flight downloads; empty means <output>/.parts. Pointing this at a
+    # fast local disk or tmpfs (e.g. /dev/shm) keeps partial writes off slow output storage.
+    scratch_dir: str = ""
     # Redaction detection
     redaction_detection_enabled: bool = True
     redaction_page_score_threshold: float = 0.25
@@ -63,6 +70,15 @@ class CrawlSettings:
     # Optional raw Cookie header value to send with requests.
     # Useful if a CDN/WAF requires a session cookie obtained via a browser.
     cookie_header: str = ""
+    # Have Crawler.process_page write its own "processing" marker before fetching.
+    # Crawler.iter_discovered already marks a URL as processing when it claims it,
+    # so by default the crawler skips this extra write and only records the outcome.
+    track_in_progress: bool = False
+    # Listing pages are read up to this many bytes; anything past it is not parsed for links.
+    max_html_bytes: int = 2_000_000
+    # SQLite `PRAGMA synchronous` for the state DB: "OFF", "NORMAL" or "FULL".
+    # NORMAL is safe with WAL (a power loss can drop the last commits, not corrupt the DB).
+    db_synchronous: str = "NORMAL"
     stopwords: str = ""
     query: str = ""  # optional boolean/proximity query
 
@@ -2,31 +2,103 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import AsyncIterator
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+from time import monotonic
+from typing import AsyncIterator, Mapping
+from urllib.parse import ParseResult, urlparse
 
 import aiohttp
 from aiolimiter import AsyncLimiter
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
 from doj_disclosures.core.config import CrawlSettings
-from doj_disclosures.core.db import Database
+from doj_disclosures.core.db import Database, UrlUpsertBatch
 from doj_disclosures.core.robots import RobotsPolicy, fetch_robots
-from doj_disclosures.core.utils import async_backoff_sleep, is_same_site, normalize_url
+from doj_disclosures.core.utils import async_backoff_sleep, epoch_us, normalize_url
 from doj_disclosures.core.browser_fetch import fetch_html_with_playwright
 
 logger = logging.getLogger(__name__)
 
 
 DOWNLOAD_EXTS = {".pdf", ".doc", ".docx", ".txt", ".html", ".htm"}
+_DOWNLOAD_EXT_TUPLE = tuple(DOWNLOAD_EXTS)
+# DOJ dataset listing URL with a positive-or-zero `page` query value; the value is group "n".
+_DATASET_SEED_RE = re.compile(
+    r"^(?P<head>[^?#]*/epstein/doj-disclosures/data-set-[^?#]*-files[^?#]*\?(?:[^#]*?&)?page=)"
+    r"(?P<n>\d+)(?P<tail>(?:[&#].*)?)$",
+    re.DOTALL,
+)
+# Heuristic for Drupal-style pager links (common on justice.gov).
+_PAGINATION_RE = re.compile(r"[?&]p(?:age)?=|pager", re.IGNORECASE)
+
+# Discovered links are buffered across pages and written in one transaction
+# once either limit is reached (or before the crawler polls the queue).
+LINK_FLUSH_INTERVAL_SECONDS = 0.2
+LINK_FLUSH_MAX_ROWS = 1000
+# iter_discovered claims this many queued URLs per DB round-trip.
+CLAIM_BATCH_SIZE = 400
+# Upper bound on an idle wait, so URLs queued by other writers are still picked up.
+IDLE_WAIT_SECONDS = 5.0
+
+
+def _is_download_path(path: str) -> bool:
+    return path.lower().endswith(_DOWNLOAD_EXT_TUPLE)
 
 
 def looks_downloadable(url: str) -> bool:
-    parsed = urlparse(url)
-    path = (parsed.path or "").lower()
-    return any(path.endswith(ext) for ext in DOWNLOAD_EXTS)
+    return _is_download_path(urlparse(url).path or "")
+
+
+def _canon_netloc(netloc: str) -> str:
+    n = (netloc or "").lower().strip()
+    if n.startswith("www."):
+        n = n[4:]
+    return n
+
+
+@dataclass(frozen=True)
+class _ScopeCheck:
+    """Seed-derived scope predicates, precomputed once per crawl.
+
+    Link filtering runs for every anchor on every page, so the seed netlocs and
+    path prefixes are folded into a set and a single regex up front.
+    """
+
+    seed_netlocs: frozenset[str]
+    # None means every path is in scope (no seeds yet, or a seed at the site root).
+    seed_prefix_re: re.Pattern[str] | None
+
+    @classmethod
+    def build(cls, seed_urls: list[str], *, restrict_paths: bool) -> _ScopeCheck:
+        netlocs = frozenset(_canon_netloc(urlparse(u).netloc) for u in seed_urls)
+        if not restrict_paths:
+            return cls(seed_netlocs=netlocs, seed_prefix_re=None)
+        exacts: list[str] = []
+        for u in seed_urls:
+            exact = (urlparse(u).path or "/").rstrip("/") or "/"
+            if exact == "/":
+                return cls(seed_netlocs=netlocs, seed_prefix_re=None)
+            exacts.append(exact)
+        # A path is in scope if it equals a seed path or lives under it as a directory.
+        pattern = "(?:" + "|".join(re.escape(e) for e in exacts) + ")(?:/|$)"
+        return cls(seed_netlocs=netlocs, seed_prefix_re=re.compile(pattern))
+
+    def same_site(self, parsed: ParseResult) -> bool:
+        return _canon_netloc(parsed.netloc) in self.seed_netlocs
+
+    def page_in_scope(self, parsed: ParseResult) -> bool:
+        if self.seed_prefix_re is None:
+            return True
+        return self.seed_prefix_re.match(parsed.path or "/") is not None
+
+
+@dataclass(frozen=True)
+class _ParsedPage:
+    title: str
+    links: list[str]
+    doc_links: list[str]
+    page_links: list[str]
 
 
 @dataclass
@@ -60,8 +132,13 @@ class Crawler:
         else:
             self._limiter = AsyncLimiter(max_rate=1.0, time_period=1.0 / rps)
         self._robots: RobotsPolicy | None = None
+        self._base_headers: Mapping[str, str] = self._build_headers(settings)
         self._seed_urls: list[str] = []
-        self._seed_path_prefixes: list[str] = []
+        self._scope = _ScopeCheck.build([settings.start_url], restrict_paths=False)
+        self._link_batches: list[UrlUpsertBatch] = []
+        self._link_rows = 0
+        self._last_link_flush = 0.0
+        self._new_work = asyncio.Event()
 
     async def initialize(self, *, seed_urls: list[str] | None = None) -> None:
         seeds_raw = [u.strip() for u in (seed_urls or [self._settings.start_url]) if u and u.strip()]
@@ -73,17 +150,11 @@ class Crawler:
         seeds = [self._normalize_dataset_seed(u) for u in seeds_raw]
 
         self._seed_urls = seeds
-        self._seed_path_prefixes = []
-        for s in seeds:
-            p = urlparse(s)
-            path = p.path or "/"
-            exact = path.rstrip("/") or "/"
-            prefix = exact if exact.endswith("/") else (exact + "/")
-            # Store both the exact path (for the seed itself) and a directory-like prefix.
-            self._seed_path_prefixes.append(exact)
-            self._seed_path_prefixes.append(prefix)
+        self._scope = _ScopeCheck.build(seeds, restrict_paths=True)
         self._robots = await fetch_robots(self._session, seeds[0], self._settings.user_agent)
-        now = datetime.now(timezone.utc).isoformat()
+        now = epoch_us()
+        # Anything still marked processing was claimed by a run that did not finish.
+        await self._db.requeue_in_progress()
         # Seed URLs should always be re-queued for a new run, even if they were previously "done".
         await self._db.upsert_urls(urls=seeds, status="queued", discovered_at=now, preserve_done=False)
 
@@ -94,27 +165,10 @@ class Crawler:
         This avoids immediate 403 loops when the user pastes ?page=1 links.
         """
 
-        try:
-            p = urlparse(url)
-            if "/epstein/doj-disclosures/data-set-" not in (p.path or ""):
-                return url
-            if "-files" not in (p.path or ""):
-                return url
-            qs = parse_qs(p.query or "", keep_blank_values=True)
-            page_vals = qs.get("page")
-            if not page_vals:
-                return url
-            try:
-                page_int = int(str(page_vals[0]))
-            except Exception:
-                return url
-            if page_int <= 0:
-                return url
-            qs["page"] = ["0"]
-            new_query = urlencode(qs, doseq=True)
-            return urlunparse(p._replace(query=new_query))
-        except Exception:
+        m = _DATASET_SEED_RE.match(url)
+        if m is None or int(m["n"]) <= 0:
             return url
+        return f"{m['head']}0{m['tail']}"
 
     @staticmethod
     def _looks_like_akamai_access_denied(status: int, html: str) -> bool:
@@ -126,58 +180,62 @@ class Crawler:
         return False
 
     def _is_allowed_site(self, url: str) -> bool:
+        return self._is_allowed_parsed(urlparse(url))
+
+    def _is_allowed_parsed(self, parsed: ParseResult) -> bool:
         if self._settings.allow_offsite:
             return True
-        bases = self._seed_urls or [self._settings.start_url]
-        return any(is_same_site(url, b) for b in bases)
+        return self._scope.same_site(parsed)
 
     def _page_in_scope(self, url: str) -> bool:
         # Documents can be hosted elsewhere on the same site (e.g., /sites/default/files/...)
         # but page crawling is restricted to the seed path prefix to prevent site-wide discovery.
-        if not self._seed_path_prefixes:
-            return True
-        path = urlparse(url).path or "/"
-        for pref in self._seed_path_prefixes:
-            if pref == "/":
-                return True
-            if path == pref:
-                return True
-            if pref.endswith("/") and path.startswith(pref):
-                return True
-        return False
+        return self._scope.page_in_scope(urlparse(url))
 
     @staticmethod
     def _looks_like_pagination(url: str) -> bool:
-        # Heuristic for Drupal-style pager links (common on justice.gov).
-        u = url.lower()
-        if "?page=" in u or "&page=" in u:
-            return True
-        if "?p=" in u or "&p=" in u:
-            return True
-        if "pager" in u:
-            return True
-        return False
+        return _PAGINATION_RE.search(url) is not None
 
     def _allowed(self, url: str) -> bool:
         if self._robots is None:
             return True
         return self._robots.can_fetch(self._settings.user_agent, url)
 
-    async def _fetch_html(self, url: str) -> tuple[int, str, str]:
+    @staticmethod
+    def _build_headers(settings: CrawlSettings) -> Mapping[str, str]:
+        # Settings are frozen for the lifetime of a crawler, so the page request headers are too.
         headers = {
-            "User-Agent": self._settings.user_agent,
+            "User-Agent": settings.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
             "Cache-Control": "no-cache",
             "Pragma": "no-cache",
             "Upgrade-Insecure-Requests": "1",
         }
-        cookie = str(getattr(self._settings, "cookie_header", "") or "").strip()
+        cookie = str(getattr(settings, "cookie_header", "") or "").strip()
         if cookie:
             headers["Cookie"] = cookie
+        return headers
+
+    @staticmethod
+    async def _read_capped(resp: aiohttp.ClientResponse, limit: int) -> bytes:
+        # StreamReader.read(n) may return less than n before EOF, so keep reading up to the cap.
+        buf = bytearray()
+        while len(buf) < limit:
+            chunk = await resp.content.read(limit - len(buf))
+            if not chunk:
+                break
+            buf += chunk
+        return bytes(buf)
+
+    async def _fetch_html(self, url: str) -> tuple[int, str, str]:
         async with self._limiter:
-            async with self._session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=40), allow_redirects=True) as resp:
-                text = await resp.text(errors="ignore")
+            async with self._session.get(url, headers=self._base_headers, timeout=aiohttp.ClientTimeout(total=40), allow_redirects=True) as resp:
+                raw = await self._read_capped(resp, int(getattr(self._settings, "max_html_bytes", 2_000_000)))
+                try:
+                    text = raw.decode(resp.charset or "utf-8", errors="ignore")
+                except LookupError:
+                    text = raw.decode("utf-8", errors="ignore")
                 status = int(resp.status)
                 final_url = str(resp.url)
 
@@ -194,18 +252,112 @@ class Crawler:
 
                 return status, final_url, text
 
+    def _queue_links(self, *, urls: list[str], discovered_at: int, preserve_done: bool) -> None:
+        self._link_batches.append(
+            UrlUpsertBatch(urls=tuple(urls), status="queued", discovered_at=discovered_at, preserve_done=preserve_done)
+        )
+        self._link_rows += len(urls)
+        self._new_work.set()
+
+    async def flush_discovered(self) -> None:
+        """Write any buffered discovered links to the DB."""
+
+        batches = self._link_batches
+        if not batches:
+            return
+        self._link_batches = []
+        self._link_rows = 0
+        self._last_link_flush = monotonic()
+        await self._db.upsert_urls_many(batches)
+
+    async def _maybe_flush_discovered(self) -> None:
+        if self._link_rows >= LINK_FLUSH_MAX_ROWS or monotonic() - self._last_link_flush >= LINK_FLUSH_INTERVAL_SECONDS:
+            await self.flush_discovered()
+
     async def iter_discovered(self) -> AsyncIterator[CrawlItem]:
-        while not self._stop.is_set():
-            await self._pause.wait()
-            pending = await self._db.get_pending_urls(limit=400)
-            if not pending:
-                await asyncio.sleep(0.5)
-                continue
-            for url, _ct in pending:
-                if self._stop.is_set():
-                    break
+        """Yield queued URLs, claiming them in batches so none is handed out twice.
+
+        Claimed URLs are marked processing in the DB; any that were claimed but not yet
+        yielded when iteration stops are put back in the queue.
+        """
+
+        pending: list[tuple[str, str | None]] = []
+        pos = 0
+        try:
+            while not self._stop.is_set():
                 await self._pause.wait()
-                yield CrawlItem(url=url, kind="document" if looks_downloadable(url) else "page")
+                # The queue must reflect links found by pages that were just processed.
+                self._new_work.clear()
+                await self.flush_discovered()
+                pending = await self._db.claim_pending_urls(limit=CLAIM_BATCH_SIZE, claimed_at=epoch_us())
+                pos = 0
+                if not pending:
+                    # Sleep until process_page queues links (or the timeout, for outside writers).
+                    try:
+                        await asyncio.wait_for(self._new_work.wait(), timeout=IDLE_WAIT_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                while pos < len(pending):
+                    if self._stop.is_set():
+                        break
+                    await self._pause.wait()
+                    url = pending[pos][0]
+                    pos += 1
+                    yield CrawlItem(url=url, kind="document" if looks_downloadable(url) else "page")
+        finally:
+            unclaimed = [url for url, _ct in pending[pos:]]
+            try:
+                # Links found by the pages handed out just before stopping are only buffered.
+                await self.flush_discovered()
+            finally:
+                if unclaimed:
+                    await self._db.release_claimed_urls(urls=unclaimed)
+
+    def _parse_page(self, html: str, final_url: str) -> _ParsedPage:
+        """Parse a fetched page and classify its links.
+
+        Runs in a worker thread (see `process_page`) so parsing a large listing does not
+        stall other in-flight fetches; it only reads crawler state fixed at initialize().
+        """
+
+        tree = LexborHTMLParser(html)
+        title_node = tree.css_first("title")
+        title = title_node.text().strip() if title_node is not None else ""
+
+        links: list[str] = []
+        doc_links: list[str] = []
+        page_links_all: list[str] = []
+        # Listing pages repeat the same hrefs many times; dedupe on the raw href and
+        # again on the normalized URL so each distinct link is checked only once.
+        seen_hrefs: set[str] = set()
+        seen: set[str] = set()
+        scope = self._scope
+        for a in tree.css("a[href]"):
+            href = a.attributes.get("href")
+            if not href or href in seen_hrefs:
+                continue
+            seen_hrefs.add(href)
+            candidate = normalize_url(href, base=final_url)
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            if candidate.startswith("mailto:") or candidate.startswith("javascript:"):
+                continue
+            parsed = urlparse(candidate)
+            if not self._is_allowed_parsed(parsed):
+                continue
+            if not self._allowed(candidate):
+                continue
+            links.append(candidate)
+            if _is_download_path(parsed.path or ""):
+                doc_links.append(candidate)
+            elif scope.page_in_scope(parsed):
+                # Page crawling is scope-limited. Even in seed-only mode we still follow
+                # pagination links so we can reach all documents on multi-page listings.
+                page_links_all.append(candidate)
+
+        return _ParsedPage(title=title, links=links, doc_links=doc_links, page_links=page_links_all)
 
     async def process_page(self, url: str) -> list[str]:
         if not self._is_allowed_site(url):
@@ -213,8 +365,9 @@ class Crawler:
         if not self._allowed(url):
             return []
 
-        now = datetime.now(timezone.utc).isoformat()
-        await self._db.update_url_attempt(url=url, status="processing", last_attempt_at=now, http_status=None, error=None)
+        now = epoch_us()
+        if bool(getattr(self._settings, "track_in_progress", False)):
+            await self._db.update_url_attempt(url=url, status="processing", last_attempt_at=now, http_status=None, error=None)
 
         attempts = 0
         while attempts <= self._settings.max_retries and not self._stop.is_set():
@@ -223,8 +376,7 @@ class Crawler:
                 if status >= 400:
                     raise RuntimeError(f"HTTP {status}")
 
-                soup = BeautifulSoup(html, "lxml")
-                title = (soup.title.text.strip() if soup.title and soup.title.text else "")
+                page = await asyncio.to_thread(self._parse_page, html, final_url)
                 await self._db.update_url_attempt(
                     url=url,
                     status="done",
@@ -232,46 +384,23 @@ class Crawler:
                     http_status=status,
                     error=None,
                     content_type="text/html",
-                    title=title,
+                    title=page.title,
                     final_url=final_url,
                 )
 
-                links: list[str] = []
-                for a in soup.find_all("a"):
-                    href = a.get("href")
-                    if not href:
-                        continue
-                    candidate = normalize_url(href, base=final_url)
-                    if candidate.startswith("mailto:") or candidate.startswith("javascript:"):
-                        continue
-                    if not self._is_allowed_site(candidate):
-                        continue
-                    if not self._allowed(candidate):
-                        continue
-                    links.append(candidate)
-
-                unique_links = set(links)
-                doc_links = [link for link in unique_links if looks_downloadable(link)]
-                if doc_links:
-                    await self._db.upsert_urls(urls=doc_links, status="queued", discovered_at=now, preserve_done=True)
-
-                # Page crawling is scope-limited. Even in seed-only mode we still follow pagination links
-                # so we can reach all documents on multi-page listings.
-                page_links_all = [
-                    link
-                    for link in unique_links
-                    if (not looks_downloadable(link)) and self._page_in_scope(link)
-                ]
+                if page.doc_links:
+                    self._queue_links(urls=page.doc_links, discovered_at=now, preserve_done=True)
 
                 if self._settings.follow_discovered_pages:
-                    page_links = page_links_all
+                    page_links = page.page_links
                 else:
-                    page_links = [link for link in page_links_all if self._looks_like_pagination(link)]
+                    page_links = [link for link in page.page_links if self._looks_like_pagination(link)]
 
                 if page_links:
                     # Always allow re-visiting pages on a new run (pages are lightweight and may change).
-                    await self._db.upsert_urls(urls=page_links, status="queued", discovered_at=now, preserve_done=False)
-                return links
+                    self._queue_links(urls=page_links, discovered_at=now, preserve_done=False)
+                await self._maybe_flush_discovered()
+                return page.links
             except Exception as e:
                 attempts += 1
                 if attempts > self._settings.max_retries:
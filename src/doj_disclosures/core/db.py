@@ -1,27 +1,38 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import sqlite3
-from dataclasses import dataclass
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from itertools import pairwise
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator
 
 import aiosqlite
 
+from doj_disclosures.core.utils import json_dumps, json_loads
+
 logger = logging.getLogger(__name__)
 
 
-SCHEMA_SQL = """
-PRAGMA journal_mode=WAL;
-PRAGMA synchronous=NORMAL;
+# Mirrors crawler.DOWNLOAD_EXTS (LIKE is case-insensitive for ASCII).
+_IS_DOCUMENT_SQL = (
+    "url LIKE '%.pdf' OR url LIKE '%.doc' OR url LIKE '%.docx' "
+    "OR url LIKE '%.txt' OR url LIKE '%.html' OR url LIKE '%.htm'"
+)
 
+# discovered_at / last_attempt_at are integer epoch microseconds (see utils.epoch_us).
+URLS_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS urls (
   url TEXT PRIMARY KEY,
   status TEXT NOT NULL,
-  discovered_at TEXT NOT NULL,
-  last_attempt_at TEXT,
+  discovered_at INTEGER NOT NULL,
+  last_attempt_at INTEGER,
   http_status INTEGER,
   error TEXT,
   content_type TEXT,
@@ -30,8 +41,32 @@ CREATE TABLE IF NOT EXISTS urls (
   local_path TEXT,
     sha256 TEXT,
     etag TEXT,
-    last_modified TEXT
+    last_modified TEXT,
+    is_pdf INTEGER GENERATED ALWAYS AS (url LIKE '%.pdf') VIRTUAL,
+    is_document INTEGER GENERATED ALWAYS AS ({IS_DOCUMENT}) VIRTUAL
 );
+""".replace("{IS_DOCUMENT}", _IS_DOCUMENT_SQL)
+
+_URLS_STORED_COLUMNS = (
+    "url",
+    "status",
+    "discovered_at",
+    "last_attempt_at",
+    "http_status",
+    "error",
+    "content_type",
+    "title",
+    "final_url",
+    "local_path",
+    "sha256",
+    "etag",
+    "last_modified",
+)
+
+SCHEMA_SQL = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+""" + URLS_TABLE_SQL + """
 
 CREATE TABLE IF NOT EXISTS documents (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -59,6 +94,9 @@ CREATE TABLE IF NOT EXISTS matches (
   FOREIGN KEY(doc_id) REFERENCES documents(id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_matches_doc_id ON matches(doc_id);
+CREATE INDEX IF NOT EXISTS idx_documents_fetched_at ON documents(fetched_at);
+
 CREATE VIRTUAL TABLE IF NOT EXISTS fts_docs USING fts5(
   doc_id UNINDEXED,
   url UNINDEXED,
@@ -106,6 +144,7 @@ CREATE TABLE IF NOT EXISTS doc_embeddings (
     model_name TEXT NOT NULL,
     vector BLOB NOT NULL,
     norm REAL NOT NULL,
+    scale REAL,
     created_at TEXT NOT NULL,
     FOREIGN KEY(doc_id) REFERENCES documents(id),
     UNIQUE(doc_id, model_name, chunk_index)
@@ -114,6 +153,21 @@ CREATE TABLE IF NOT EXISTS doc_embeddings (
 CREATE INDEX IF NOT EXISTS idx_doc_embeddings_doc_id ON doc_embeddings(doc_id);
 CREATE INDEX IF NOT EXISTS idx_doc_embeddings_model ON doc_embeddings(model_name);
 
+-- All chunk vectors of one (document, model) in a single row; see `_pack_embeddings`.
+CREATE TABLE IF NOT EXISTS doc_embeddings_packed (
+    doc_id INTEGER NOT NULL,
+    model_name TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    vectors BLOB NOT NULL,
+    scales BLOB,
+    norms BLOB NOT NULL,
+    chunks BLOB NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY(doc_id, model_name),
+    FOREIGN KEY(doc_id) REFERENCES documents(id)
+);
+
 CREATE TABLE IF NOT EXISTS kv (
   key TEXT PRIMARY KEY,
   value TEXT NOT NULL
@@ -151,6 +205,520 @@ CREATE TABLE IF NOT EXISTS feedback_centroids (
 );
 """
 
+# Indexes over migrated columns; must run after `_ensure_columns_sync`.
+INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_urls_pdf_status ON urls(status) WHERE is_pdf=1;
+CREATE INDEX IF NOT EXISTS idx_urls_status_ct ON urls(status, content_type) WHERE status='done';
+CREATE INDEX IF NOT EXISTS idx_urls_pending ON urls(is_document, discovered_at) WHERE status IN ('queued','retry');
+CREATE INDEX IF NOT EXISTS idx_urls_known_documents ON urls(is_document) WHERE status<>'abandoned';
+"""
+
+
+# Pending URLs are served pages first (is_document=0) so discovery keeps the queue fed.
+_PENDING_ORDER_SQL = "is_document ASC, discovered_at ASC"
+
+# Hot-path statements are module constants so every call hits sqlite3's statement cache.
+_SQL_GET_PENDING = (
+    "SELECT url, content_type FROM urls WHERE status IN ('queued','retry') "
+    f"ORDER BY {_PENDING_ORDER_SQL} LIMIT ?"
+)
+_SQL_CLAIM_PENDING = (
+    "UPDATE urls SET status='processing', last_attempt_at=? WHERE url IN ("
+    "SELECT url FROM urls WHERE status IN ('queued','retry') "
+    f"ORDER BY {_PENDING_ORDER_SQL} LIMIT ?"
+    ") RETURNING url, content_type, is_document, discovered_at"
+)
+_SQL_RELEASE_CLAIMED = "UPDATE urls SET status='queued' WHERE url=? AND status='processing'"
+# The URL list is bound as one JSON array and unrolled by json_each() inside SQLite;
+# `WHERE true` is required to disambiguate ON CONFLICT after INSERT ... SELECT.
+_SQL_UPSERT_URLS_FROM = "INSERT INTO urls(url,status,discovered_at) SELECT value, ?, ? FROM json_each(?) WHERE true "
+# Preserve completed downloads, but allow re-queueing of incomplete/incorrectly-marked rows.
+# In particular, PDFs marked done without a local_path/sha256 should not be treated as completed.
+# The stored-file check comes first so the is_pdf expression only runs for done rows without one.
+_SQL_UPSERT_URL_PRESERVE_DONE = (
+    _SQL_UPSERT_URLS_FROM +
+    "ON CONFLICT(url) DO UPDATE SET status=CASE "
+    "WHEN urls.status='done' AND ((COALESCE(urls.local_path,'')<>'' AND COALESCE(urls.sha256,'')<>'') OR urls.is_pdf=0) "
+    "THEN 'done' "
+    "ELSE excluded.status END"
+)
+_SQL_UPSERT_URL_REQUEUE = (
+    _SQL_UPSERT_URLS_FROM +
+    "ON CONFLICT(url) DO UPDATE SET status=excluded.status, discovered_at=excluded.discovered_at"
+)
+# Id lists are bound as one JSON array parameter and expanded with json_each(), so
+# each query is a single cached statement whatever the list length.
+_SQL_REVIEW_STATUS_FOR_IDS = (
+    "SELECT doc_id,status FROM doc_reviews WHERE doc_id IN (SELECT value FROM json_each(?))"
+)
+_MATCH_SELECT = "method,pattern,score,snippet,created_at"
+_TABLE_SELECT = "page_no,table_index,format,data_json,bbox_json,created_at"
+_ENTITY_SELECT = "label,canonical,display,count,variants_json,page_nos_json,created_at"
+_PAGE_FLAG_SELECT = "page_no,flag,score,details_json,created_at"
+_LEGACY_EMBEDDING_SELECT = "chunk_index,start_offset,end_offset,vector,norm,scale"
+
+# Per-document reads; built once so every call hands SQLite the identical string and
+# hits the connection's prepared-statement cache.
+_SQL_MATCHES_FOR_DOC = f"SELECT {_MATCH_SELECT} FROM matches WHERE doc_id=? ORDER BY score DESC"
+_SQL_TABLES_FOR_DOC = f"SELECT {_TABLE_SELECT} FROM doc_tables WHERE doc_id=? ORDER BY page_no ASC, table_index ASC"
+_SQL_ENTITIES_FOR_DOC = (
+    f"SELECT {_ENTITY_SELECT} FROM doc_entities WHERE doc_id=? ORDER BY label ASC, count DESC, display ASC"
+)
+_SQL_PAGE_FLAGS_FOR_DOC = f"SELECT {_PAGE_FLAG_SELECT} FROM doc_page_flags WHERE doc_id=? ORDER BY score DESC, page_no ASC"
+_SQL_PAGE_FLAGS_FOR_DOC_AND_FLAG = (
+    f"SELECT {_PAGE_FLAG_SELECT} FROM doc_page_flags WHERE doc_id=? AND flag=? ORDER BY score DESC, page_no ASC"
+)
+
+# Child rows for a JSON array of doc ids, keyed by doc_id and in the per-doc query order.
+_IN_IDS = "doc_id IN (SELECT value FROM json_each(?))"
+_SQL_EXPORT_MATCHES = f"SELECT doc_id,{_MATCH_SELECT} FROM matches WHERE {_IN_IDS} ORDER BY doc_id, score DESC"
+_SQL_EXPORT_TABLES = (
+    f"SELECT doc_id,{_TABLE_SELECT} FROM doc_tables WHERE {_IN_IDS} ORDER BY doc_id, page_no ASC, table_index ASC"
+)
+_SQL_EXPORT_ENTITIES = (
+    f"SELECT doc_id,{_ENTITY_SELECT} FROM doc_entities WHERE {_IN_IDS} "
+    "ORDER BY doc_id, label ASC, count DESC, display ASC"
+)
+_SQL_EXPORT_REDACTIONS = (
+    f"SELECT doc_id,{_PAGE_FLAG_SELECT} FROM doc_page_flags WHERE flag='redaction' AND {_IN_IDS} "
+    "ORDER BY doc_id, score DESC, page_no ASC"
+)
+_SQL_PACKED_EMBEDDINGS_FOR_IDS = (
+    f"SELECT doc_id,dim,count,vectors,scales,norms,chunks FROM doc_embeddings_packed WHERE model_name=? AND {_IN_IDS}"
+)
+_SQL_LEGACY_EMBEDDINGS_FOR_IDS = (
+    f"SELECT doc_id,{_LEGACY_EMBEDDING_SELECT} FROM doc_embeddings "
+    f"WHERE model_name=? AND {_IN_IDS} ORDER BY doc_id, chunk_index ASC"
+)
+# Cheap per-document tokens that change whenever a document's embeddings are rewritten:
+# packed rows by write time and chunk count, legacy rows by their AUTOINCREMENT ids.
+_SQL_PACKED_EMBEDDING_STAMPS_FOR_IDS = (
+    f"SELECT doc_id, created_at || '|' || count FROM doc_embeddings_packed WHERE model_name=? AND {_IN_IDS}"
+)
+_SQL_LEGACY_EMBEDDING_STAMPS_FOR_IDS = (
+    f"SELECT doc_id, 'id:' || MAX(id) FROM doc_embeddings WHERE model_name=? AND {_IN_IDS} GROUP BY doc_id"
+)
+_SQL_REDACTION_MAX_FOR_IDS = (
+    "SELECT doc_id, MAX(score) FROM doc_page_flags "
+    "WHERE flag='redaction' AND doc_id IN (SELECT value FROM json_each(?)) GROUP BY doc_id"
+)
+
+
+# Result rows are turned into dicts by zipping with these column names. Type
+# coercion and defaults live in the SELECT (column affinity, COALESCE) so the
+# per-row work stays in C.
+_METRIC_COLS = ("relevance_score", "topic_similarity", "entity_density", "url_penalty")
+_REVIEW_STATUS_SQL = "COALESCE(NULLIF(r.status,''),'new')"
+# Flagged documents: walk documents newest-first and probe idx_matches_doc_id per row
+# instead of joining and grouping every match.
+_HAS_MATCHES_SQL = "EXISTS(SELECT 1 FROM matches WHERE doc_id=d.id)"
+_MATCH_COUNT_SQL = "SELECT COUNT(*) FROM matches WHERE doc_id=d.id"
+_SQL_FLAGGED = (
+    f"SELECT d.id,d.url,d.title,d.local_path,d.fetched_at,({_MATCH_COUNT_SQL}) AS match_count "
+    f"FROM documents d WHERE {_HAS_MATCHES_SQL} ORDER BY d.fetched_at DESC LIMIT ?"
+)
+_FLAGGED_COLS = ("doc_id", "url", "title", "local_path", "fetched_at", "match_count", *_METRIC_COLS, "review_status")
+_FTS_COLS = ("doc_id", "url", "title", "bm25")
+_FTS_METRICS_COLS = (*_FTS_COLS, *_METRIC_COLS, "review_status")
+_PAGE_FLAG_COLS = ("page_no", "flag", "score", "details", "created_at")
+_DOCUMENT_COLS = (
+    "doc_id",
+    "url",
+    "final_url",
+    "title",
+    "content_type",
+    "file_size",
+    "sha256",
+    "local_path",
+    "fetched_at",
+    *_METRIC_COLS,
+)
+_DOCUMENT_FULL_COLS = (*_DOCUMENT_COLS, "review_status", "redaction_max")
+_SNAPSHOT_COLS = (
+    "url",
+    "status",
+    "http_status",
+    "content_type",
+    "title",
+    "final_url",
+    "local_path",
+    "sha256",
+    "etag",
+    "last_modified",
+    "last_attempt_at",
+    "discovered_at",
+)
+
+
+def fts5_quote(query: str) -> str:
+    """Quote each whitespace-separated token as an FTS5 string (implicit AND).
+
+    Inside double quotes FTS5 treats punctuation such as apostrophes, hyphens and
+    colons as token separators instead of query syntax, so the result always parses.
+    """
+
+    return " ".join('"' + tok.replace('"', '""') + '"' for tok in query.split())
+
+
+def _fts_match_candidates(query: str) -> tuple[str, ...]:
+    # Try the query verbatim so FTS5 operators (OR, NEAR, prefix*) keep working.
+    quoted = fts5_quote(query)
+    return (query,) if quoted == query else (query, quoted)
+
+
+def _pack_embeddings(chunks: list[dict[str, Any]]) -> tuple[int, int, bytes, bytes | None, bytes, bytes] | None:
+    """Concatenate chunk vectors into (dim, count, vectors, scales, norms, chunks) blobs.
+
+    Vectors must all be the same size and either all int8 (with a scale) or all
+    float32. `chunks` holds (chunk_index, start_offset, end_offset) triples, -1 for None.
+    Returns None when the chunks can't share one layout.
+    """
+
+    width = len(chunks[0]["vector"])
+    quantized = chunks[0].get("scale") is not None
+    if any(len(e["vector"]) != width or (e.get("scale") is not None) != quantized for e in chunks):
+        return None
+    if not quantized and width % 4:
+        return None
+    meta = array("q")
+    for e in chunks:
+        start, end = e.get("start_offset"), e.get("end_offset")
+        meta.extend((int(e.get("chunk_index") or 0), -1 if start is None else int(start), -1 if end is None else int(end)))
+    return (
+        width if quantized else width // 4,
+        len(chunks),
+        b"".join(e["vector"] for e in chunks),
+        array("d", [float(e["scale"]) for e in chunks]).tobytes() if quantized else None,
+        array("d", [float(e.get("norm") or 0.0) for e in chunks]).tobytes(),
+        meta.tobytes(),
+    )
+
+
+def _unpack_embeddings(
+    dim: int, count: int, vectors: bytes, scales: bytes | None, norms: bytes, chunks: bytes
+) -> list[dict[str, Any]]:
+    width = int(dim) if scales is not None else int(dim) * 4
+    view = memoryview(vectors)
+    scale_values = array("d", scales).tolist() if scales is not None else [None] * int(count)
+    norm_values = array("d", norms).tolist()
+    meta = array("q", chunks).tolist()
+    out: list[dict[str, Any]] = []
+    for i in range(int(count)):
+        chunk_index, start, end = meta[3 * i : 3 * i + 3]
+        out.append(
+            {
+                "chunk_index": chunk_index,
+                "start_offset": start if start >= 0 else None,
+                "end_offset": end if end >= 0 else None,
+                "vector": bytes(view[i * width : (i + 1) * width]),
+                "norm": norm_values[i],
+                "scale": scale_values[i],
+            }
+        )
+    return out
+
+
+def _legacy_embedding_dict(r: Any) -> dict[str, Any]:
+    return {
+        "chunk_index": int(r[0]),
+        "start_offset": (int(r[1]) if r[1] is not None else None),
+        "end_offset": (int(r[2]) if r[2] is not None else None),
+        "vector": r[3],
+        "norm": float(r[4]) if r[4] is not None else 0.0,
+        "scale": r[5],
+    }
+
+
+def _row_dicts(cols: tuple[str, ...], rows: Iterable[Any]) -> list[dict[str, Any]]:
+    return [dict(zip(cols, r)) for r in rows]
+
+
+def _as_bytes(blob: bytes | bytearray | memoryview) -> bytes:
+    return blob if isinstance(blob, bytes) else bytes(blob)
+
+
+def _sorted_unique(values: Iterable[Any]) -> list[Any]:
+    # Extractors usually hand over lists that are already sorted and deduplicated;
+    # a linear check avoids rebuilding them.
+    vals = values if isinstance(values, list) else list(values)
+    if all(a < b for a, b in pairwise(vals)):
+        return vals
+    return sorted(set(vals))
+
+
+def _match_dict(r: Any) -> dict[str, Any]:
+    return {"method": r[0], "pattern": r[1], "score": float(r[2]), "snippet": r[3], "created_at": r[4]}
+
+
+def _table_dict(r: Any) -> dict[str, Any]:
+    return {
+        "page_no": int(r[0]),
+        "table_index": int(r[1]),
+        "format": r[2],
+        "data": json_loads(r[3]) if r[3] else [],
+        "bbox": (json_loads(r[4]) if r[4] else None),
+        "created_at": r[5],
+    }
+
+
+def _entity_dict(r: Any) -> dict[str, Any]:
+    return {
+        "label": r[0],
+        "canonical": r[1],
+        "display": r[2],
+        "count": int(r[3]),
+        "variants": json_loads(r[4]) if r[4] else [],
+        "page_nos": json_loads(r[5]) if r[5] else [],
+        "created_at": r[6],
+    }
+
+
+def _page_flag_dict(r: Any) -> dict[str, Any]:
+    d = dict(zip(_PAGE_FLAG_COLS, r))
+    if d["details"]:
+        d["details"] = json_loads(d["details"])
+    return d
+
+
+# update_url_attempt rows are buffered per thread and applied in one transaction
+# once this many are pending, or after the delay, or before any other DB access.
+URL_ATTEMPT_BATCH_ROWS = 256
+URL_ATTEMPT_FLUSH_SECONDS = 0.05
+
+_UPDATE_URL_ATTEMPT_SQL = (
+    "UPDATE urls SET status=?, last_attempt_at=?, http_status=?, error=?, content_type=?, title=?, "
+    "final_url=?, local_path=?, sha256=?, etag=?, last_modified=? WHERE url=?"
+)
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL")
+
+# Shared by every connection: 64 MiB page cache, 256 MiB mmap, in-memory temp
+# tables, and a generous busy timeout since several threads may write.
+_TUNING_PRAGMAS = (
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=30000",
+)
+
+
+def writer_pragmas(synchronous: str = "NORMAL") -> tuple[str, ...]:
+    return (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={synchronous}",
+        # Checkpoint less often than the default 1000 pages; batched commits grow the WAL quickly.
+        "PRAGMA wal_autocheckpoint=10000",
+        *_TUNING_PRAGMAS,
+        # Refresh planner stats for tables that need it (cheap when nothing changed).
+        "PRAGMA optimize=0x10002",
+    )
+
+
+# Readers serve the per-document and export queries; map up to 1 GiB of the file so
+# warm reads come straight from the OS page cache (address space only, not RSS).
+READER_PRAGMAS = ("PRAGMA query_only=1", *_TUNING_PRAGMAS, "PRAGMA mmap_size=1073741824")
+
+
+async def _open_connection(path: Path) -> aiosqlite.Connection:
+    # Room for every distinct statement in the per-connection prepared-statement cache.
+    conn = aiosqlite.connect(path, cached_statements=256)
+    # Pooled connections outlive a single call; an unclosed one must not block interpreter exit.
+    thread = conn if isinstance(conn, threading.Thread) else getattr(conn, "_thread", None)
+    if isinstance(thread, threading.Thread):
+        thread.daemon = True
+    return await conn
+
+
+class _ReaderPool:
+    """Small pool of read-only connections.
+
+    WAL lets readers run alongside the writer, so SELECT-only methods borrow a pooled
+    connection instead of opening one per call. Idle connections are kept per thread:
+    the GUI thread drives the DB through short-lived `asyncio.run` loops while the crawl
+    worker runs its own loop, and aiosqlite connections are safe to reuse across loops
+    on the same thread.
+    """
+
+    def __init__(self, path: Path, *, size: int = 4) -> None:
+        self._path = path
+        self._size = max(1, int(size))
+        self._local = threading.local()
+
+    def _idle(self) -> list[aiosqlite.Connection]:
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = []
+            self._local.idle = idle
+        return idle
+
+    async def acquire(self) -> aiosqlite.Connection:
+        idle = self._idle()
+        if idle:
+            return idle.pop()
+        conn = await _open_connection(self._path)
+        try:
+            for pragma in READER_PRAGMAS:
+                await conn.execute(pragma)
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    async def release(self, conn: aiosqlite.Connection) -> None:
+        idle = self._idle()
+        if len(idle) < self._size:
+            idle.append(conn)
+            return
+        await conn.close()
+
+    async def close(self) -> None:
+        idle = self._idle()
+        while idle:
+            await idle.pop().close()
+
+
+class _Writer:
+    """One long-lived read-write connection per thread.
+
+    Opening a connection per call costs a thread start plus pragma round-trips, which
+    dominated small writes like `update_url_attempt`. Methods on one thread share the
+    connection, so an asyncio.Lock (recreated per event loop, since the GUI thread uses
+    a fresh `asyncio.run` loop per call) keeps their transactions from interleaving.
+    """
+
+    def __init__(self, path: Path, *, pragmas: tuple[str, ...]) -> None:
+        self._path = path
+        self._pragmas = pragmas
+        self._local = threading.local()
+
+    async def acquire(self) -> aiosqlite.Connection:
+        local = self._local
+        loop = asyncio.get_running_loop()
+        if getattr(local, "loop", None) is not loop:
+            local.loop = loop
+            local.lock = asyncio.Lock()
+        await local.lock.acquire()
+        try:
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = await _open_connection(self._path)
+                try:
+                    for pragma in self._pragmas:
+                        await conn.execute(pragma)
+                except BaseException:
+                    await conn.close()
+                    raise
+                local.conn = conn
+            return conn
+        except BaseException:
+            local.lock.release()
+            raise
+
+    def release(self) -> None:
+        self._local.lock.release()
+
+    def pending_attempts(self) -> list[tuple[Any, ...]]:
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = []
+            self._local.pending = pending
+        return pending
+
+    def take_pending_attempts(self) -> list[tuple[Any, ...]]:
+        pending = self.pending_attempts()
+        self._local.pending = []
+        return pending
+
+    def restore_pending_attempts(self, rows: list[tuple[Any, ...]]) -> None:
+        self._local.pending = rows + self.pending_attempts()
+
+    def schedule_flush(self, flush: Callable[[], Awaitable[None]]) -> None:
+        task = getattr(self._local, "flush_task", None)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+
+        async def _later() -> None:
+            await asyncio.sleep(URL_ATTEMPT_FLUSH_SECONDS)
+            try:
+                await flush()
+            except Exception:
+                # Nobody awaits this task; rows that failed to apply stay pending for the next write.
+                logger.warning("Background flush of buffered URL attempts failed", exc_info=True)
+
+        # A task cancelled with its loop leaves the rows pending; the next DB call applies them.
+        self._local.flush_task = asyncio.get_running_loop().create_task(_later())
+
+    def is_open(self) -> bool:
+        return getattr(self._local, "conn", None) is not None
+
+    def set_transaction_owner(self, task: asyncio.Task[Any] | None) -> None:
+        self._local.txn_owner = task
+
+    def in_owned_transaction(self) -> bool:
+        """True when the current task holds this thread's connection via `Database.transaction()`."""
+
+        owner = getattr(self._local, "txn_owner", None)
+        return owner is not None and owner is asyncio.current_task()
+
+    def connection(self) -> aiosqlite.Connection:
+        return self._local.conn
+
+    def discard(self) -> aiosqlite.Connection | None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        return conn
+
+    async def close(self) -> None:
+        conn = self.discard()
+        if conn is not None:
+            await conn.close()
+
+
+URL_RECORD_CACHE_SIZE = 100_000
+
+
+class _UrlRecordCache:
+    """Process-local LRU of `get_url_cached_record` results, including misses.
+
+    Writes that touch the cached columns invalidate entries. The generation counter
+    stops a lookup that raced with an invalidation from storing its stale result.
+    """
+
+    def __init__(self, *, maxsize: int = URL_RECORD_CACHE_SIZE) -> None:
+        self._maxsize = max(1, int(maxsize))
+        self._data: OrderedDict[str, UrlCachedRecord | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def lookup(self, url: str) -> tuple[bool, UrlCachedRecord | None, int]:
+        """Return (hit, record, generation); pass the generation back to `store`."""
+
+        with self._lock:
+            if url in self._data:
+                self._data.move_to_end(url)
+                return True, self._data[url], self._generation
+            return False, None, self._generation
+
+    def store(self, url: str, record: UrlCachedRecord | None, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._data[url] = record
+            self._data.move_to_end(url)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, urls: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for url in urls:
+                self._data.pop(url, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
 
 @dataclass(frozen=True)
 class UrlCachedRecord:
@@ -162,35 +730,132 @@ class UrlCachedRecord:
     title: str | None
 
 
+@dataclass(frozen=True)
+class UrlUpsertBatch:
+    urls: tuple[str, ...]
+    status: str
+    discovered_at: int
+    preserve_done: bool = True
+
+
+# (resolved path, inode) of DB files already initialized by this process. The inode
+# changes if the file is deleted and recreated, which forces a fresh initialize.
+_SCHEMA_INITIALIZED: set[tuple[str, int]] = set()
+
+
 @dataclass(frozen=True)
 class Database:
     path: Path
+    # Durability of the writer connection: one of SYNCHRONOUS_MODES.
+    synchronous: str = "NORMAL"
+    _readers: _ReaderPool = field(init=False, repr=False, compare=False)
+    _writer: _Writer = field(init=False, repr=False, compare=False)
+    _url_records: _UrlRecordCache = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_readers", _ReaderPool(self.path))
+        object.__setattr__(self, "_url_records", _UrlRecordCache())
+        sync = str(self.synchronous or "NORMAL").upper()
+        if sync not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {SYNCHRONOUS_MODES}, got {self.synchronous!r}")
+        object.__setattr__(self, "synchronous", sync)
+        object.__setattr__(self, "_writer", _Writer(self.path, pragmas=writer_pragmas(sync)))
 
     @staticmethod
-    def _ensure_columns_sync(conn: sqlite3.Connection, *, table: str, columns: dict[str, str]) -> None:
-        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    def _table_columns_sync(conn: sqlite3.Connection, tables: Iterable[str]) -> dict[str, dict[str, str]]:
+        """Return {table: {column: declared type}} for `tables` in one query."""
+
+        names = tuple(tables)
+        ph = ",".join("?" * len(names))
+        out: dict[str, dict[str, str]] = {name: {} for name in names}
+        # table_xinfo (unlike table_info) also lists generated columns.
+        for table, column, col_type in conn.execute(
+            "SELECT m.name, p.name, p.type FROM sqlite_master AS m JOIN pragma_table_xinfo(m.name) AS p "
+            f"WHERE m.type='table' AND m.name IN ({ph})",
+            names,
+        ):
+            out[table][column] = str(col_type or "").upper()
+        return out
+
+    @staticmethod
+    def _ensure_columns_sync(conn: sqlite3.Connection, *, table: str, existing: Iterable[str], columns: dict[str, str]) -> None:
+        present = set(existing)
         for name, col_type in columns.items():
-            if name in existing:
+            if name in present:
                 continue
             conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
 
+    @staticmethod
+    def _migrate_url_timestamps_sync(conn: sqlite3.Connection, *, url_columns: dict[str, str]) -> None:
+        """Rebuild `urls` with INTEGER timestamps if it still has the old TEXT columns.
+
+        A TEXT-affinity column would store bound integers as text, so the declared type
+        has to change; SQLite can only do that by copying into a new table.
+        """
+
+        if url_columns.get("discovered_at") == "INTEGER":
+            return
+
+        def to_us(col: str) -> str:
+            # ISO-8601 text (with offset) -> epoch microseconds; SQLite keeps millisecond precision.
+            return (
+                f"CASE WHEN typeof({col})='text' "
+                f"THEN CAST(strftime('%s', {col}) AS INTEGER) * 1000000 "
+                f"+ CAST(round(strftime('%f', {col}) * 1000) AS INTEGER) % 1000 * 1000 "
+                f"ELSE {col} END"
+            )
+
+        select_cols = [
+            "COALESCE(" + to_us(c) + ", 0)" if c == "discovered_at" else to_us(c) if c == "last_attempt_at" else c
+            for c in _URLS_STORED_COLUMNS
+        ]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("ALTER TABLE urls RENAME TO urls_old")
+            conn.execute(URLS_TABLE_SQL)
+            conn.execute(
+                f"INSERT INTO urls({','.join(_URLS_STORED_COLUMNS)}) SELECT {','.join(select_cols)} FROM urls_old"
+            )
+            conn.execute("DROP TABLE urls_old")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _schema_key(self) -> tuple[str, int] | None:
+        try:
+            return str(self.path.resolve()), self.path.stat().st_ino
+        except OSError:
+            return None
+
     def initialize_sync(self) -> None:
+        """Create/migrate the schema. Repeat calls for the same DB file in this process are no-ops."""
+
+        key = self._schema_key()
+        if key is not None and key in _SCHEMA_INITIALIZED:
+            return
         self.path.parent.mkdir(parents=True, exist_ok=True)
         conn = sqlite3.connect(self.path)
         try:
             conn.executescript(SCHEMA_SQL)
             # Schema migration for existing DBs.
+            columns = self._table_columns_sync(conn, ("urls", "documents", "doc_embeddings"))
             self._ensure_columns_sync(
                 conn,
                 table="urls",
+                existing=columns["urls"],
                 columns={
                     "etag": "TEXT",
                     "last_modified": "TEXT",
+                    "is_pdf": "INTEGER GENERATED ALWAYS AS (url LIKE '%.pdf') VIRTUAL",
+                    "is_document": f"INTEGER GENERATED ALWAYS AS ({_IS_DOCUMENT_SQL}) VIRTUAL",
                 },
             )
+            self._migrate_url_timestamps_sync(conn, url_columns=columns["urls"])
             self._ensure_columns_sync(
                 conn,
                 table="documents",
+                existing=columns["documents"],
                 columns={
                     "relevance_score": "REAL",
                     "topic_similarity": "REAL",
@@ -198,58 +863,176 @@ class Database:
                     "url_penalty": "REAL",
                 },
             )
+            # NULL scale marks a legacy float32 vector; otherwise the blob is int8.
+            self._ensure_columns_sync(
+                conn,
+                table="doc_embeddings",
+                existing=columns["doc_embeddings"],
+                columns={"scale": "REAL"},
+            )
+            conn.executescript(INDEX_SQL)
             conn.commit()
+            conn.execute("PRAGMA optimize=0x10002")
         finally:
             conn.close()
+        key = self._schema_key()
+        if key is not None:
+            _SCHEMA_INITIALIZED.add(key)
+
+    @asynccontextmanager
+    async def _write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Use this thread's shared read-write connection exclusively.
+
+        Callers commit their own work (via `_begin`/`_commit`); anything left
+        uncommitted by an exception is rolled back so the next caller starts clean.
+        Inside `transaction()` the owning task reuses the open connection directly and
+        the outer block decides whether to commit or roll back.
+        """
+
+        if self._writer.in_owned_transaction():
+            yield self._writer.connection()
+            return
+        conn = await self._writer.acquire()
+        try:
+            await self._apply_pending_attempts(conn)
+            yield conn
+        except BaseException:
+            try:
+                if conn.in_transaction:
+                    await conn.rollback()
+            except Exception:
+                # The connection is unusable; open a fresh one next time.
+                broken = self._writer.discard()
+                if broken is not None:
+                    await broken.close()
+            raise
+        finally:
+            self._writer.release()
 
-    async def _connect(self) -> aiosqlite.Connection:
-        """Create and initialize an aiosqlite connection.
+    async def _begin(self, conn: aiosqlite.Connection) -> None:
+        if not self._writer.in_owned_transaction():
+            await conn.execute("BEGIN IMMEDIATE")
 
-        Important: callers should NOT use `async with conn` on the returned connection,
-        because the connection is already awaited/started. Use try/finally + close.
-        """
+    async def _commit(self, conn: aiosqlite.Connection) -> None:
+        if not self._writer.in_owned_transaction():
+            await conn.commit()
 
-        conn = await aiosqlite.connect(self.path)
-        await conn.execute("PRAGMA journal_mode=WAL")
-        await conn.execute("PRAGMA synchronous=NORMAL")
-        return conn
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Run several write methods in one BEGIN IMMEDIATE ... COMMIT.
 
-    async def upsert_url(self, *, url: str, status: str, discovered_at: str, preserve_done: bool = True) -> None:
-        await self.upsert_urls(urls=[url], status=status, discovered_at=discovered_at, preserve_done=preserve_done)
+        Write calls made by the same task inside the block join the transaction
+        instead of committing individually; other tasks wait for the writer as usual.
+        Reads still go to the pooled readers and don't see the uncommitted rows.
+        """
 
-    async def upsert_urls(self, *, urls: Iterable[str], status: str, discovered_at: str, preserve_done: bool = True) -> None:
-        url_list = [u for u in urls if u]
-        if not url_list:
+        if self._writer.in_owned_transaction():
+            yield
             return
+        async with self._write() as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            self._writer.set_transaction_owner(asyncio.current_task())
+            try:
+                yield
+            finally:
+                self._writer.set_transaction_owner(None)
+            await conn.commit()
 
-        conn = await self._connect()
+    async def _apply_pending_attempts(self, conn: aiosqlite.Connection) -> None:
+        rows = self._writer.take_pending_attempts()
+        if not rows:
+            return
         try:
-            if preserve_done:
-                # Preserve completed downloads, but allow re-queueing of incomplete/incorrectly-marked rows.
-                # In particular, PDFs marked done without a local_path/sha256 should not be treated as completed.
-                sql = (
-                    "INSERT INTO urls(url,status,discovered_at) VALUES(?,?,?) "
-                    "ON CONFLICT(url) DO UPDATE SET status=CASE "
-                    "WHEN urls.status='done' AND (urls.url NOT LIKE '%.pdf' OR (COALESCE(urls.local_path,'')<>'' AND COALESCE(urls.sha256,'')<>'')) "
-                    "THEN 'done' "
-                    "ELSE excluded.status END"
-                )
-            else:
-                sql = (
-                    "INSERT INTO urls(url,status,discovered_at) VALUES(?,?,?) "
-                    "ON CONFLICT(url) DO UPDATE SET status=excluded.status, discovered_at=excluded.discovered_at"
-                )
-            await conn.executemany(sql, [(u, status, discovered_at) for u in url_list])
+            await conn.execute("BEGIN IMMEDIATE")
+            await conn.executemany(_UPDATE_URL_ATTEMPT_SQL, rows)
             await conn.commit()
-        finally:
+        except BaseException:
+            self._writer.restore_pending_attempts(rows)
+            raise
+
+    async def flush_url_attempts(self) -> None:
+        """Apply any buffered `update_url_attempt` rows from this thread."""
+
+        if not self._writer.pending_attempts():
+            return
+        async with self._write():
+            pass
+
+    @asynccontextmanager
+    async def _read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a pooled read-only connection."""
+
+        # Reads on this thread must see its own buffered URL status updates.
+        await self.flush_url_attempts()
+        conn = await self._readers.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # Don't hand a connection in an unknown state back to the pool.
             await conn.close()
+            raise
+        else:
+            await self._readers.release(conn)
+
+    async def aclose(self) -> None:
+        """Close pooled and writer connections owned by the calling thread."""
+
+        await self.flush_url_attempts()
+        if self._writer.is_open():
+            try:
+                await self.maintenance()
+            except Exception:
+                logger.debug("PRAGMA optimize failed during close", exc_info=True)
+        await self._readers.close()
+        await self._writer.close()
+
+    async def maintenance(self) -> None:
+        """Let SQLite refresh planner statistics after a burst of writes."""
+
+        async with self._write() as conn:
+            await conn.execute("PRAGMA optimize")
+
+    async def upsert_url(self, *, url: str, status: str, discovered_at: int, preserve_done: bool = True) -> None:
+        await self.upsert_urls(urls=[url], status=status, discovered_at=discovered_at, preserve_done=preserve_done)
+
+    async def upsert_urls(self, *, urls: Iterable[str], status: str, discovered_at: int, preserve_done: bool = True) -> None:
+        await self.upsert_urls_many(
+            [UrlUpsertBatch(urls=tuple(urls), status=status, discovered_at=discovered_at, preserve_done=preserve_done)]
+        )
+
+    @staticmethod
+    def _upsert_urls_sql(*, preserve_done: bool) -> str:
+        return _SQL_UPSERT_URL_PRESERVE_DONE if preserve_done else _SQL_UPSERT_URL_REQUEUE
+
+    async def upsert_urls_many(self, batches: Iterable[UrlUpsertBatch]) -> None:
+        """Apply several URL upserts in a single write transaction.
+
+        Batches are applied in order, so a later batch wins over an earlier one for the same URL.
+        """
+
+        work = [(b, [u for u in b.urls if u]) for b in batches]
+        work = [(b, urls) for b, urls in work if urls]
+        if not work:
+            return
+
+        # New rows would turn cached misses stale.
+        self._url_records.invalidate(u for _b, urls in work for u in urls)
+        async with self._write() as conn:
+            # `_write` rolls the batch back if any statement fails.
+            await self._begin(conn)
+            for b, urls in work:
+                await conn.execute(
+                    self._upsert_urls_sql(preserve_done=b.preserve_done),
+                    (b.status, b.discovered_at, json_dumps(urls)),
+                )
+            await self._commit(conn)
 
     async def update_url_attempt(
         self,
         *,
         url: str,
         status: str,
-        last_attempt_at: str,
+        last_attempt_at: int,
         http_status: int | None,
         error: str | None,
         content_type: str | None = None,
@@ -260,116 +1043,131 @@ class Database:
         etag: str | None = None,
         last_modified: str | None = None,
     ) -> None:
-        conn = await self._connect()
-        try:
-            await conn.execute(
-                "UPDATE urls SET status=?, last_attempt_at=?, http_status=?, error=?, content_type=?, title=?, final_url=?, local_path=?, sha256=?, etag=?, last_modified=? WHERE url=?",
-                (
-                    status,
-                    last_attempt_at,
-                    http_status,
-                    error,
-                    content_type,
-                    title,
-                    final_url,
-                    local_path,
-                    sha256,
-                    etag,
-                    last_modified,
-                    url,
-                ),
+        """Record a fetch attempt for `url`.
+
+        The update is buffered and committed together with other attempts from this
+        thread (see URL_ATTEMPT_BATCH_ROWS); any later DB call on the thread applies it first.
+        """
+
+        self._url_records.invalidate((url,))
+        pending = self._writer.pending_attempts()
+        pending.append(
+            (
+                status,
+                last_attempt_at,
+                http_status,
+                error,
+                content_type,
+                title,
+                final_url,
+                local_path,
+                sha256,
+                etag,
+                last_modified,
+                url,
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+        )
+        if len(pending) >= URL_ATTEMPT_BATCH_ROWS:
+            await self.flush_url_attempts()
+        else:
+            self._writer.schedule_flush(self.flush_url_attempts)
 
     async def get_url_cache_headers(self, *, url: str) -> tuple[str | None, str | None]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute("SELECT etag, last_modified FROM urls WHERE url=?", (url,)) as cur:
                 row = await cur.fetchone()
                 if not row:
                     return None, None
                 return (row[0] or None), (row[1] or None)
-        finally:
-            await conn.close()
 
     async def get_url_cached_record(self, *, url: str) -> UrlCachedRecord | None:
-        conn = await self._connect()
-        try:
+        hit, record, generation = self._url_records.lookup(url)
+        if hit:
+            return record
+        async with self._read() as conn:
             async with conn.execute(
                 "SELECT local_path, content_type, sha256, final_url, title FROM urls WHERE url=?",
                 (url,),
             ) as cur:
                 row = await cur.fetchone()
-                if not row:
-                    return None
-                return UrlCachedRecord(
-                    url=url,
-                    local_path=(row[0] or None),
-                    content_type=(row[1] or None),
-                    sha256=(row[2] or None),
-                    final_url=(row[3] or None),
-                    title=(row[4] or None),
-                )
-        finally:
-            await conn.close()
+        if row:
+            record = UrlCachedRecord(
+                url=url,
+                local_path=(row[0] or None),
+                content_type=(row[1] or None),
+                sha256=(row[2] or None),
+                final_url=(row[3] or None),
+                title=(row[4] or None),
+            )
+        self._url_records.store(url, record, generation)
+        return record
 
     async def get_url_debug_info(self, *, url: str) -> tuple[str, int | None, str | None] | None:
         """Return (status, http_status, error) for a URL (for logging/debugging)."""
 
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute("SELECT status, http_status, error FROM urls WHERE url=?", (url,)) as cur:
                 row = await cur.fetchone()
                 if not row:
                     return None
                 return str(row[0]), (int(row[1]) if row[1] is not None else None), (row[2] or None)
-        finally:
-            await conn.close()
 
     async def purge_derived_for_doc(self, *, doc_id: int) -> None:
         """Remove derived/indexed rows for a document so it can be reprocessed cleanly."""
 
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
+            # Take the write lock up front so all the deletes share one transaction.
+            await self._begin(conn)
             await conn.execute("DELETE FROM matches WHERE doc_id=?", (doc_id,))
             await conn.execute("DELETE FROM doc_tables WHERE doc_id=?", (doc_id,))
             await conn.execute("DELETE FROM doc_entities WHERE doc_id=?", (doc_id,))
             await conn.execute("DELETE FROM doc_embeddings WHERE doc_id=?", (doc_id,))
+            await conn.execute("DELETE FROM doc_embeddings_packed WHERE doc_id=?", (doc_id,))
             await conn.execute("DELETE FROM doc_page_flags WHERE doc_id=?", (doc_id,))
             await conn.execute("DELETE FROM fts_docs WHERE doc_id=?", (doc_id,))
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def update_document_storage(self, *, doc_id: int, local_path: str, title: str | None, content_type: str | None) -> None:
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             await conn.execute(
                 "UPDATE documents SET local_path=COALESCE(?, local_path), title=COALESCE(?, title), content_type=COALESCE(?, content_type) WHERE id=?",
                 (local_path, title, content_type, doc_id),
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def get_pending_urls(self, limit: int = 500) -> list[tuple[str, str | None]]:
-        conn = await self._connect()
-        try:
-            async with conn.execute(
-                "SELECT url, content_type FROM urls WHERE status IN ('queued','retry') "
-                "ORDER BY "
-                "CASE "
-                "WHEN lower(url) LIKE '%.pdf' OR lower(url) LIKE '%.doc' OR lower(url) LIKE '%.docx' OR lower(url) LIKE '%.txt' OR lower(url) LIKE '%.html' OR lower(url) LIKE '%.htm' "
-                "THEN 1 ELSE 0 END ASC, "
-                "discovered_at ASC LIMIT ?",
-                (limit,),
-            ) as cur:
+        async with self._read() as conn:
+            async with conn.execute(_SQL_GET_PENDING, (limit,)) as cur:
                 rows = await cur.fetchall()
                 return [(r[0], r[1]) for r in rows]
-        finally:
-            await conn.close()
+
+    async def claim_pending_urls(self, *, limit: int, claimed_at: int) -> list[tuple[str, str | None]]:
+        """Atomically mark up to `limit` pending URLs as processing and return them.
+
+        Same order as `get_pending_urls`, but a claimed URL is never handed out twice.
+        """
+
+        async with self._write() as conn:
+            async with conn.execute(_SQL_CLAIM_PENDING, (claimed_at, limit)) as cur:
+                rows = await cur.fetchall()
+            await self._commit(conn)
+        # RETURNING order is unspecified; restore the queue order.
+        rows = sorted(rows, key=lambda r: (r[2], r[3]))
+        return [(r[0], r[1]) for r in rows]
+
+    async def release_claimed_urls(self, *, urls: Iterable[str]) -> None:
+        """Put claimed-but-unprocessed URLs back in the queue."""
+
+        async with self._write() as conn:
+            await conn.executemany(_SQL_RELEASE_CLAIMED, [(u,) for u in urls])
+            await self._commit(conn)
+
+    async def requeue_in_progress(self) -> None:
+        """Re-queue URLs left in processing by an interrupted run."""
+
+        async with self._write() as conn:
+            await conn.execute("UPDATE urls SET status='queued' WHERE status='processing'")
+            await self._commit(conn)
 
     async def clear_pending_urls(self) -> None:
         """Abandon any queued/retry/processing URLs.
@@ -378,14 +1176,11 @@ class Database:
         a previous queue when the user provides new seed URLs.
         """
 
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             await conn.execute(
                 "UPDATE urls SET status='abandoned' WHERE status IN ('queued','retry','processing')"
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def add_document(
         self,
@@ -399,8 +1194,7 @@ class Database:
         local_path: str,
         fetched_at: str,
     ) -> int:
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             async with conn.execute("SELECT id FROM documents WHERE sha256=?", (sha256,)) as cur:
                 row = await cur.fetchone()
                 if row:
@@ -409,41 +1203,40 @@ class Database:
                 "INSERT INTO documents(url,final_url,title,content_type,file_size,sha256,local_path,fetched_at) VALUES(?,?,?,?,?,?,?,?)",
                 (url, final_url, title, content_type, file_size, sha256, local_path, fetched_at),
             )
-            await conn.commit()
+            await self._commit(conn)
             return int(cur.lastrowid)
-        finally:
-            await conn.close()
 
     async def add_fts_content(self, *, doc_id: int, url: str, title: str, content: str) -> None:
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             await conn.execute(
                 "INSERT INTO fts_docs(doc_id,url,title,content) VALUES(?,?,?,?)",
                 (doc_id, url, title, content),
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def kv_get(self, key: str) -> str | None:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute("SELECT value FROM kv WHERE key=?", (key,)) as cur:
                 row = await cur.fetchone()
                 return (str(row[0]) if row else None)
-        finally:
-            await conn.close()
+
+    async def kv_get_many(self, keys: list[str]) -> dict[str, str]:
+        """Values for the keys that are set, in one query."""
+
+        async with self._read() as conn:
+            async with conn.execute(
+                "SELECT key,value FROM kv WHERE key IN (SELECT value FROM json_each(?))",
+                (json_dumps([str(k) for k in keys]),),
+            ) as cur:
+                return {str(k): str(v) for k, v in await cur.fetchall()}
 
     async def kv_set(self, key: str, value: str) -> None:
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             await conn.execute(
                 "INSERT INTO kv(key,value) VALUES(?,?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
                 (key, value),
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def add_page_flags(
         self,
@@ -458,58 +1251,34 @@ class Database:
             flag = str(f.get("flag") or "")
             score = float(f.get("score") or 0.0)
             details = f.get("details")
-            details_json = json.dumps(details) if details is not None else None
+            details_json = json_dumps(details) if details is not None else None
             if page_no <= 0 or not flag:
                 continue
             rows.append((doc_id, page_no, flag, score, details_json, created_at))
         if not rows:
             return
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
+            await self._begin(conn)
             await conn.executemany(
                 "INSERT INTO doc_page_flags(doc_id,page_no,flag,score,details_json,created_at) VALUES(?,?,?,?,?,?)",
                 rows,
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def query_page_flags_for_doc(self, *, doc_id: int, flag: str | None = None) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             if flag:
-                sql = (
-                    "SELECT page_no,flag,score,details_json,created_at FROM doc_page_flags WHERE doc_id=? AND flag=? ORDER BY score DESC, page_no ASC"
-                )
-                params = (doc_id, flag)
+                sql, params = _SQL_PAGE_FLAGS_FOR_DOC_AND_FLAG, (doc_id, flag)
             else:
-                sql = (
-                    "SELECT page_no,flag,score,details_json,created_at FROM doc_page_flags WHERE doc_id=? ORDER BY score DESC, page_no ASC"
-                )
-                params = (doc_id,)
+                sql, params = _SQL_PAGE_FLAGS_FOR_DOC, (doc_id,)
             async with conn.execute(sql, params) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "page_no": int(r[0]),
-                            "flag": r[1],
-                            "score": float(r[2]),
-                            "details": json.loads(r[3]) if r[3] else None,
-                            "created_at": r[4],
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                return [_page_flag_dict(r) for r in await cur.fetchall()]
 
     async def set_review_status(self, *, doc_id: int, status: str, updated_at: str) -> None:
         st = (status or "new").strip().lower()
         if st not in {"new", "reviewed", "ignored", "irrelevant", "high_value"}:
             st = "new"
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             if st == "new":
                 await conn.execute("DELETE FROM doc_reviews WHERE doc_id=?", (doc_id,))
             else:
@@ -518,47 +1287,39 @@ class Database:
                     "ON CONFLICT(doc_id) DO UPDATE SET status=excluded.status, updated_at=excluded.updated_at",
                     (doc_id, st, updated_at),
                 )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def get_review_status(self, *, doc_id: int) -> str:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute("SELECT status FROM doc_reviews WHERE doc_id=?", (doc_id,)) as cur:
                 row = await cur.fetchone()
                 return str(row[0]) if row and row[0] else "new"
-        finally:
-            await conn.close()
 
     async def get_document(self, *, doc_id: int) -> dict[str, Any]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT id,url,final_url,title,content_type,file_size,sha256,local_path,fetched_at,relevance_score,topic_similarity,entity_density,url_penalty "
+                "SELECT id,url,final_url,COALESCE(title,''),COALESCE(content_type,''),file_size,COALESCE(sha256,''),"
+                "COALESCE(local_path,''),COALESCE(fetched_at,''),relevance_score,topic_similarity,entity_density,url_penalty "
                 "FROM documents WHERE id=?",
                 (int(doc_id),),
             ) as cur:
                 r = await cur.fetchone()
-                if not r:
-                    return {}
-                return {
-                    "doc_id": int(r[0]),
-                    "url": r[1],
-                    "final_url": r[2],
-                    "title": r[3] or "",
-                    "content_type": r[4] or "",
-                    "file_size": (int(r[5]) if r[5] is not None else None),
-                    "sha256": r[6] or "",
-                    "local_path": r[7] or "",
-                    "fetched_at": r[8] or "",
-                    "relevance_score": (float(r[9]) if r[9] is not None else None),
-                    "topic_similarity": (float(r[10]) if r[10] is not None else None),
-                    "entity_density": (float(r[11]) if r[11] is not None else None),
-                    "url_penalty": (float(r[12]) if r[12] is not None else None),
-                }
-        finally:
-            await conn.close()
+                return dict(zip(_DOCUMENT_COLS, r)) if r else {}
+
+    async def get_document_full(self, *, doc_id: int) -> dict[str, Any]:
+        """`get_document` plus `review_status` and `redaction_max`, in one query."""
+
+        async with self._read() as conn:
+            async with conn.execute(
+                "SELECT d.id,d.url,d.final_url,COALESCE(d.title,''),COALESCE(d.content_type,''),d.file_size,COALESCE(d.sha256,''),"
+                "COALESCE(d.local_path,''),COALESCE(d.fetched_at,''),d.relevance_score,d.topic_similarity,d.entity_density,d.url_penalty,"
+                f"{_REVIEW_STATUS_SQL},"
+                "(SELECT MAX(score) FROM doc_page_flags WHERE flag='redaction' AND doc_id=d.id) "
+                "FROM documents d LEFT JOIN doc_reviews r ON r.doc_id=d.id WHERE d.id=?",
+                (int(doc_id),),
+            ) as cur:
+                r = await cur.fetchone()
+                return dict(zip(_DOCUMENT_FULL_COLS, r)) if r else {}
 
     async def update_document_metrics(
         self,
@@ -569,8 +1330,7 @@ class Database:
         entity_density: float | None,
         url_penalty: float | None,
     ) -> None:
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
             await conn.execute(
                 "UPDATE documents SET relevance_score=?, topic_similarity=?, entity_density=?, url_penalty=? WHERE id=?",
                 (
@@ -581,58 +1341,35 @@ class Database:
                     int(doc_id),
                 ),
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def update_paths_for_sha256(self, *, sha256: str, local_path: str) -> None:
         sha = (sha256 or "").strip().lower()
         if not sha:
             return
-        conn = await self._connect()
-        try:
+        # The affected URLs aren't known without a query; drop the whole cache.
+        self._url_records.clear()
+        async with self._write() as conn:
+            await self._begin(conn)
             await conn.execute("UPDATE documents SET local_path=? WHERE sha256=?", (local_path, sha))
             await conn.execute("UPDATE urls SET local_path=? WHERE sha256=?", (local_path, sha))
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def query_flagged_with_metrics(self, *, limit: int = 5000) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT d.id,d.url,d.title,d.local_path,d.fetched_at,COUNT(m.id) AS match_count,"
-                "d.relevance_score,d.topic_similarity,d.entity_density,d.url_penalty,COALESCE(r.status,'new') as review_status "
-                "FROM documents d JOIN matches m ON m.doc_id=d.id "
+                "SELECT d.id,d.url,COALESCE(d.title,''),COALESCE(d.local_path,''),COALESCE(d.fetched_at,''),"
+                f"({_MATCH_COUNT_SQL}) AS match_count,"
+                f"d.relevance_score,d.topic_similarity,d.entity_density,d.url_penalty,{_REVIEW_STATUS_SQL} as review_status "
+                "FROM documents d "
                 "LEFT JOIN doc_reviews r ON r.doc_id=d.id "
-                "GROUP BY d.id ORDER BY d.fetched_at DESC LIMIT ?",
+                f"WHERE {_HAS_MATCHES_SQL} ORDER BY d.fetched_at DESC LIMIT ?",
                 (int(limit),),
             ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "doc_id": int(r[0]),
-                            "url": r[1],
-                            "title": r[2] or "",
-                            "local_path": r[3] or "",
-                            "fetched_at": r[4] or "",
-                            "match_count": int(r[5]),
-                            "relevance_score": (float(r[6]) if r[6] is not None else None),
-                            "topic_similarity": (float(r[7]) if r[7] is not None else None),
-                            "entity_density": (float(r[8]) if r[8] is not None else None),
-                            "url_penalty": (float(r[9]) if r[9] is not None else None),
-                            "review_status": str(r[10]) if r[10] else "new",
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                return _row_dicts(_FLAGGED_COLS, await cur.fetchall())
 
     async def get_feedback_centroid(self, *, label: str, model_name: str):
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
                 "SELECT vector,norm,count FROM feedback_centroids WHERE label=? AND model_name=?",
                 (str(label), str(model_name)),
@@ -640,149 +1377,112 @@ class Database:
                 r = await cur.fetchone()
                 if not r:
                     return None
-                from doj_disclosures.core.embeddings import blob_to_vector
+                from doj_disclosures.core.embeddings import blob_to_float32_array
                 from doj_disclosures.core.feedback import Centroid
 
-                return Centroid(vec=blob_to_vector(bytes(r[0])), norm=float(r[1]), count=int(r[2]))
-        finally:
-            await conn.close()
+                return Centroid(vec=blob_to_float32_array(r[0]), norm=float(r[1]), count=int(r[2]))
 
     async def set_feedback_centroid(self, *, label: str, model_name: str, centroid) -> None:
-        # centroid: doj_disclosures.core.feedback.Centroid
+        # centroid: doj_disclosures.core.feedback.Centroid; an array('f') vec is written as-is.
         from doj_disclosures.core.embeddings import vector_to_blob
 
-        blob, norm = vector_to_blob(list(centroid.vec))
-        conn = await self._connect()
-        try:
+        blob, norm = vector_to_blob(centroid.vec)
+        async with self._write() as conn:
             await conn.execute(
                 "INSERT INTO feedback_centroids(label,model_name,vector,norm,count,updated_at) VALUES(?,?,?,?,?,?) "
                 "ON CONFLICT(label,model_name) DO UPDATE SET vector=excluded.vector,norm=excluded.norm,count=excluded.count,updated_at=excluded.updated_at",
                 (str(label), str(model_name), blob, float(norm), int(centroid.count), datetime.now(timezone.utc).isoformat()),
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def get_review_status_map(self, *, doc_ids: list[int]) -> dict[int, str]:
         ids = [int(x) for x in doc_ids if int(x) > 0]
         if not ids:
             return {}
-        conn = await self._connect()
-        try:
-            ph = ",".join(["?"] * len(ids))
-            async with conn.execute(f"SELECT doc_id,status FROM doc_reviews WHERE doc_id IN ({ph})", tuple(ids)) as cur:
-                rows = await cur.fetchall()
-                return {int(r[0]): (str(r[1]) if r[1] else "new") for r in rows}
-        finally:
-            await conn.close()
+        out: dict[int, str] = {}
+        async with self._read() as conn:
+            async with conn.execute(_SQL_REVIEW_STATUS_FOR_IDS, (json_dumps(ids),)) as cur:
+                for r in await cur.fetchall():
+                    out[int(r[0])] = str(r[1]) if r[1] else "new"
+        return out
 
-    async def get_known_document_urls(self) -> list[str]:
+    async def iter_known_document_urls(self, *, chunk_size: int = 1000) -> AsyncIterator[str]:
         # Heuristic: known downloadable suffixes.
-        conn = await self._connect()
-        try:
-            async with conn.execute(
-                "SELECT url FROM urls WHERE status <> 'abandoned' AND ("
-                "lower(url) LIKE '%.pdf' OR lower(url) LIKE '%.doc' OR lower(url) LIKE '%.docx' OR lower(url) LIKE '%.txt' OR lower(url) LIKE '%.html' OR lower(url) LIKE '%.htm'"
-                ")"
-            ) as cur:
-                rows = await cur.fetchall()
-                return [str(r[0]) for r in rows if r and r[0]]
-        finally:
-            await conn.close()
+        async with self._read() as conn:
+            async with conn.execute("SELECT url FROM urls WHERE status <> 'abandoned' AND is_document=1") as cur:
+                while rows := await cur.fetchmany(chunk_size):
+                    for r in rows:
+                        if r and r[0]:
+                            yield str(r[0])
 
-    async def get_release_snapshot_rows(self) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+    async def get_known_document_urls(self) -> list[str]:
+        return [u async for u in self.iter_known_document_urls()]
+
+    async def iter_release_snapshot_rows(self, *, chunk_size: int = 1000) -> AsyncIterator[dict[str, Any]]:
+        """Yield snapshot rows for every non-abandoned URL, fetched `chunk_size` at a time."""
+
+        async with self._read() as conn:
             async with conn.execute(
                 "SELECT url,status,http_status,content_type,title,final_url,local_path,sha256,etag,last_modified,last_attempt_at,discovered_at "
                 "FROM urls WHERE status <> 'abandoned'"
             ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "url": r[0],
-                            "status": r[1],
-                            "http_status": int(r[2]) if r[2] is not None else None,
-                            "content_type": r[3],
-                            "title": r[4],
-                            "final_url": r[5],
-                            "local_path": r[6],
-                            "sha256": r[7],
-                            "etag": r[8],
-                            "last_modified": r[9],
-                            "last_attempt_at": r[10],
-                            "discovered_at": r[11],
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                while rows := await cur.fetchmany(chunk_size):
+                    for d in _row_dicts(_SNAPSHOT_COLS, rows):
+                        yield d
+
+    async def get_release_snapshot_rows(self) -> list[dict[str, Any]]:
+        return [r async for r in self.iter_release_snapshot_rows()]
 
     async def get_redaction_max_map(self, *, doc_ids: list[int]) -> dict[int, float]:
         ids = [int(x) for x in doc_ids if int(x) > 0]
         if not ids:
             return {}
-        conn = await self._connect()
-        try:
-            ph = ",".join(["?"] * len(ids))
-            async with conn.execute(
-                f"SELECT doc_id, MAX(score) FROM doc_page_flags WHERE flag='redaction' AND doc_id IN ({ph}) GROUP BY doc_id",
-                tuple(ids),
-            ) as cur:
-                rows = await cur.fetchall()
-                return {int(r[0]): float(r[1]) for r in rows if r and r[1] is not None}
-        finally:
-            await conn.close()
+        out: dict[int, float] = {}
+        async with self._read() as conn:
+            async with conn.execute(_SQL_REDACTION_MAX_FOR_IDS, (json_dumps(ids),)) as cur:
+                for r in await cur.fetchall():
+                    if r and r[1] is not None:
+                        out[int(r[0])] = float(r[1])
+        return out
 
-    async def get_fts_content(self, *, doc_id: int) -> str | None:
-        conn = await self._connect()
-        try:
-            async with conn.execute("SELECT content FROM fts_docs WHERE doc_id=?", (doc_id,)) as cur:
+    async def get_fts_content(self, *, doc_id: int, max_chars: int | None = None) -> str | None:
+        """Indexed text of a document; `max_chars` truncates it in SQLite before it is copied out."""
+
+        if max_chars is None:
+            sql, params = "SELECT content FROM fts_docs WHERE doc_id=?", (doc_id,)
+        else:
+            sql, params = "SELECT substr(content,1,?) FROM fts_docs WHERE doc_id=?", (max(0, int(max_chars)), doc_id)
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cur:
                 row = await cur.fetchone()
                 if not row:
                     return None
                 return str(row[0]) if row[0] is not None else None
-        finally:
-            await conn.close()
 
     async def fts_search(self, *, query: str, limit: int = 200) -> list[dict[str, Any]]:
         q = (query or "").strip()
         if not q:
             return []
-        conn = await self._connect()
-        try:
-            # FTS5: lower bm25() is better; we'll return it as-is.
-            async with conn.execute(
-                "SELECT doc_id, url, title, bm25(fts_docs) as bm25 FROM fts_docs WHERE fts_docs MATCH ? ORDER BY bm25 ASC LIMIT ?",
-                (q, int(limit)),
-            ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "doc_id": int(r[0]),
-                            "url": r[1],
-                            "title": r[2] or "",
-                            "bm25": float(r[3]) if r[3] is not None else 0.0,
-                        }
-                    )
-                return out
-        except Exception:
-            # Defensive fallback: if MATCH query syntax is invalid, do a simple LIKE.
+        async with self._read() as conn:
+            for match in _fts_match_candidates(q):
+                try:
+                    # FTS5: lower bm25() is better; we'll return it as-is.
+                    async with conn.execute(
+                        "SELECT CAST(doc_id AS INTEGER), url, COALESCE(title,''), bm25(fts_docs) as bm25 "
+                        "FROM fts_docs WHERE fts_docs MATCH ? ORDER BY bm25 ASC LIMIT ?",
+                        (match, int(limit)),
+                    ) as cur:
+                        return _row_dicts(_FTS_COLS, await cur.fetchall())
+                except sqlite3.Error:
+                    continue
+            # Defensive fallback: if even the quoted query is rejected, do a simple LIKE.
             like = f"%{q}%"
             async with conn.execute(
-                "SELECT doc_id, url, title, 0.0 as bm25 FROM fts_docs WHERE title LIKE ? OR content LIKE ? LIMIT ?",
+                "SELECT CAST(doc_id AS INTEGER), url, COALESCE(title,''), 0.0 as bm25 "
+                "FROM fts_docs WHERE title LIKE ? OR content LIKE ? LIMIT ?",
                 (like, like, int(limit)),
             ) as cur:
-                rows = await cur.fetchall()
-                return [
-                    {"doc_id": int(r[0]), "url": r[1], "title": r[2] or "", "bm25": 0.0} for r in rows
-                ]
-        finally:
-            await conn.close()
+                return _row_dicts(_FTS_COLS, await cur.fetchall())
 
     async def fts_search_with_metrics(self, *, query: str, limit: int = 200) -> list[dict[str, Any]]:
         """FTS search that also returns stored document metrics and review status.
@@ -793,76 +1493,66 @@ class Database:
         q = (query or "").strip()
         if not q:
             return []
-        conn = await self._connect()
-        try:
-            # FTS5: lower bm25() is better.
-            async with conn.execute(
-                "SELECT f.doc_id, f.url, f.title, bm25(f) as bm25, "
-                "d.relevance_score, d.topic_similarity, d.entity_density, d.url_penalty, COALESCE(r.status,'new') as review_status "
-                "FROM fts_docs f "
-                "LEFT JOIN documents d ON d.id=f.doc_id "
-                "LEFT JOIN doc_reviews r ON r.doc_id=f.doc_id "
-                "WHERE f MATCH ? ORDER BY bm25 ASC LIMIT ?",
-                (q, int(limit)),
-            ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "doc_id": int(r[0]),
-                            "url": r[1],
-                            "title": r[2] or "",
-                            "bm25": float(r[3]) if r[3] is not None else 0.0,
-                            "relevance_score": (float(r[4]) if r[4] is not None else None),
-                            "topic_similarity": (float(r[5]) if r[5] is not None else None),
-                            "entity_density": (float(r[6]) if r[6] is not None else None),
-                            "url_penalty": (float(r[7]) if r[7] is not None else None),
-                            "review_status": str(r[8]) if r[8] else "new",
-                        }
-                    )
-                return out
-        except Exception:
+        async with self._read() as conn:
+            for match in _fts_match_candidates(q):
+                try:
+                    # FTS5: lower bm25() is better.
+                    async with conn.execute(
+                        "SELECT CAST(f.doc_id AS INTEGER), f.url, COALESCE(f.title,''), bm25(f) as bm25, "
+                        f"d.relevance_score, d.topic_similarity, d.entity_density, d.url_penalty, {_REVIEW_STATUS_SQL} as review_status "
+                        "FROM fts_docs f "
+                        "LEFT JOIN documents d ON d.id=f.doc_id "
+                        "LEFT JOIN doc_reviews r ON r.doc_id=f.doc_id "
+                        "WHERE f MATCH ? ORDER BY bm25 ASC LIMIT ?",
+                        (match, int(limit)),
+                    ) as cur:
+                        return _row_dicts(_FTS_METRICS_COLS, await cur.fetchall())
+                except sqlite3.Error:
+                    continue
             like = f"%{q}%"
             async with conn.execute(
-                "SELECT f.doc_id, f.url, f.title, 0.0 as bm25, "
-                "d.relevance_score, d.topic_similarity, d.entity_density, d.url_penalty, COALESCE(r.status,'new') as review_status "
+                "SELECT CAST(f.doc_id AS INTEGER), f.url, COALESCE(f.title,''), 0.0 as bm25, "
+                f"d.relevance_score, d.topic_similarity, d.entity_density, d.url_penalty, {_REVIEW_STATUS_SQL} as review_status "
                 "FROM fts_docs f "
                 "LEFT JOIN documents d ON d.id=f.doc_id "
                 "LEFT JOIN doc_reviews r ON r.doc_id=f.doc_id "
                 "WHERE f.title LIKE ? OR f.content LIKE ? LIMIT ?",
                 (like, like, int(limit)),
             ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "doc_id": int(r[0]),
-                            "url": r[1],
-                            "title": r[2] or "",
-                            "bm25": 0.0,
-                            "relevance_score": (float(r[4]) if r[4] is not None else None),
-                            "topic_similarity": (float(r[5]) if r[5] is not None else None),
-                            "entity_density": (float(r[6]) if r[6] is not None else None),
-                            "url_penalty": (float(r[7]) if r[7] is not None else None),
-                            "review_status": str(r[8]) if r[8] else "new",
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                return _row_dicts(_FTS_METRICS_COLS, await cur.fetchall())
 
     async def add_matches(self, *, doc_id: int, matches: Iterable[tuple[str, str, float, str]], created_at: str) -> None:
-        conn = await self._connect()
-        try:
+        rows = [(doc_id, m, p, s, sn, created_at) for (m, p, s, sn) in matches]
+        if not rows:
+            return
+        async with self._write() as conn:
+            # One explicit transaction for the whole document's hits: a single commit/fsync.
+            await self._begin(conn)
             await conn.executemany(
                 "INSERT INTO matches(doc_id,method,pattern,score,snippet,created_at) VALUES(?,?,?,?,?,?)",
-                [(doc_id, m, p, s, sn, created_at) for (m, p, s, sn) in matches],
+                rows,
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
+
+    async def add_doc_bundle(
+        self,
+        *,
+        doc_id: int,
+        created_at: str,
+        matches: Iterable[tuple[str, str, float, str]] = (),
+        page_flags: list[dict[str, Any]] | None = None,
+        tables: Iterable[dict[str, Any]] = (),
+        entities: Iterable[dict[str, Any]] = (),
+        embeddings: Iterable[dict[str, Any]] = (),
+    ) -> None:
+        """Store all derived rows for a document in a single transaction (one commit)."""
+
+        async with self.transaction():
+            await self.add_matches(doc_id=doc_id, matches=matches, created_at=created_at)
+            await self.add_page_flags(doc_id=doc_id, flags=page_flags or [], created_at=created_at)
+            await self.add_tables(doc_id=doc_id, tables=tables, created_at=created_at)
+            await self.add_entities(doc_id=doc_id, entities=entities, created_at=created_at)
+            await self.add_embeddings(doc_id=doc_id, embeddings=embeddings, created_at=created_at)
 
     async def add_tables(
         self,
@@ -876,46 +1566,28 @@ class Database:
             page_no = int(t.get("page_no") or 0)
             table_index = int(t.get("table_index") or 0)
             fmt = str(t.get("format") or "rows")
-            data_json = json.dumps(t.get("data") or [])
+            data_json = json_dumps(t.get("data") or [])
             bbox = t.get("bbox")
-            bbox_json = json.dumps(bbox) if bbox is not None else None
+            bbox_json = json_dumps(bbox) if bbox is not None else None
             rows.append((doc_id, page_no, table_index, fmt, data_json, bbox_json, created_at))
         if not rows:
             return
 
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
+            await self._begin(conn)
             await conn.executemany(
                 "INSERT INTO doc_tables(doc_id,page_no,table_index,format,data_json,bbox_json,created_at) VALUES(?,?,?,?,?,?,?)",
                 rows,
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def query_tables_for_doc(self, doc_id: int) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT page_no,table_index,format,data_json,bbox_json,created_at FROM doc_tables WHERE doc_id=? ORDER BY page_no ASC, table_index ASC",
+                _SQL_TABLES_FOR_DOC,
                 (doc_id,),
             ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "page_no": int(r[0]),
-                            "table_index": int(r[1]),
-                            "format": r[2],
-                            "data": json.loads(r[3]) if r[3] else [],
-                            "bbox": (json.loads(r[4]) if r[4] else None),
-                            "created_at": r[5],
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                return [_table_dict(r) for r in await cur.fetchall()]
 
     async def add_entities(
         self,
@@ -929,29 +1601,31 @@ class Database:
             label = str(e.get("label") or "")
             canonical = str(e.get("canonical") or "")
             display = str(e.get("display") or canonical)
-            count = int(e.get("count") or 1)
-            variants_json = json.dumps(sorted(set(e.get("variants") or [display])))
-            page_nos = e.get("page_nos")
-            page_nos_json = json.dumps(sorted(set(int(x) for x in page_nos))) if page_nos else None
             if not (label and canonical):
                 continue
+            count = int(e.get("count") or 1)
+            variants_json = json_dumps(_sorted_unique(e.get("variants") or [display]))
+            page_nos = e.get("page_nos")
+            page_nos_json = json_dumps(_sorted_unique([int(x) for x in page_nos])) if page_nos else None
             rows.append((doc_id, label, canonical, display, count, variants_json, page_nos_json, created_at))
 
         if not rows:
             return
 
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
+            await self._begin(conn)
             await conn.executemany(
                 "INSERT INTO doc_entities(doc_id,label,canonical,display,count,variants_json,page_nos_json,created_at) "
                 "VALUES(?,?,?,?,?,?,?,?) "
                 "ON CONFLICT(doc_id,label,canonical) DO UPDATE SET "
-                "display=excluded.display, count=excluded.count, variants_json=excluded.variants_json, page_nos_json=excluded.page_nos_json, created_at=excluded.created_at",
+                "display=excluded.display, count=excluded.count, variants_json=excluded.variants_json, page_nos_json=excluded.page_nos_json, created_at=excluded.created_at "
+                # Leave identical rows untouched so re-ingesting a document doesn't rewrite pages.
+                "WHERE excluded.display IS NOT doc_entities.display OR excluded.count IS NOT doc_entities.count "
+                "OR excluded.variants_json IS NOT doc_entities.variants_json "
+                "OR excluded.page_nos_json IS NOT doc_entities.page_nos_json",
                 rows,
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
 
     async def add_embeddings(
         self,
@@ -960,99 +1634,146 @@ class Database:
         embeddings: Iterable[dict[str, Any]],
         created_at: str,
     ) -> None:
-        rows: list[tuple[int, int, int | None, int | None, str, bytes, float, str]] = []
+        """Store a document's chunk embeddings, replacing any it had for the same model.
+
+        Each model's chunks are packed into one `doc_embeddings_packed` row. Chunks
+        that can't share a layout (mixed vector sizes or int8/float32) fall back to
+        one `doc_embeddings` row each.
+        """
+
+        by_model: dict[str, dict[int, dict[str, Any]]] = {}
         for e in embeddings:
-            chunk_index = int(e.get("chunk_index") or 0)
-            start_offset = e.get("start_offset")
-            end_offset = e.get("end_offset")
             model_name = str(e.get("model_name") or "")
-            vector = e.get("vector")
-            norm = float(e.get("norm") or 0.0)
-            if not model_name or not isinstance(vector, (bytes, bytearray)):
+            if not model_name or not isinstance(e.get("vector"), (bytes, bytearray)):
                 continue
-            rows.append(
-                (
-                    doc_id,
-                    chunk_index,
-                    int(start_offset) if start_offset is not None else None,
-                    int(end_offset) if end_offset is not None else None,
-                    model_name,
-                    bytes(vector),
-                    norm,
-                    created_at,
-                )
-            )
-        if not rows:
+            by_model.setdefault(model_name, {})[int(e.get("chunk_index") or 0)] = e
+        if not by_model:
             return
-        conn = await self._connect()
-        try:
+
+        packed: list[tuple[Any, ...]] = []
+        unpacked: dict[str, list[dict[str, Any]]] = {}
+        for model_name, chunks in by_model.items():
+            ordered = [chunks[i] for i in sorted(chunks)]
+            pack = _pack_embeddings(ordered)
+            if pack is not None:
+                packed.append((doc_id, model_name, *pack, created_at))
+            else:
+                unpacked[model_name] = ordered
+
+        def legacy_rows() -> Iterator[tuple[Any, ...]]:
+            # Consumed by executemany as it inserts, so no second list of row tuples is held.
+            for model_name, ordered in unpacked.items():
+                for e in ordered:
+                    start_offset = e.get("start_offset")
+                    end_offset = e.get("end_offset")
+                    scale = e.get("scale")
+                    yield (
+                        doc_id,
+                        int(e.get("chunk_index") or 0),
+                        int(start_offset) if start_offset is not None else None,
+                        int(end_offset) if end_offset is not None else None,
+                        model_name,
+                        _as_bytes(e["vector"]),
+                        float(e.get("norm") or 0.0),
+                        float(scale) if scale is not None else None,
+                        created_at,
+                    )
+
+        async with self._write() as conn:
+            await self._begin(conn)
             await conn.executemany(
-                "INSERT INTO doc_embeddings(doc_id,chunk_index,start_offset,end_offset,model_name,vector,norm,created_at) "
-                "VALUES(?,?,?,?,?,?,?,?) "
-                "ON CONFLICT(doc_id, model_name, chunk_index) DO UPDATE SET "
-                "start_offset=excluded.start_offset, end_offset=excluded.end_offset, vector=excluded.vector, norm=excluded.norm, created_at=excluded.created_at",
-                rows,
+                "DELETE FROM doc_embeddings WHERE doc_id=? AND model_name=?",
+                [(doc_id, m) for m in by_model],
             )
-            await conn.commit()
-        finally:
-            await conn.close()
+            if packed:
+                await conn.executemany(
+                    "INSERT INTO doc_embeddings_packed(doc_id,model_name,dim,count,vectors,scales,norms,chunks,created_at) "
+                    "VALUES(?,?,?,?,?,?,?,?,?) "
+                    "ON CONFLICT(doc_id, model_name) DO UPDATE SET dim=excluded.dim, count=excluded.count, "
+                    "vectors=excluded.vectors, scales=excluded.scales, norms=excluded.norms, chunks=excluded.chunks, "
+                    "created_at=excluded.created_at",
+                    packed,
+                )
+            if unpacked:
+                await conn.executemany(
+                    "DELETE FROM doc_embeddings_packed WHERE doc_id=? AND model_name=?",
+                    [(doc_id, m) for m in unpacked],
+                )
+                await conn.executemany(
+                    "INSERT INTO doc_embeddings(doc_id,chunk_index,start_offset,end_offset,model_name,vector,norm,scale,created_at) "
+                    "VALUES(?,?,?,?,?,?,?,?,?)",
+                    legacy_rows(),
+                )
+            await self._commit(conn)
 
     async def query_embeddings_for_doc(self, *, doc_id: int, model_name: str) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT chunk_index,start_offset,end_offset,vector,norm FROM doc_embeddings WHERE doc_id=? AND model_name=? ORDER BY chunk_index ASC",
+                "SELECT dim,count,vectors,scales,norms,chunks FROM doc_embeddings_packed WHERE doc_id=? AND model_name=?",
                 (doc_id, model_name),
             ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "chunk_index": int(r[0]),
-                            "start_offset": (int(r[1]) if r[1] is not None else None),
-                            "end_offset": (int(r[2]) if r[2] is not None else None),
-                            "vector": bytes(r[3]),
-                            "norm": float(r[4]) if r[4] is not None else 0.0,
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                packed = await cur.fetchone()
+            if packed is not None:
+                return _unpack_embeddings(*packed)
+            async with conn.execute(
+                f"SELECT {_LEGACY_EMBEDDING_SELECT} FROM doc_embeddings WHERE doc_id=? AND model_name=? ORDER BY chunk_index ASC",
+                (doc_id, model_name),
+            ) as cur:
+                return [_legacy_embedding_dict(r) for r in await cur.fetchall()]
+
+    async def query_embeddings_for_docs(self, *, doc_ids: Iterable[int], model_name: str) -> dict[int, list[dict[str, Any]]]:
+        """`query_embeddings_for_doc` for many documents at once; docs without embeddings are absent."""
+
+        ids = sorted({int(x) for x in doc_ids})
+        out: dict[int, list[dict[str, Any]]] = {}
+        if not ids:
+            return out
+        async with self._read() as conn:
+            async with conn.execute(_SQL_PACKED_EMBEDDINGS_FOR_IDS, (model_name, json_dumps(ids))) as cur:
+                for r in await cur.fetchall():
+                    out[int(r[0])] = _unpack_embeddings(*r[1:])
+            # A packed row supersedes legacy rows (as in query_embeddings_for_doc), so only
+            # the remaining ids are looked up there, and not at all once every doc is packed.
+            rest = [doc_id for doc_id in ids if doc_id not in out]
+            if rest:
+                async with conn.execute(_SQL_LEGACY_EMBEDDINGS_FOR_IDS, (model_name, json_dumps(rest))) as cur:
+                    for r in await cur.fetchall():
+                        out.setdefault(int(r[0]), []).append(_legacy_embedding_dict(r[1:]))
+        return out
+
+    async def embedding_stamps_for_docs(self, *, doc_ids: Iterable[int], model_name: str) -> dict[int, str]:
+        """A token per document that changes when its embeddings are rewritten; docs without embeddings are absent.
+
+        Reads no vectors, so callers can validate cached per-document scores cheaply.
+        """
+
+        ids = sorted({int(x) for x in doc_ids})
+        out: dict[int, str] = {}
+        if not ids:
+            return out
+        async with self._read() as conn:
+            async with conn.execute(_SQL_PACKED_EMBEDDING_STAMPS_FOR_IDS, (model_name, json_dumps(ids))) as cur:
+                for doc_id, stamp in await cur.fetchall():
+                    out[int(doc_id)] = str(stamp)
+            rest = [doc_id for doc_id in ids if doc_id not in out]
+            if rest:
+                async with conn.execute(_SQL_LEGACY_EMBEDDING_STAMPS_FOR_IDS, (model_name, json_dumps(rest))) as cur:
+                    for doc_id, stamp in await cur.fetchall():
+                        out[int(doc_id)] = str(stamp)
+        return out
 
     async def query_entities_for_doc(self, doc_id: int) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT label,canonical,display,count,variants_json,page_nos_json,created_at "
-                "FROM doc_entities WHERE doc_id=? ORDER BY label ASC, count DESC, display ASC",
+                _SQL_ENTITIES_FOR_DOC,
                 (doc_id,),
             ) as cur:
-                rows = await cur.fetchall()
-                out: list[dict[str, Any]] = []
-                for r in rows:
-                    out.append(
-                        {
-                            "label": r[0],
-                            "canonical": r[1],
-                            "display": r[2],
-                            "count": int(r[3]),
-                            "variants": json.loads(r[4]) if r[4] else [],
-                            "page_nos": json.loads(r[5]) if r[5] else [],
-                            "created_at": r[6],
-                        }
-                    )
-                return out
-        finally:
-            await conn.close()
+                return [_entity_dict(r) for r in await cur.fetchall()]
 
     async def query_flagged(self, limit: int = 500) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT d.id,d.url,d.title,d.local_path,d.fetched_at,COUNT(m.id) AS match_count "
-                "FROM documents d JOIN matches m ON m.doc_id=d.id "
-                "GROUP BY d.id ORDER BY d.fetched_at DESC LIMIT ?",
+                _SQL_FLAGGED,
                 (limit,),
             ) as cur:
                 rows = await cur.fetchall()
@@ -1067,47 +1788,47 @@ class Database:
                     }
                     for r in rows
                 ]
-        finally:
-            await conn.close()
 
     async def query_matches_for_doc(self, doc_id: int) -> list[dict[str, Any]]:
-        conn = await self._connect()
-        try:
+        async with self._read() as conn:
             async with conn.execute(
-                "SELECT method,pattern,score,snippet,created_at FROM matches WHERE doc_id=? ORDER BY score DESC",
+                _SQL_MATCHES_FOR_DOC,
                 (doc_id,),
             ) as cur:
-                rows = await cur.fetchall()
-                return [
-                    {
-                        "method": r[0],
-                        "pattern": r[1],
-                        "score": float(r[2]),
-                        "snippet": r[3],
-                        "created_at": r[4],
-                    }
-                    for r in rows
-                ]
-        finally:
-            await conn.close()
+                return [_match_dict(r) for r in await cur.fetchall()]
 
     async def export_flagged_json(self, limit: int = 5000) -> list[dict[str, Any]]:
         docs = await self.query_flagged(limit=limit)
+        ids = [int(d["doc_id"]) for d in docs]
+        statuses = await self.get_review_status_map(doc_ids=ids)
+
+        # One query per child table for the whole id set, grouped by doc in Python
+        # (rather than five queries per document).
+        ids_json = json_dumps(ids)
+        children: dict[str, dict[int, list[dict[str, Any]]]] = {}
+        async with self._read() as conn:
+            for key, sql, to_dict in (
+                ("matches", _SQL_EXPORT_MATCHES, _match_dict),
+                ("tables", _SQL_EXPORT_TABLES, _table_dict),
+                ("entities", _SQL_EXPORT_ENTITIES, _entity_dict),
+                ("redactions", _SQL_EXPORT_REDACTIONS, _page_flag_dict),
+            ):
+                by_doc: dict[int, list[dict[str, Any]]] = {}
+                async with conn.execute(sql, (ids_json,)) as cur:
+                    for r in await cur.fetchall():
+                        by_doc.setdefault(int(r[0]), []).append(to_dict(r[1:]))
+                children[key] = by_doc
+
         out: list[dict[str, Any]] = []
-        for d in docs:
-            matches = await self.query_matches_for_doc(int(d["doc_id"]))
-            tables = await self.query_tables_for_doc(int(d["doc_id"]))
-            entities = await self.query_entities_for_doc(int(d["doc_id"]))
-            redactions = await self.query_page_flags_for_doc(doc_id=int(d["doc_id"]), flag="redaction")
-            review_status = await self.get_review_status(doc_id=int(d["doc_id"]))
+        for d, doc_id in zip(docs, ids):
             out.append(
                 {
                     **d,
-                    "matches": matches,
-                    "tables": tables,
-                    "entities": entities,
-                    "redactions": redactions,
-                    "review_status": review_status,
+                    "matches": children["matches"].get(doc_id, []),
+                    "tables": children["tables"].get(doc_id, []),
+                    "entities": children["entities"].get(doc_id, []),
+                    "redactions": children["redactions"].get(doc_id, []),
+                    "review_status": statuses.get(doc_id, "new"),
                 }
             )
         return out
@@ -1123,16 +1844,15 @@ class Database:
         It does not delete files on disk.
         """
 
-        conn = await self._connect()
-        try:
+        async with self._write() as conn:
+            await self._begin(conn)
             await conn.execute("DELETE FROM matches")
             await conn.execute("DELETE FROM documents")
             await conn.execute("DELETE FROM fts_docs")
             await conn.execute("DELETE FROM doc_tables")
             await conn.execute("DELETE FROM doc_entities")
             await conn.execute("DELETE FROM doc_embeddings")
+            await conn.execute("DELETE FROM doc_embeddings_packed")
             await conn.execute("DELETE FROM doc_page_flags")
             await conn.execute("DELETE FROM doc_reviews")
-            await conn.commit()
-        finally:
-            await conn.close()
+            await self._commit(conn)
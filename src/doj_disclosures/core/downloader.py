@@ -14,10 +14,18 @@ from aiolimiter import AsyncLimiter
 from yarl import URL
 
 from doj_disclosures.core.config import CrawlSettings
-from doj_disclosures.core.utils import async_backoff_sleep, atomic_rename, safe_filename
+from doj_disclosures.core.utils import (
+    async_backoff_sleep,
+    atomic_rename,
+    file_digest,
+    safe_filename,
+)
 
 logger = logging.getLogger(__name__)
 
+# Received data is buffered up to this size before being hashed and written.
+_FLUSH_BYTES = 4 * 1024 * 1024
+
 
 class NotModifiedError(RuntimeError):
     def __init__(self, url: str) -> None:
@@ -25,6 +33,11 @@ class NotModifiedError(RuntimeError):
         self.url = url
 
 
+def _looks_like_pdf(head: bytes) -> bool:
+    # Strip common whitespace; PDFs should start with %PDF-
+    return head.lstrip(b"\r\n\t ").startswith(b"%PDF-")
+
+
 @dataclass(frozen=True)
 class DownloadResult:
     url: str
@@ -68,38 +81,65 @@ class Downloader:
             self._limiter = AsyncLimiter(max_rate=rps, time_period=1.0)
         else:
             self._limiter = AsyncLimiter(max_rate=1.0, time_period=1.0 / rps)
+        scratch_dir = str(getattr(settings, "scratch_dir", "") or "").strip()
+        self._parts_dir = Path(scratch_dir).expanduser() if scratch_dir else output_dir / ".parts"
         self._host_throttle: dict[str, _HostThrottleState] = {}
         self._host_throttle_lock = asyncio.Lock()
 
-    async def _await_host_slot(self, url: str) -> None:
+    async def aclose(self) -> None:
+        """Remove the `.parts` staging directory if no partial downloads are left in it.
+
+        Done once when the run finishes rather than after every download. A
+        user-configured scratch directory is left in place.
+        """
+
+        parts_dir = self._parts_dir
+        if parts_dir != self._output_dir / ".parts":
+            return
+        try:
+            if parts_dir.exists() and not any(parts_dir.iterdir()):
+                parts_dir.rmdir()
+        except Exception:
+            # Best effort; a leftover empty directory is harmless.
+            pass
+
+    async def _await_host_slot(self, host: str) -> None:
         """Adaptive per-host pacing.
 
         Keeps request spacing roughly at 1/rps per host, and backs off on 429/5xx.
+        Each caller reserves the next free slot under the lock and then waits for it,
+        returning early on stop. A cancelled caller hands its slot back when nobody has
+        reserved one after it.
         """
 
         base_rps = max(0.1, float(self._settings.requests_per_second))
-        host = (urlparse(url).netloc or "").lower()
         if not host:
             return
 
-        while True:
+        await self._pause.wait()
+        if self._stop.is_set():
+            return
+
+        async with self._host_throttle_lock:
+            st = self._host_throttle.setdefault(host, _HostThrottleState())
+            now = monotonic()
+            effective_rps = base_rps * max(0.2, min(1.0, st.penalty))
+            spacing = 1.0 / max(0.1, effective_rps)
+            slot = max(now, st.next_allowed_at)
+            st.next_allowed_at = slot + spacing
+        if slot > now:
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=slot - now)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # No await between check and write, so this can't race other reservations.
+                if st.next_allowed_at == slot + spacing:
+                    st.next_allowed_at = slot
+                raise
             await self._pause.wait()
-            if self._stop.is_set():
-                return
-
-            async with self._host_throttle_lock:
-                st = self._host_throttle.setdefault(host, _HostThrottleState())
-                now = monotonic()
-                if now >= st.next_allowed_at:
-                    effective_rps = base_rps * max(0.2, min(1.0, st.penalty))
-                    spacing = 1.0 / max(0.1, effective_rps)
-                    st.next_allowed_at = now + spacing
-                    return
-                sleep_for = max(0.0, st.next_allowed_at - now)
-            await asyncio.sleep(min(0.5, sleep_for))
-
-    async def _note_host_result(self, url: str, *, http_status: int) -> None:
-        host = (urlparse(url).netloc or "").lower()
+
+    async def _note_host_result(self, host: str, *, http_status: int) -> None:
         if not host:
             return
         async with self._host_throttle_lock:
@@ -127,13 +167,14 @@ class Downloader:
             headers["Cookie"] = cookie
         if cache_headers:
             headers.update(cache_headers)
+        host = (urlparse(url).netloc or "").lower()
         attempts = 0
         last_exc: Exception | None = None
 
         while attempts <= self._settings.max_retries and not self._stop.is_set():
             await self._pause.wait()
             try:
-                await self._await_host_slot(url)
+                await self._await_host_slot(host)
                 async with self._limiter:
                     return await self._download_once(url, headers=headers, title=title)
             except Exception as e:
@@ -148,8 +189,7 @@ class Downloader:
 
     async def _download_once(self, url: str, headers: dict[str, str], title: str | None) -> DownloadResult:
         base_name = safe_filename(title or Path(url).name or "document")
-        parts_dir = self._output_dir / ".parts"
-        part_path = parts_dir / f"{base_name}.part"
+        part_path = self._parts_dir / f"{base_name}.part"
         final_path = self._output_dir / base_name
 
         parsed = urlparse(url)
@@ -175,7 +215,7 @@ class Downloader:
 
         timeout = aiohttp.ClientTimeout(total=None, sock_connect=20, sock_read=60)
         async with self._session.get(url, headers=range_headers, timeout=timeout, allow_redirects=True) as resp:
-            await self._note_host_result(url, http_status=resp.status)
+            await self._note_host_result(host, http_status=resp.status)
             final_url = str(resp.url)
 
             if resp.status == 304:
@@ -199,29 +239,51 @@ class Downloader:
             etag = resp.headers.get("ETag") or None
             last_modified = resp.headers.get("Last-Modified") or None
 
-            digest = hashlib.sha256()
             if existing_size:
-                with part_path.open("rb") as f:
-                    while True:
-                        chunk = f.read(1024 * 1024)
-                        if not chunk:
-                            break
-                        digest.update(chunk)
+                # Resumed download: hash what is already on disk off the event loop.
+                digest = await asyncio.to_thread(file_digest, part_path, "sha256")
+            else:
+                digest = hashlib.sha256()
 
             part_path.parent.mkdir(parents=True, exist_ok=True)
             first_bytes = b""
+            sniff_pdf = expect_pdf and not existing_size
             with part_path.open("ab") as f:
-                async for chunk in resp.content.iter_chunked(256 * 1024):
-                    if self._stop.is_set():
-                        break
-                    await self._pause.wait()
-                    if not chunk:
-                        continue
-                    if len(first_bytes) < 2048:
-                        need = 2048 - len(first_bytes)
-                        first_bytes += chunk[:need]
-                    f.write(chunk)
-                    digest.update(chunk)
+
+                def _flush(data: bytes) -> None:
+                    digest.update(data)
+                    f.write(data)
+
+                # Hash+write runs in a worker thread (hashlib and file I/O release the GIL)
+                # while the next buffer is received; at most one flush is in flight so
+                # the digest and file still see the data in order.
+                buf = bytearray()
+                pending: asyncio.Future[None] | None = None
+                try:
+                    async for chunk in resp.content.iter_chunked(256 * 1024):
+                        if self._stop.is_set():
+                            break
+                        await self._pause.wait()
+                        if not chunk:
+                            continue
+                        buf += chunk
+                        if len(first_bytes) < 2048:
+                            need = 2048 - len(first_bytes)
+                            first_bytes += chunk[:need]
+                            if sniff_pdf and len(first_bytes) >= 2048 and not _looks_like_pdf(first_bytes):
+                                # Not a PDF (usually an HTML interstitial): the head is enough for
+                                # the checks below, so don't transfer the rest of the body.
+                                break
+                        if len(buf) >= _FLUSH_BYTES:
+                            if pending is not None:
+                                await pending
+                            pending = asyncio.ensure_future(asyncio.to_thread(_flush, bytes(buf)))
+                            buf.clear()
+                finally:
+                    if pending is not None:
+                        await pending
+                if buf:
+                    await asyncio.to_thread(_flush, bytes(buf))
 
             if self._stop.is_set():
                 raise asyncio.CancelledError("Stopped")
@@ -232,9 +294,7 @@ class Downloader:
             # If we write that to disk with a .pdf extension, PDF viewers will fail to load it.
             if expect_pdf:
                 head = (first_bytes or b"")
-                # Strip common whitespace; PDFs should start with %PDF-
-                head_stripped = head.lstrip(b"\r\n\t ")
-                looks_like_pdf = head_stripped.startswith(b"%PDF-")
+                looks_like_pdf = _looks_like_pdf(head)
                 looks_like_html = b"<html" in head.lower() or b"<!doctype html" in head.lower()
                 is_htmlish = ("text/html" in content_type.lower()) or looks_like_html
                 # Heuristic for the justice.gov age gate interstitial.
@@ -306,20 +366,15 @@ class Downloader:
                         pass
                     final_path = hashed_path
                 else:
-                    atomic_rename(part_path, hashed_path)
+                    # Off the loop: from a scratch dir on another filesystem this is a copy.
+                    await asyncio.to_thread(atomic_rename, part_path, hashed_path)
                     final_path = hashed_path
             else:
                 # Flat (legacy) layout.
                 if final_path.exists():
                     final_path = self._output_dir / f"{final_path.stem}-{sha256[:8]}{final_path.suffix}"
-                atomic_rename(part_path, final_path)
+                await asyncio.to_thread(atomic_rename, part_path, final_path)
 
-            # Best-effort cleanup for any leftover .parts dir.
-            try:
-                if parts_dir.exists() and not any(parts_dir.iterdir()):
-                    parts_dir.rmdir()
-            except Exception:
-                pass
             fetched_at = datetime.now(timezone.utc).isoformat()
             return DownloadResult(
                 url=url,
@@ -3,7 +3,12 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
-from doj_disclosures.core.embeddings import EmbeddingProvider, vector_to_blob
+from doj_disclosures.core.embeddings import (
+    EmbeddingProvider,
+    int8_blobs_from_array,
+    vector_to_blob,
+    vector_to_int8_blob,
+)
 from doj_disclosures.core.utils import chunk_text
 
 logger = logging.getLogger(__name__)
@@ -15,6 +20,7 @@ class EmbeddedChunk:
     start_offset: int
     end_offset: int
     vector: bytes
+    scale: float | None
     norm: float
 
 
@@ -24,30 +30,43 @@ def build_embeddings_for_text(
     provider: EmbeddingProvider,
     max_chars: int = 2500,
     overlap: int = 250,
+    quant: str = "int8",
 ) -> list[dict]:
+    """Embed `text` in overlapping windows.
+
+    `quant` picks the stored vector format: "int8" (default) or "fp32", whose
+    records carry `scale=None`.
+    """
+
     if not text.strip():
         return []
 
-    # Chunk with offsets.
+    # Chunk with offsets: windows of max_chars starting every (max_chars - overlap).
     chunks: list[tuple[int, int, str]] = []
-    start = 0
-    while start < len(text):
+    for start in range(0, len(text), max(1, max_chars - overlap)):
         end = min(len(text), start + max_chars)
         chunks.append((start, end, text[start:end]))
         if end == len(text):
             break
-        start = max(0, end - overlap)
 
     texts = [c[2] for c in chunks]
-    vecs = provider.embed(texts)
-    if len(vecs) != len(chunks):
-        logger.warning("Embedding count mismatch: %s != %s", len(vecs), len(chunks))
+    embed_array = getattr(provider, "embed_array", None)
+    blobs: list[tuple[bytes, float | None, float]]
+    if (quant or "int8").strip().lower() == "fp32":
+        blobs = [(blob, None, norm) for blob, norm in map(vector_to_blob, provider.embed(texts))]
+    elif embed_array is not None:
+        # Quantize and take norms for the whole batch at once.
+        blobs = int8_blobs_from_array(embed_array(texts))
+    else:
+        blobs = [vector_to_int8_blob(v) for v in provider.embed(texts)]
+    if len(blobs) != len(chunks):
+        logger.warning("Embedding count mismatch: %s != %s", len(blobs), len(chunks))
 
     out: list[dict] = []
     for idx, (st, en, _t) in enumerate(chunks):
-        if idx >= len(vecs):
+        if idx >= len(blobs):
             break
-        blob, norm = vector_to_blob(vecs[idx])
+        blob, scale, norm = blobs[idx]
         out.append(
             {
                 "chunk_index": idx,
@@ -55,6 +74,7 @@ def build_embeddings_for_text(
                 "end_offset": en,
                 "model_name": getattr(provider, "model_name", ""),
                 "vector": blob,
+                "scale": scale,
                 "norm": norm,
             }
         )
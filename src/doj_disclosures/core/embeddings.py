@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
+import operator
 from array import array
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Any, Protocol, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +29,24 @@ class SentenceTransformerProvider:
         except Exception as e:
             raise RuntimeError("sentence-transformers not installed or model load failed") from e
 
-    def embed(self, texts: list[str]) -> list[list[float]]:
-        if not texts:
-            return []
+    def embed_array(self, texts: list[str]) -> Any:
+        """Like `embed`, but returns the model's 2-D float32 ndarray as-is."""
+
         try:
-            vecs = self._model.encode(texts, normalize_embeddings=True)
-            # vecs can be numpy ndarray; convert to nested python lists.
-            return [list(map(float, v)) for v in vecs]
+            return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
         except Exception as e:
             raise RuntimeError(f"Embedding failed: {e}") from e
 
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        vecs = self.embed_array(texts)
+        # vecs is normally a float32 ndarray; tolist() converts it to nested
+        # python floats in one C call instead of a map() per row.
+        if hasattr(vecs, "tolist"):
+            return vecs.tolist()
+        return [list(map(float, v)) for v in vecs]
+
 
 def get_default_provider(model_name: str) -> EmbeddingProvider | None:
     try:
@@ -46,24 +56,216 @@ def get_default_provider(model_name: str) -> EmbeddingProvider | None:
         return None
 
 
-def vector_to_blob(vec: list[float]) -> tuple[bytes, float]:
-    # Store float32 little-endian.
-    a = array("f", (float(x) for x in vec))
-    norm = math.sqrt(sum(float(x) * float(x) for x in a))
-    return a.tobytes(), float(norm)
+class BatchingEmbeddingProvider:
+    """Coalesces concurrent single-text `aembed` calls into batched `embed` calls.
+
+    Texts submitted within `max_wait_ms` of each other (up to `max_batch`) share one
+    forward pass, run in a worker thread so the event loop keeps going. Batches run
+    one at a time. Like the browser pool, pending state belongs to the event loop
+    that created it and is dropped if the loop changes.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, *, max_batch: int = 32, max_wait_ms: float = 10.0) -> None:
+        self._provider = provider
+        self.model_name = provider.model_name
+        self._max_batch = max(1, int(max_batch))
+        self._max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._pending: list[tuple[str, asyncio.Future[list[float]]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return self._provider.embed(texts)
+
+    async def aembed(self, text: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._pending = []
+            self._timer = None
+        fut: asyncio.Future[list[float]] = loop.create_future()
+        self._pending.append((text, fut))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch and self._loop is not None:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future[list[float]]]]) -> None:
+        assert self._lock is not None
+        try:
+            async with self._lock:
+                vecs = await asyncio.to_thread(self._provider.embed, [t for t, _f in batch])
+            if len(vecs) != len(batch):
+                raise RuntimeError(f"Embedding returned {len(vecs)} vectors for {len(batch)} texts")
+        except asyncio.CancelledError:
+            for _t, fut in batch:
+                fut.cancel()
+            raise
+        except Exception as e:
+            for _t, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_t, fut), vec in zip(batch, vecs):
+            if not fut.done():
+                fut.set_result(vec)
+
+
+async def aembed_one(provider: EmbeddingProvider, text: str) -> list[float]:
+    """Embed one text without blocking the event loop, batching when the provider can."""
+
+    aembed = getattr(provider, "aembed", None)
+    if aembed is not None:
+        return await aembed(text)
+    return (await asyncio.to_thread(provider.embed, [text]))[0]
+
+
+def vector_to_blob(vec: Sequence[float]) -> tuple[bytes, float]:
+    # Store float32 little-endian. array() and hypot() convert/reduce in C, so a
+    # 384-1024 dim vector costs no per-element Python work.
+    a = vec if isinstance(vec, array) and vec.typecode == "f" else array("f", vec)
+    return a.tobytes(), float(math.hypot(*a))
+
+
+def vector_to_int8_blob(vec: Sequence[float]) -> tuple[bytes, float, float]:
+    """Quantize to int8 with one per-vector scale; returns (blob, scale, norm).
+
+    The norm is taken from the unquantized vector so cosine similarity against
+    the decoded values stays comparable with float32 vectors.
+    """
+
+    a = vec if isinstance(vec, array) and vec.typecode == "f" else array("f", vec)
+    norm = float(math.hypot(*a))
+    peak = max(map(abs, a), default=0.0)
+    if peak <= 0.0:
+        return bytes(len(a)), 0.0, norm
+    scale = peak / 127.0
+    q = array("b", [max(-127, min(127, round(x / scale))) for x in a])
+    return q.tobytes(), float(scale), norm
+
+
+def int8_blobs_from_array(vecs: Any) -> list[tuple[bytes, float, float]]:
+    """`vector_to_int8_blob` for every row of a 2-D NumPy array, computed array-wide."""
 
+    import numpy as np  # type: ignore
+
+    a = np.asarray(vecs, dtype=np.float32)
+    if a.ndim != 2 or not a.shape[0]:
+        return [vector_to_int8_blob(v) for v in a.tolist()]
+    wide = a.astype(np.float64)
+    norms = np.linalg.norm(wide, axis=1)
+    scales = np.abs(wide).max(axis=1, initial=0.0) / 127.0
+    q = np.rint(wide / np.where(scales > 0.0, scales, 1.0)[:, None])
+    q = np.clip(q, -127, 127).astype(np.int8)
+    q[scales <= 0.0] = 0
+    return [(q[i].tobytes(), float(scales[i]), float(norms[i])) for i in range(a.shape[0])]
+
+
+def blob_to_vector(blob: bytes, *, scale: float | None = None) -> list[float]:
+    """Decode a stored vector; `scale` marks an int8 blob from `vector_to_int8_blob`."""
+
+    if scale is not None:
+        s = float(scale)
+        return [x * s for x in array("b", blob)]
+    return blob_to_float32_array(blob).tolist()
+
+
+def blob_to_float32_array(blob: bytes) -> array:
+    """Decode a float32 blob into a packed `array('f')`; no per-element Python floats."""
 
-def blob_to_vector(blob: bytes) -> list[float]:
     a = array("f")
     a.frombytes(blob)
-    return list(map(float, a))
+    return a
+
+
+def blobs_to_matrix(blobs: Sequence[bytes], scales: Sequence[float | None]) -> Any:
+    """Decode stored vectors of one length into an (N, D) float32 NumPy array.
+
+    Raises ValueError when the blobs don't share a length.
+    """
+
+    import numpy as np  # type: ignore
+
+    if all(s is not None for s in scales):
+        m = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(blobs), -1).astype(np.float32)
+        m *= np.asarray(scales, dtype=np.float32)[:, None]
+        return m
+    if not any(s is not None for s in scales):
+        return np.frombuffer(b"".join(blobs), dtype="<f4").reshape(len(blobs), -1)
+    return np.array([blob_to_vector(b, scale=s) for b, s in zip(blobs, scales)], dtype=np.float32)
+
+
+def blobs_dot(blobs: Sequence[bytes], scales: Sequence[float | None], refs: Any) -> Any:
+    """(N, R) dot products of stored vectors against the rows of an (R, D) float32 array.
+
+    For int8 blobs the per-vector scales are applied to the (N, R) result instead
+    of dequantizing the whole (N, D) matrix first. Raises ValueError when the
+    blobs don't share a length.
+    """
 
+    import numpy as np  # type: ignore
 
-def cosine_similarity(vec_a: list[float], norm_a: float, vec_b: list[float], norm_b: float) -> float:
+    if scales and all(s is not None for s in scales):
+        q = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(blobs), -1)
+        out = q.astype(np.float32) @ refs.T
+        out *= np.asarray(scales, dtype=np.float32)[:, None]
+        return out
+    return blobs_to_matrix(blobs, scales) @ refs.T
+
+
+_sumprod = getattr(math, "sumprod", None)
+
+
+def _dot(vec_a: Sequence[float], vec_b: Sequence[float]) -> float:
+    # math.sumprod (3.12+) runs the whole dot product in C; it needs equal lengths,
+    # whereas zip semantics (truncate to the shorter vector) are kept for mismatches.
+    if _sumprod is not None and len(vec_a) == len(vec_b):
+        return float(_sumprod(vec_a, vec_b))
+    return float(sum(map(operator.mul, vec_a, vec_b)))
+
+
+def vector_norm(vec: Sequence[float]) -> float:
+    return float(math.hypot(*vec))
+
+
+def cosine_similarity(
+    vec_a: Sequence[float], norm_a: float | None, vec_b: Sequence[float], norm_b: float | None
+) -> float:
+    """Cosine similarity using cached norms; pass None for a norm that isn't known.
+
+    Missing norms are folded into a single sqrt of the squared norms rather than
+    two separate norm computations.
+    """
+
+    if norm_a is None or norm_b is None:
+        sq = (_dot(vec_a, vec_a) if norm_a is None else norm_a * norm_a) * (
+            _dot(vec_b, vec_b) if norm_b is None else norm_b * norm_b
+        )
+        return float(_dot(vec_a, vec_b) / math.sqrt(sq)) if sq > 0.0 else 0.0
     if norm_a <= 0.0 or norm_b <= 0.0:
         return 0.0
-    # Dot product
-    dot = 0.0
-    for x, y in zip(vec_a, vec_b):
-        dot += float(x) * float(y)
-    return float(dot / (norm_a * norm_b))
+    return float(_dot(vec_a, vec_b) / (norm_a * norm_b))
+
+
+def cosine_similarities(
+    vec: Sequence[float], norm: float, vectors: Sequence[Sequence[float]], norms: Sequence[float]
+) -> list[float]:
+    """Cosine similarity of `vec` against each of `vectors` (0.0 where a norm is zero)."""
+
+    if norm <= 0.0:
+        return [0.0] * len(vectors)
+    return [(_dot(vec, v) / (norm * n)) if n > 0.0 else 0.0 for v, n in zip(vectors, norms)]
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-import json
 import logging
+import math
+from array import array
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Sequence
 
-from doj_disclosures.core.embeddings import EmbeddingProvider, blob_to_vector, cosine_similarity, vector_to_blob
+from doj_disclosures.core.embeddings import EmbeddingProvider, aembed_one, cosine_similarity
 from doj_disclosures.core.relevance import hostname, load_url_penalties, dump_url_penalties
-from doj_disclosures.core.storage_gating import compute_flagged_path, move_to, plan_storage
+from doj_disclosures.core.storage_gating import StoragePlan, compute_flagged_path, move_to, plan_storage
+from doj_disclosures.core.utils import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -16,27 +19,61 @@ logger = logging.getLogger(__name__)
 URL_PENALTIES_KEY = "url_penalties"
 PHRASE_BLACKLIST_KEY = "phrase_blacklist"
 
+# Leading characters of a document's text embedded for the feedback centroids.
+EMBED_TEXT_CHARS = 12000
+
 
 @dataclass(frozen=True)
 class Centroid:
-    vec: list[float]
+    # Stored as a packed float32 array('f') when built here or loaded from the DB, so
+    # the vector goes to and from its blob with a single buffer copy.
+    vec: Sequence[float]
     norm: float
     count: int
 
 
-def _update_centroid(old: Centroid | None, new_vec: list[float]) -> Centroid:
+@dataclass(frozen=True)
+class FeedbackContext:
+    """Per-session state reused across `apply_feedback` calls (storage dirs are created once)."""
+
+    output_dir: Path
+    storage: StoragePlan
+
+    @classmethod
+    def for_output_dir(cls, output_dir: Path) -> FeedbackContext:
+        return cls(output_dir=Path(output_dir), storage=plan_storage(Path(output_dir)))
+
+    def bucket_dir(self, label: str) -> Path:
+        return self.storage.flagged_dir / ("high_value" if label == "high_value" else "irrelevant")
+
+
+def _float32_centroid(vec: Sequence[float], count: int) -> Centroid:
+    # Round through float32 once so the in-memory centroid equals what the DB stores.
+    a = array("f", vec)
+    return Centroid(vec=a, norm=float(math.hypot(*a)), count=count)
+
+
+def _update_centroid(old: Centroid | None, new_vec: Sequence[float]) -> Centroid:
     if not new_vec:
-        return old or Centroid(vec=[], norm=0.0, count=0)
+        return old or Centroid(vec=array("f"), norm=0.0, count=0)
     if old is None or old.count <= 0 or not old.vec:
-        blob, norm = vector_to_blob(new_vec)
-        return Centroid(vec=blob_to_vector(blob), norm=norm, count=1)
+        return _float32_centroid(new_vec, 1)
 
-    # Online mean
-    dim = min(len(old.vec), len(new_vec))
+    # Online mean (zip truncates to the shorter vector).
     count = int(old.count)
-    avg = [(old.vec[i] * count + float(new_vec[i])) / (count + 1) for i in range(dim)]
-    blob, norm = vector_to_blob(avg)
-    return Centroid(vec=blob_to_vector(blob), norm=norm, count=count + 1)
+    try:
+        import numpy as np  # type: ignore
+    except ImportError:
+        avg = [(o * count + float(n)) / (count + 1) for o, n in zip(old.vec, new_vec)]
+        return _float32_centroid(avg, count + 1)
+    dim = min(len(old.vec), len(new_vec))
+    # Same float64 arithmetic as the scalar mean, one vectorized pass.
+    mean = (np.asarray(old.vec[:dim], dtype=np.float64) * count + np.asarray(new_vec[:dim], dtype=np.float64)) / (
+        count + 1
+    )
+    a = array("f")
+    a.frombytes(mean.astype(np.float32).tobytes())
+    return Centroid(vec=a, norm=float(math.hypot(*a)), count=count + 1)
 
 
 async def apply_feedback(
@@ -48,11 +85,13 @@ async def apply_feedback(
     model_name: str,
     output_dir: Path,
     storage_layout: str = "flat",
+    ctx: FeedbackContext | None = None,
 ) -> None:
     """Apply human feedback.
 
     - label: "irrelevant" or "high_value"
     - Updates doc_reviews, URL penalties, phrase blacklist, and online centroids.
+    - ctx: optional `FeedbackContext` for `output_dir`, to reuse across many calls.
 
     This is intentionally lightweight (no heavy classifier dependency).
     """
@@ -64,16 +103,19 @@ async def apply_feedback(
     now = datetime.now(timezone.utc).isoformat()
     await db.set_review_status(doc_id=doc_id, status=lb, updated_at=now)
 
+    doc = await db.get_document(doc_id=doc_id)
+    kv = await db.kv_get_many([URL_PENALTIES_KEY, PHRASE_BLACKLIST_KEY])
+
     # Move file into the appropriate Flagged subfolder.
     try:
-        doc = await db.get_document(doc_id=doc_id)
         local_path = str(doc.get("local_path") or "")
         sha = str(doc.get("sha256") or "")
         if local_path and sha:
             src = Path(local_path)
             if src.exists():
-                storage = plan_storage(output_dir)
-                bucket_dir = storage.flagged_dir / ("high_value" if lb == "high_value" else "irrelevant")
+                if ctx is None or ctx.output_dir != Path(output_dir):
+                    ctx = FeedbackContext.for_output_dir(output_dir)
+                bucket_dir = ctx.bucket_dir(lb)
                 title = str(doc.get("title") or "").strip()
                 dst = compute_flagged_path(
                     flagged_dir=bucket_dir,
@@ -90,11 +132,9 @@ async def apply_feedback(
     except Exception:
         pass
 
-    # URL penalties (per hostname)
-    doc = await db.get_document(doc_id=doc_id)
+    # URL penalties (per hostname); moving the file above doesn't change the URL.
     host = hostname(doc.get("url", ""))
-    raw = await db.kv_get(URL_PENALTIES_KEY)
-    penalties = load_url_penalties(raw)
+    penalties = load_url_penalties(kv.get(URL_PENALTIES_KEY))
     cur = float(penalties.get(host, 0.0) or 0.0)
     if host:
         if lb == "irrelevant":
@@ -110,10 +150,10 @@ async def apply_feedback(
         if lb == "irrelevant" and len(matches) == 1:
             pat = str(matches[0].get("pattern") or "").strip()
             if pat:
-                raw_bl = await db.kv_get(PHRASE_BLACKLIST_KEY)
+                raw_bl = kv.get(PHRASE_BLACKLIST_KEY)
                 bl: list[str] = []
                 try:
-                    data = json.loads(raw_bl) if raw_bl else []
+                    data = json_loads(raw_bl) if raw_bl else []
                     if isinstance(data, list):
                         bl = [str(x) for x in data if str(x).strip()]
                 except Exception:
@@ -122,19 +162,19 @@ async def apply_feedback(
                     bl.append(pat)
                     # cap size
                     bl = bl[-500:]
-                    await db.kv_set(PHRASE_BLACKLIST_KEY, json.dumps(bl))
+                    await db.kv_set(PHRASE_BLACKLIST_KEY, json_dumps(bl))
     except Exception:
         pass
 
-    # Online centroid model update.
-    if provider is None:
+    # Online centroid model update; unknown or zero-byte documents have no text to embed.
+    if provider is None or not doc or doc.get("file_size") == 0:
         return
 
     try:
-        text = await db.get_fts_content(doc_id=doc_id) or ""
+        text = await db.get_fts_content(doc_id=doc_id, max_chars=EMBED_TEXT_CHARS) or ""
         if not text.strip():
             return
-        vec = provider.embed([text[:12000]])[0]
+        vec = await aembed_one(provider, text)
 
         old = await db.get_feedback_centroid(label=lb, model_name=model_name)
         updated = _update_centroid(old, vec)
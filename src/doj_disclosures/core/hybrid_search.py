@@ -1,28 +1,90 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
+from collections import OrderedDict
 
 from doj_disclosures.core.db import Database
-from doj_disclosures.core.embeddings import blob_to_vector, cosine_similarity, get_default_provider
+from doj_disclosures.core.embeddings import (
+    BatchingEmbeddingProvider,
+    aembed_one,
+    blob_to_vector,
+    blobs_dot,
+    cosine_similarities,
+    get_default_provider,
+    vector_norm,
+)
 
 logger = logging.getLogger(__name__)
 
+# Query embeddings kept per searcher; repeat searches skip the model forward pass.
+QUERY_VECTOR_CACHE_SIZE = 512
 
-def _tanh(x: float) -> float:
+# Candidate chunk count from which similarity scoring moves off the event loop.
+THREADED_SCORING_MIN_CHUNKS = 2048
+
+# Documents whose feedback centroid similarities are kept per label (least recently scored dropped first).
+CENTROID_SIMS_CACHE_SIZE = 50_000
+
+
+# Score bias per review status; anything else (e.g. "new") is neutral.
+_REVIEW_BIAS = {"high_value": 0.35, "irrelevant": -0.60}
+
+
+def _as_float(value: object) -> float:
     try:
-        return float(math.tanh(float(x)))
-    except Exception:
+        return float(value or 0.0)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
         return 0.0
 
 
-def _review_bias(status: str) -> float:
-    s = (status or "").strip().lower()
-    if s == "high_value":
-        return 0.35
-    if s == "irrelevant":
-        return -0.60
-    return 0.0
+def _best_similarities_np(
+    refs: list[tuple[list[float], float]], docs: list[tuple[int, list[dict]]]
+) -> dict[int, list[float]]:
+    import numpy as np  # type: ignore
+
+    # Every candidate chunk in one (N, D) matrix; one matmul scores it against all refs.
+    chunks = [c for _doc_id, embs in docs for c in embs]
+    r = np.asarray([v for v, _n in refs], dtype=np.float32)
+    dots = blobs_dot([c["vector"] for c in chunks], [c.get("scale") for c in chunks], r)
+    norms = np.asarray([float(c.get("norm") or 0.0) for c in chunks])
+    denom = norms[:, None] * np.asarray([n for _v, n in refs])[None, :]
+    sims = np.divide(dots, denom, out=np.zeros_like(denom), where=denom > 0.0)
+    starts = np.cumsum([0] + [len(embs) for _doc_id, embs in docs[:-1]])
+    best = np.maximum(np.maximum.reduceat(sims, starts, axis=0), 0.0)
+    return {doc_id: best[i].tolist() for i, (doc_id, _embs) in enumerate(docs)}
+
+
+def _best_similarities(
+    refs: list[tuple[list[float], float]], embs_by_doc: dict[int, list[dict]]
+) -> dict[int, list[float]]:
+    """Per document, the best chunk cosine similarity against each ref (floored at 0)."""
+
+    docs = [(doc_id, embs) for doc_id, embs in embs_by_doc.items() if embs]
+    if not refs or not docs:
+        return {}
+    try:
+        return _best_similarities_np(refs, docs)
+    except (ImportError, ValueError):
+        # No NumPy, or vectors of differing sizes (zip-truncating scalar path copes).
+        pass
+    out: dict[int, list[float]] = {}
+    for doc_id, embs in docs:
+        dvecs = [blob_to_vector(e["vector"], scale=e.get("scale")) for e in embs]
+        dnorms = [float(e.get("norm") or 0.0) for e in embs]
+        out[doc_id] = [max([0.0, *cosine_similarities(vec, norm, dvecs, dnorms)]) for vec, norm in refs]
+    return out
+
+
+async def _best_similarities_async(
+    refs: list[tuple[list[float], float]], embs_by_doc: dict[int, list[dict]]
+) -> dict[int, list[float]]:
+    # Large candidate sets are scored in a worker thread (NumPy releases the GIL in
+    # the matmul); small ones aren't worth the hand-off.
+    if not refs or sum(len(embs) for embs in embs_by_doc.values()) < THREADED_SCORING_MIN_CHUNKS:
+        return _best_similarities(refs, embs_by_doc)
+    return await asyncio.to_thread(_best_similarities, refs, embs_by_doc)
 
 
 class HybridSearcher:
@@ -45,19 +107,49 @@ class HybridSearcher:
         self._url_penalty_weight = float(url_penalty_weight)
         self._keyword_rank_weight = float(keyword_rank_weight)
         self._provider = None
+        self._qvec_cache: OrderedDict[str, tuple[list[float], float]] = OrderedDict()
+        self._centroid_sims_cache: dict[str, tuple[tuple, OrderedDict[int, tuple[str, float]]]] = {}
 
     def _provider_or_none(self):
         if self._provider is not None:
             return self._provider
-        self._provider = get_default_provider(self._model_name)
+        provider = get_default_provider(self._model_name)
+        # Concurrent searches share forward passes instead of queueing on the model.
+        self._provider = BatchingEmbeddingProvider(provider) if provider is not None else None
         return self._provider
 
+    async def _embed_query(self, provider, q: str) -> tuple[list[float], float]:
+        cached = self._qvec_cache.get(q)
+        if cached is not None:
+            self._qvec_cache.move_to_end(q)
+            return cached
+        qvec = await aembed_one(provider, q)
+        entry = (qvec, vector_norm(qvec))
+        self._qvec_cache[q] = entry
+        if len(self._qvec_cache) > QUERY_VECTOR_CACHE_SIZE:
+            self._qvec_cache.popitem(last=False)
+        return entry
+
+    def _centroid_sims(self, label: str, centroid: tuple) -> OrderedDict[int, tuple[str, float]]:
+        """(embedding stamp, best chunk similarity) per document for a feedback centroid.
+
+        Reset when the centroid changes; entries whose stamp no longer matches the
+        document's embeddings are recomputed by `search`.
+        """
+
+        cached = self._centroid_sims_cache.get(label)
+        if cached is not None and cached[0] == centroid:
+            return cached[1]
+        sims: OrderedDict[int, tuple[str, float]] = OrderedDict()
+        self._centroid_sims_cache[label] = (centroid, sims)
+        return sims
+
     async def _get_feedback_centroids(self):
         try:
             hv = await self._db.get_feedback_centroid(label="high_value", model_name=self._model_name)
             ir = await self._db.get_feedback_centroid(label="irrelevant", model_name=self._model_name)
-            hv_out = (list(hv.vec), float(hv.norm)) if hv is not None and float(hv.norm) > 0 else None
-            ir_out = (list(ir.vec), float(ir.norm)) if ir is not None and float(ir.norm) > 0 else None
+            hv_out = (hv.vec, float(hv.norm)) if hv is not None and float(hv.norm) > 0 else None
+            ir_out = (ir.vec, float(ir.norm)) if ir is not None and float(ir.norm) > 0 else None
             return hv_out, ir_out
         except Exception:
             return None, None
@@ -94,74 +186,99 @@ class HybridSearcher:
         qnorm = 0.0
         if provider is not None:
             try:
-                qvec = provider.embed([q])[0]
-                qnorm = sum(float(x) * float(x) for x in qvec) ** 0.5
+                qvec, qnorm = await self._embed_query(provider, q)
             except Exception as e:
                 logger.info("Query embedding failed; continuing without query semantic: %s", e)
                 qvec = None
                 qnorm = 0.0
 
+        use_query = provider is not None and qvec is not None and qnorm > 0
+        if provider is None:
+            hv_centroid = ir_centroid = None
+        centroids = [
+            (c, self._centroid_sims(label, c))
+            for label, c in (("high_value", hv_centroid), ("irrelevant", ir_centroid))
+            if c is not None
+        ]
+
+        # Centroid similarities don't depend on the query, so a document only needs them
+        # again when the centroid or its embeddings change (the stamp); the query
+        # similarity is always live.
+        doc_ids = [int(r.get("doc_id") or 0) for r in fts]
+        stamps: dict[int, str] = {}
+        if centroids:
+            try:
+                stamps = await self._db.embedding_stamps_for_docs(doc_ids=doc_ids, model_name=self._model_name)
+            except Exception:
+                stamps = {}
+        current: list[dict[int, float]] = [{} for _ in centroids]
+        stale: list[int] = []
+        for doc_id in doc_ids:
+            stamp = stamps.get(doc_id)
+            if stamp is None:
+                continue
+            for i, (_c, sims) in enumerate(centroids):
+                cached = sims.get(doc_id)
+                if cached is None or cached[0] != stamp:
+                    stale.append(doc_id)
+                    break
+                current[i][doc_id] = cached[1]
+        query_sem: dict[int, float] = {}
+        needed = doc_ids if use_query else stale
+        if needed:
+            try:
+                embs_by_doc = await self._db.query_embeddings_for_docs(doc_ids=needed, model_name=self._model_name)
+            except Exception:
+                embs_by_doc = {}
+            stale_set = set(stale)
+            q_refs = [(qvec, qnorm)] if use_query else []
+            # Stale documents are scored against the query and centroids in one matmul;
+            # the rest only against the query. The two are independent and may overlap.
+            fresh = {d: e for d, e in embs_by_doc.items() if d not in stale_set} if use_query else {}
+            stale_best, fresh_best = await asyncio.gather(
+                _best_similarities_async(
+                    q_refs + [c for c, _sims in centroids],
+                    {d: e for d, e in embs_by_doc.items() if d in stale_set},
+                ),
+                _best_similarities_async(q_refs, fresh),
+            )
+            for doc_id, best in stale_best.items():
+                if use_query:
+                    query_sem[doc_id] = best[0]
+                for i, (_c, sims) in enumerate(centroids):
+                    sim = best[len(q_refs) + i]
+                    current[i][doc_id] = sim
+                    sims[doc_id] = (stamps[doc_id], sim)
+                    sims.move_to_end(doc_id)
+                    if len(sims) > CENTROID_SIMS_CACHE_SIZE:
+                        sims.popitem(last=False)
+            for doc_id, best in fresh_best.items():
+                query_sem[doc_id] = best[0]
+        hv_sims = current[0] if hv_centroid is not None else {}
+        ir_sims = current[-1] if ir_centroid is not None else {}
+
         reranked: list[dict] = []
         for r in fts:
             doc_id = int(r.get("doc_id") or 0)
             if doc_id <= 0:
                 continue
 
-            prior = 0.0
-            try:
-                rs = r.get("relevance_score")
-                prior = float(rs) if rs is not None else 0.0
-            except Exception:
-                prior = 0.0
-            prior_scaled = _tanh(1.5 * prior)
+            prior = _as_float(r.get("relevance_score"))
+            url_pen = _as_float(r.get("url_penalty"))
+            bias = _REVIEW_BIAS.get(str(r.get("review_status") or "").strip().lower(), 0.0)
 
-            try:
-                url_pen = float(r.get("url_penalty") or 0.0)
-            except Exception:
-                url_pen = 0.0
-
-            review_status = str(r.get("review_status") or "new")
-            bias = _review_bias(review_status)
-
-            best_query_sem = 0.0
-            best_hv = 0.0
-            best_ir = 0.0
-
-            if provider is not None and (qvec is not None or hv_centroid or ir_centroid):
-                try:
-                    embs = await self._db.query_embeddings_for_doc(doc_id=doc_id, model_name=self._model_name)
-                except Exception:
-                    embs = []
-
-                for e in embs:
-                    dvec = blob_to_vector(e["vector"])
-                    dnorm = float(e.get("norm") or 0.0)
-
-                    if qvec is not None and qnorm > 0 and dnorm > 0:
-                        sim = cosine_similarity(qvec, qnorm, dvec, dnorm)
-                        if sim > best_query_sem:
-                            best_query_sem = float(sim)
-
-                    if hv_centroid is not None and dnorm > 0:
-                        hv_sim = cosine_similarity(dvec, dnorm, hv_centroid[0], hv_centroid[1])
-                        if hv_sim > best_hv:
-                            best_hv = float(hv_sim)
-
-                    if ir_centroid is not None and dnorm > 0:
-                        ir_sim = cosine_similarity(dvec, dnorm, ir_centroid[0], ir_centroid[1])
-                        if ir_sim > best_ir:
-                            best_ir = float(ir_sim)
-
-            feedback_boost = float(best_hv - best_ir)
-            kw_rank = float(keyword_rank.get(doc_id, 0.0))
-
-            score = 0.0
-            score += self._keyword_rank_weight * kw_rank
-            score += self._semantic_weight * float(best_query_sem)
-            score += self._feedback_weight * float(feedback_boost)
-            score += self._prior_weight * float(prior_scaled)
-            score -= self._url_penalty_weight * float(url_pen)
-            score += float(bias)
+            best_query_sem = query_sem.get(doc_id, 0.0)
+            feedback_boost = hv_sims.get(doc_id, 0.0) - ir_sims.get(doc_id, 0.0)
+            kw_rank = keyword_rank.get(doc_id, 0.0)
+
+            score = (
+                self._keyword_rank_weight * kw_rank
+                + self._semantic_weight * best_query_sem
+                + self._feedback_weight * feedback_boost
+                + self._prior_weight * math.tanh(1.5 * prior)
+                - self._url_penalty_weight * url_pen
+                + bias
+            )
 
             reranked.append(
                 {
@@ -169,10 +286,10 @@ class HybridSearcher:
                     "semantic": float(best_query_sem),
                     "feedback_boost": float(feedback_boost),
                     "keyword_rank": float(kw_rank),
-                    "prior": float(prior),
+                    "prior": prior,
                     "score": float(score),
                 }
             )
 
-        reranked.sort(key=lambda x: float(x.get("score") or 0.0), reverse=True)
+        reranked.sort(key=lambda x: x["score"], reverse=True)
         return reranked[:limit]
@@ -3,17 +3,48 @@ from __future__ import annotations
 import fnmatch
 import logging
 import re
-from dataclasses import dataclass
+from operator import itemgetter
+from typing import NamedTuple
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from doj_disclosures.core.utils import chunk_text, snippet_around
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r"\w+", flags=re.UNICODE)
+_WILDCARD_WORD_RE = re.compile(r"\b[\w\-']+\b", flags=re.UNICODE)
+# casefold() covers nearly every pair re.IGNORECASE treats as equal; the dotted and
+# dotless Turkish i are the exceptions, so fold them to "i" first. U+0345 is not a
+# word character but casefolds to one, so it becomes a separator instead.
+_FOLD_TABLE = str.maketrans({"\u0131": "i", "\u0130": "i", "\u0345": " "})
 
-@dataclass(frozen=True)
-class MatchHit:
+
+def _folded_words(text: str) -> set[str]:
+    return set(_WORD_RE.findall(text.translate(_FOLD_TABLE).casefold()))
+
+
+def _best_fuzzy_sentences(queries: list[str], sentences: list[str]) -> list[tuple[float, int]]:
+    """(best token_set_ratio, index of the first sentence reaching it) per query."""
+
+    try:
+        import numpy as np  # type: ignore
+    except ImportError:
+        out: list[tuple[float, int]] = []
+        for q in queries:
+            _choice, score, idx = process.extractOne(q, sentences, scorer=fuzz.token_set_ratio)
+            out.append((float(score), int(idx)))
+        return out
+    # Whole (queries x sentences) score matrix in RapidFuzz's C kernel. Single-threaded:
+    # documents are already matched on several executor threads at once.
+    scores = process.cdist(queries, sentences, scorer=fuzz.token_set_ratio, dtype=np.float64)
+    best = scores.argmax(axis=1)
+    return [(float(scores[i, j]), int(j)) for i, j in enumerate(best)]
+
+
+class MatchHit(NamedTuple):
+    # A tuple subclass: cheap to build per hit, and it is already the
+    # (method, pattern, score, snippet) row that `Database.add_matches` stores.
     method: str
     pattern: str
     score: float
@@ -37,11 +68,13 @@ class KeywordMatcher:
         self._semantic_enabled = semantic_enabled
         self._semantic_threshold = semantic_threshold
         self._stopwords = stopwords or set()
+        self._query_engine = BooleanQueryEngine()
 
         self._regexes: list[tuple[str, re.Pattern[str]]] = []
         self._wildcards: list[str] = []
+        self._wildcard_regexes: list[tuple[str, re.Pattern[str]]] = []
         self._literals: list[str] = []
-        self._literal_regexes: list[tuple[str, re.Pattern[str]]] = []
+        self._literal_regexes: list[tuple[str, re.Pattern[str], frozenset[str]]] = []
         for kw in self._keywords:
             if kw.startswith("re:"):
                 pat = kw[3:].strip()
@@ -51,6 +84,8 @@ class KeywordMatcher:
                     continue
             elif "*" in kw or "?" in kw:
                 self._wildcards.append(kw)
+                # Same test as fnmatch.fnmatch(word.lower(), kw.lower()), compiled once.
+                self._wildcard_regexes.append((kw, re.compile(fnmatch.translate(kw.lower()))))
             else:
                 self._literals.append(kw)
 
@@ -69,9 +104,16 @@ class KeywordMatcher:
             else:
                 pat = rf"(?<!\w){r'\s+'.join(re.escape(t) for t in tokens)}(?!\w)"
             try:
-                self._literal_regexes.append((kw, re.compile(pat, flags=re.IGNORECASE | re.UNICODE)))
+                rx = re.compile(pat, flags=re.IGNORECASE | re.UNICODE)
             except re.error:
                 continue
+            self._literal_regexes.append((kw, rx, frozenset(_folded_words(" ".join(tokens)))))
+
+        # Fuzzy matching is intentionally conservative to reduce false positives.
+        # Skip single-word and very short keywords.
+        self._fuzzy_keywords = [
+            kw for kw in self._literals[:200] if len(_WORD_RE.findall(kw)) > 1 and len(kw.strip()) >= 8
+        ]
 
         self._semantic = None
         if semantic_enabled:
@@ -88,23 +130,34 @@ class KeywordMatcher:
         if not text.strip():
             return hits
 
-        # Boundary-aware literal matching (single words + phrases).
-        for kw, rx in self._literal_regexes:
+        # Boundary-aware literal matching (single words + phrases). One pass collects the
+        # text's words; a keyword whose words don't all occur can't match, so its regex
+        # scan is skipped (with many keywords, most are absent from any one document).
+        words = _folded_words(text) if self._literal_regexes else set()
+        for kw, rx, kw_words in self._literal_regexes:
             k = kw.lower().strip()
             if k in self._stopwords:
                 continue
+            if not kw_words <= words:
+                continue
             for m in rx.finditer(text):
                 sn = snippet_around(text, m.start(), m.end()).snippet
                 hits.append(MatchHit(method="keyword", pattern=kw, score=1.0, snippet=sn))
                 if len(hits) > 200:
                     break
 
-        for pat in self._wildcards:
-            for m in re.finditer(r"\b[\w\-']+\b", text, flags=re.UNICODE):
-                w = m.group(0)
-                if fnmatch.fnmatch(w.lower(), pat.lower()):
-                    sn = snippet_around(text, m.start(), m.end()).snippet
-                    hits.append(MatchHit(method="wildcard", pattern=pat, score=1.0, snippet=sn))
+        if self._wildcard_regexes:
+            # Tokenize once for all patterns, and test each distinct word once per pattern.
+            words = [(m.group(0).lower(), m.start(), m.end()) for m in _WILDCARD_WORD_RE.finditer(text)]
+            distinct = {w for w, _s, _e in words}
+            for pat, wrx in self._wildcard_regexes:
+                matched = {w for w in distinct if wrx.match(w)}
+                if not matched:
+                    continue
+                for w, start, end in words:
+                    if w in matched:
+                        sn = snippet_around(text, start, end).snippet
+                        hits.append(MatchHit(method="wildcard", pattern=pat, score=1.0, snippet=sn))
 
         for original, rx in self._regexes:
             for m in rx.finditer(text):
@@ -114,27 +167,18 @@ class KeywordMatcher:
                     break
 
         if self._query:
-            hits.extend(BooleanQueryEngine().evaluate(self._query, text))
-
-        if self._fuzzy and self._literals:
-            sentences = [s.strip() for s in re.split(r"[\n\.\?\!]+", text) if s.strip()]
-            for kw in self._literals[:200]:
-                # Fuzzy matching is intentionally conservative to reduce false positives.
-                # Skip single-word and very short keywords.
-                tokens = re.findall(r"\w+", kw, flags=re.UNICODE)
-                if len(tokens) <= 1:
-                    continue
-                if len(kw.strip()) < 8:
-                    continue
-                best = 0.0
-                best_sent = ""
-                for sent in sentences[:1500]:
-                    score = fuzz.token_set_ratio(kw.lower(), sent.lower()) / 100.0
-                    if score > best:
-                        best = score
-                        best_sent = sent
-                if best >= 0.92:
-                    hits.append(MatchHit(method="fuzzy", pattern=kw, score=best, snippet=best_sent[:350]))
+            hits.extend(self._query_engine.evaluate(self._query, text))
+
+        if self._fuzzy and self._fuzzy_keywords:
+            sentences = [s.strip() for s in re.split(r"[\n\.\?\!]+", text) if s.strip()][:1500]
+            if sentences:
+                best_per_kw = _best_fuzzy_sentences(
+                    [kw.lower() for kw in self._fuzzy_keywords], [sent.lower() for sent in sentences]
+                )
+                for kw, (score, idx) in zip(self._fuzzy_keywords, best_per_kw):
+                    best = score / 100.0
+                    if best >= 0.92:
+                        hits.append(MatchHit(method="fuzzy", pattern=kw, score=best, snippet=sentences[idx][:350]))
 
         if self._semantic_enabled and self._semantic is not None:
             for chunk in chunk_text(text, max_chars=3000, overlap=200):
@@ -142,7 +186,7 @@ class KeywordMatcher:
 
         seen: set[tuple[str, str, str]] = set()
         unique: list[MatchHit] = []
-        for h in sorted(hits, key=lambda x: x.score, reverse=True):
+        for h in sorted(hits, key=itemgetter(2), reverse=True):
             key = (h.method, h.pattern, h.snippet)
             if key in seen:
                 continue
@@ -157,6 +201,11 @@ class BooleanQueryEngine:
         flags=re.IGNORECASE,
     )
 
+    def __init__(self) -> None:
+        # Terms repeat across every text a query is evaluated against; build each once.
+        self._term_tokens_cache: dict[str, list[str]] = {}
+        self._term_rx_cache: dict[str, re.Pattern[str] | None] = {}
+
     def tokenize(self, query: str) -> list[str]:
         return [t for t in self._token_re.findall(query) if t.strip()]
 
@@ -200,25 +249,36 @@ class BooleanQueryEngine:
             out.append(stack.pop())
         return out
 
-    @staticmethod
-    def _term_tokens(term: str) -> list[str]:
+    def _term_tokens(self, term: str) -> list[str]:
         term = term.strip()
-        if term.startswith('"') and term.endswith('"'):
-            term = term[1:-1]
-        return re.findall(r"\w+", term, flags=re.UNICODE)
+        tokens = self._term_tokens_cache.get(term)
+        if tokens is None:
+            inner = term[1:-1] if term.startswith('"') and term.endswith('"') else term
+            tokens = re.findall(r"\w+", inner, flags=re.UNICODE)
+            self._term_tokens_cache[term] = tokens
+        return tokens
+
+    def _term_regex(self, term: str) -> re.Pattern[str] | None:
+        term = term.strip()
+        if term in self._term_rx_cache:
+            return self._term_rx_cache[term]
+        tokens = self._term_tokens(term)
+        rx: re.Pattern[str] | None = None
+        if tokens:
+            if len(tokens) == 1:
+                pat = rf"(?<!\w){re.escape(tokens[0])}(?!\w)"
+            else:
+                pat = rf"(?<!\w){r'\s+'.join(re.escape(t) for t in tokens)}(?!\w)"
+            try:
+                rx = re.compile(pat, flags=re.IGNORECASE | re.UNICODE)
+            except re.error:
+                rx = None
+        self._term_rx_cache[term] = rx
+        return rx
 
     def _term_present(self, term: str, text: str) -> bool:
-        tokens = self._term_tokens(term)
-        if not tokens:
-            return False
-        if len(tokens) == 1:
-            pat = rf"(?<!\w){re.escape(tokens[0])}(?!\w)"
-        else:
-            pat = rf"(?<!\w){r'\s+'.join(re.escape(t) for t in tokens)}(?!\w)"
-        try:
-            return re.search(pat, text, flags=re.IGNORECASE | re.UNICODE) is not None
-        except re.error:
-            return False
+        rx = self._term_regex(term)
+        return rx is not None and rx.search(text) is not None
 
     @staticmethod
     def _phrase_positions(words: list[str], phrase: list[str]) -> list[int]:
@@ -234,14 +294,25 @@ class BooleanQueryEngine:
                 positions.append(i)
         return positions
 
-    def _near_present(self, left: str, right: str, n: int, text: str) -> bool:
-        words = re.findall(r"\w+", text.lower(), flags=re.UNICODE)
-        left_phrase = [w.lower() for w in self._term_tokens(left)]
-        right_phrase = [w.lower() for w in self._term_tokens(right)]
+    def _near_present(
+        self,
+        left: str,
+        right: str,
+        n: int,
+        words: list[str],
+        positions: dict[tuple[str, ...], list[int]],
+    ) -> bool:
+        left_phrase = tuple(w.lower() for w in self._term_tokens(left))
+        right_phrase = tuple(w.lower() for w in self._term_tokens(right))
         if not left_phrase or not right_phrase:
             return False
-        left_pos = self._phrase_positions(words, left_phrase)
-        right_pos = self._phrase_positions(words, right_phrase)
+        # The same phrase often appears in several NEAR clauses; scan the words once per phrase.
+        left_pos = positions.get(left_phrase)
+        if left_pos is None:
+            left_pos = positions[left_phrase] = self._phrase_positions(words, list(left_phrase))
+        right_pos = positions.get(right_phrase)
+        if right_pos is None:
+            right_pos = positions[right_phrase] = self._phrase_positions(words, list(right_phrase))
         if not left_pos or not right_pos:
             return False
         # Distance in words between phrase starts.
@@ -253,6 +324,9 @@ class BooleanQueryEngine:
 
     def _eval_rpn(self, rpn: list[str], text: str) -> tuple[bool, str]:
         stack: list[tuple[bool, str]] = []
+        # Tokenized lazily, once per evaluation, and shared by every NEAR operator.
+        words: list[str] | None = None
+        positions: dict[tuple[str, ...], list[int]] = {}
         for tok in rpn:
             u = tok.upper()
             if u == "NOT":
@@ -270,7 +344,9 @@ class BooleanQueryEngine:
                 n = int(u.split("/", 1)[1])
                 right_ok, rd = stack.pop()
                 left_ok, ld = stack.pop()
-                ok = self._near_present(ld, rd, n, text)
+                if words is None:
+                    words = re.findall(r"\w+", text.lower(), flags=re.UNICODE)
+                ok = self._near_present(ld, rd, n, words, positions)
                 stack.append((ok, f"{ld} NEAR/{n} {rd}"))
             else:
                 present = self._term_present(tok, text)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import functools
 import logging
 import re
+import threading
 import unicodedata
+from bisect import bisect_right
 from dataclasses import dataclass
 from typing import Any, Iterable
 
@@ -11,6 +14,28 @@ logger = logging.getLogger(__name__)
 
 _PAGE_RE = re.compile(r"\[PAGE\s+(\d+)\]", flags=re.IGNORECASE)
 
+_REGEX_ENTITY_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
+    ("EMAIL", re.compile(r"\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b", re.IGNORECASE)),
+    ("URL", re.compile(r"\bhttps?://[^\s)\]}>'\"]+", re.IGNORECASE)),
+    (
+        "PHONE",
+        re.compile(
+            r"(?<!\d)(?:\+?1[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}(?!\d)"
+        ),
+    ),
+    ("SSN", re.compile(r"\b\d{3}-\d{2}-\d{4}\b")),
+)
+
+# Used by canonicalize_entity for every hit.
+_WS_RE = re.compile(r"\s+")
+_HONORIFIC_RE = re.compile(r"^(mr|mrs|ms|miss|dr|prof|sir|madam)\.?\s+")
+_NONDIGIT_RE = re.compile(r"\D+")
+_PUNCT_RE = re.compile(r"[^\w\s\-./@]")
+
+# Only `doc.ents` is read, so these components are never loaded. `tok2vec` (and
+# `transformer`) stay: NER in the stock pipelines depends on them.
+_SPACY_UNUSED_PIPES = ("parser", "tagger", "morphologizer", "lemmatizer", "attribute_ruler", "senter")
+
 
 @dataclass(frozen=True)
 class EntityHit:
@@ -21,82 +46,95 @@ class EntityHit:
     page_no: int | None
 
 
-def _page_no_for_offset(text: str, offset: int) -> int | None:
-    # Find the nearest preceding [PAGE N] marker.
-    last = None
-    for m in _PAGE_RE.finditer(text):
-        if m.start() > offset:
-            break
-        try:
-            last = int(m.group(1))
-        except Exception:
-            last = None
-    return last
+class _PageIndex:
+    """[PAGE N] marker positions of a text, scanned once and shared by all hits."""
+
+    def __init__(self, text: str) -> None:
+        self._starts: list[int] = []
+        self._pages: list[int] = []
+        for m in _PAGE_RE.finditer(text):
+            self._starts.append(m.start())
+            self._pages.append(int(m.group(1)))
+
+    def page_at(self, offset: int) -> int | None:
+        # Page of the nearest [PAGE N] marker starting at or before `offset`.
+        i = bisect_right(self._starts, offset)
+        return self._pages[i - 1] if i else None
 
 
 def canonicalize_entity(text: str, *, label: str) -> str:
     t = unicodedata.normalize("NFKC", text).strip()
-    t = re.sub(r"\s+", " ", t)
+    t = _WS_RE.sub(" ", t)
     t = t.strip(" \t\r\n\"'`.,;:()[]{}<>")
 
     low = t.lower()
     # Normalize common honorifics for people.
     if label.upper() == "PERSON":
-        low = re.sub(r"^(mr|mrs|ms|miss|dr|prof|sir|madam)\.?\s+", "", low)
-        low = re.sub(r"\s+", " ", low).strip()
+        low = _HONORIFIC_RE.sub("", low)
+        low = _WS_RE.sub(" ", low).strip()
 
     # For emails/urls/phones, keep minimal normalization.
     if label.upper() in {"EMAIL", "URL"}:
         return low
 
     if label.upper() in {"PHONE", "SSN"}:
-        return re.sub(r"\D+", "", low)
+        return _NONDIGIT_RE.sub("", low)
 
     # Generic: drop repeated punctuation.
-    low = re.sub(r"[^\w\s\-./@]", "", low)
-    low = re.sub(r"\s+", " ", low).strip()
+    low = _PUNCT_RE.sub("", low)
+    low = _WS_RE.sub(" ", low).strip()
     return low
 
 
-def _regex_entities(text: str) -> list[EntityHit]:
+def _regex_entities(text: str, pages: _PageIndex | None = None) -> list[EntityHit]:
+    pages = pages or _PageIndex(text)
     hits: list[EntityHit] = []
-
-    patterns: list[tuple[str, re.Pattern[str]]] = [
-        ("EMAIL", re.compile(r"\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b", re.IGNORECASE)),
-        ("URL", re.compile(r"\bhttps?://[^\s)\]}>'\"]+", re.IGNORECASE)),
-        (
-            "PHONE",
-            re.compile(
-                r"(?<!\d)(?:\+?1[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}(?!\d)"
-            ),
-        ),
-        ("SSN", re.compile(r"\b\d{3}-\d{2}-\d{4}\b")),
-    ]
-
-    for label, rx in patterns:
+    for label, rx in _REGEX_ENTITY_PATTERNS:
         for m in rx.finditer(text):
-            page_no = _page_no_for_offset(text, m.start())
+            page_no = pages.page_at(m.start())
             hits.append(EntityHit(label=label, text=m.group(0), start=m.start(), end=m.end(), page_no=page_no))
     return hits
 
 
-def _spacy_entities(text: str, model: str) -> list[EntityHit]:
+_SPACY_LOAD_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_spacy(model: str, exclude: tuple[str, ...]) -> tuple[Any, threading.Lock] | None:
+    """Load a spaCy pipeline once per process; None (also cached) if the model won't load.
+
+    The pipeline comes with a lock that callers hold while running it: spaCy does not
+    promise a `Language` object is safe to call from several threads at once.
+    """
+
+    import spacy  # type: ignore
+
     try:
-        import spacy  # type: ignore
+        return spacy.load(model, exclude=list(exclude)), threading.Lock()
+    except Exception as e:
+        logger.warning("spaCy model load failed (%s): %s", model, e)
+        return None
 
-        try:
-            nlp = spacy.load(model)
-        except Exception as e:
-            logger.warning("spaCy model load failed (%s): %s", model, e)
+
+def _spacy_entities(text: str, model: str, pages: _PageIndex | None = None) -> list[EntityHit]:
+    try:
+        # Documents are parsed on worker threads; the lock keeps them from loading the
+        # same model side by side on first use.
+        with _SPACY_LOAD_LOCK:
+            loaded = _load_spacy(model, _SPACY_UNUSED_PIPES)
+        if loaded is None:
             return []
 
-        doc = nlp(text)
+        nlp, nlp_lock = loaded
+        with nlp_lock:
+            doc = nlp(text)
+        pages = pages or _PageIndex(text)
         hits: list[EntityHit] = []
         for ent in doc.ents:
             label = ent.label_.upper()
             if not ent.text or not ent.text.strip():
                 continue
-            page_no = _page_no_for_offset(text, ent.start_char)
+            page_no = pages.page_at(ent.start_char)
             hits.append(EntityHit(label=label, text=ent.text, start=ent.start_char, end=ent.end_char, page_no=page_no))
         return hits
     except Exception as e:
@@ -129,10 +167,11 @@ def extract_entities(
 
     hits: list[EntityHit] = []
     # Always run regex extraction (cheap and useful).
-    hits.extend(_regex_entities(text))
+    pages = _PageIndex(text)
+    hits.extend(_regex_entities(text, pages))
 
     if engine == "spacy":
-        hits.extend(_spacy_entities(text, spacy_model))
+        hits.extend(_spacy_entities(text, spacy_model, pages))
     elif engine == "regex":
         pass
     else:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -28,6 +31,7 @@ class DocumentParser:
         ocr_preprocess: bool = True,
         ocr_median_filter: bool = True,
         ocr_threshold: int | None = None,
+        ocr_workers: int = 0,
     ) -> None:
         self._ocr_enabled = ocr_enabled
         self._ocr_engine = (ocr_engine or "tesseract").strip().lower()
@@ -35,6 +39,7 @@ class DocumentParser:
         self._ocr_preprocess = bool(ocr_preprocess)
         self._ocr_median_filter = bool(ocr_median_filter)
         self._ocr_threshold = ocr_threshold
+        self._ocr_workers = int(ocr_workers) if int(ocr_workers) > 0 else min(4, os.cpu_count() or 1)
 
     def parse(self, path: Path, content_type: str, fallback_title: str = "") -> ParsedDocument:
         suffix = path.suffix.lower()
@@ -69,36 +74,40 @@ class DocumentParser:
     def _parse_pdf(self, path: Path, fallback_title: str) -> ParsedDocument:
         doc = fitz.open(str(path))
         try:
-            page_texts: list[str] = []
+            # Page headers and page texts are kept as separate parts and joined once at
+            # the end, so no page's text is copied before the final string is built.
+            parts: list[str] = []
+            pages = 0
+            meaningful = 0
             for idx, page in enumerate(doc, start=1):
+                pages = idx
+                parts.append(f"\n[PAGE {idx}]\n" if idx == 1 else f"\n\n[PAGE {idx}]\n")
                 t = page.get_text("text")
-                if t and t.strip():
-                    page_texts.append(f"\n[PAGE {idx}]\n{t}")
-                else:
-                    page_texts.append(f"\n[PAGE {idx}]\n")
+                if t and not t.isspace():
+                    parts.append(t)
+                    # Text-layer density is judged during extraction, not in a second pass.
+                    meaningful += self._is_meaningful_page_text(t)
 
-            text = "\n".join(p for p in page_texts if p.strip())
-
-            if self._ocr_enabled and self._looks_like_scanned_pages(page_texts):
+            if self._ocr_enabled and self._is_sparse(meaningful, pages):
+                logger.debug("PDF text layer sparse (%d/%d pages); trying OCR: %s", meaningful, pages, path)
                 ocr_text = self._ocr_pdf(doc)
                 if ocr_text.strip():
                     return ParsedDocument(title=fallback_title or path.name, text=ocr_text, ocr_used=True)
-            return ParsedDocument(title=fallback_title or path.name, text=text, ocr_used=False)
+            return ParsedDocument(title=fallback_title or path.name, text="".join(parts), ocr_used=False)
         finally:
             doc.close()
 
     @staticmethod
-    def _looks_like_scanned_pages(page_texts: list[str]) -> bool:
+    def _is_meaningful_page_text(t: str) -> bool:
+        # At least 40 characters, not counting [PAGE N] header lines.
+        if "[PAGE " in t:
+            t = "\n".join(line for line in t.splitlines() if not line.startswith("[PAGE "))
+        return len(t.strip()) >= 40
+
+    @staticmethod
+    def _is_sparse(meaningful: int, pages: int) -> bool:
         # Heuristic: treat as scanned if most pages have very little extractable text.
-        if not page_texts:
-            return True
-        meaningful = 0
-        for t in page_texts:
-            # Ignore the [PAGE N] header when judging density.
-            cleaned = "\n".join(line for line in t.splitlines() if not line.startswith("[PAGE "))
-            if len(cleaned.strip()) >= 40:
-                meaningful += 1
-        return meaningful / max(1, len(page_texts)) < 0.35
+        return pages == 0 or meaningful / pages < 0.35
 
     def _ocr_pdf(self, doc: fitz.Document) -> str:
         if not self._ocr_enabled or self._ocr_engine == "none":
@@ -141,13 +150,30 @@ class DocumentParser:
             # Best-effort; if this fails, pytesseract will likely raise later.
             pass
 
+        def ocr_page(img) -> str:
+            return pytesseract.image_to_string(self._preprocess_for_ocr(img))
+
         texts: list[str] = []
         dpi = max(72, min(600, int(self._ocr_dpi)))
-        for page in doc:
-            pix = page.get_pixmap(dpi=dpi)
-            img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-            img2 = self._preprocess_for_ocr(img)
-            texts.append(pytesseract.image_to_string(img2))
+        if self._ocr_workers <= 1:
+            for page in doc:
+                pix = page.get_pixmap(dpi=dpi)
+                texts.append(ocr_page(Image.frombytes("RGB", (pix.width, pix.height), pix.samples)))
+            return "\n".join(t.strip() for t in texts if t.strip())
+
+        # Each pytesseract call waits on a tesseract subprocess, so threads overlap the
+        # pages. PyMuPDF isn't thread-safe: pages are rendered here, in order, with a
+        # bounded number in flight to cap memory.
+        pending: deque[Future[str]] = deque()
+        with ThreadPoolExecutor(max_workers=self._ocr_workers, thread_name_prefix="ocr") as ex:
+            for page in doc:
+                pix = page.get_pixmap(dpi=dpi)
+                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                pending.append(ex.submit(ocr_page, img))
+                if len(pending) >= 2 * self._ocr_workers:
+                    texts.append(pending.popleft().result())
+            while pending:
+                texts.append(pending.popleft().result())
         return "\n".join(t.strip() for t in texts if t.strip())
 
     def _preprocess_for_ocr(self, img):
@@ -186,6 +212,26 @@ class DocumentParser:
         if total <= 0:
             return 128
 
+        try:
+            import numpy as np  # type: ignore
+        except ImportError:
+            np = None
+        if np is not None:
+            # Between-class variance for every threshold at once; invalid splits (an
+            # empty class) are excluded and argmax keeps the first maximum, as below.
+            h = np.asarray(hist[:256], dtype=np.float64)
+            w_b_all = np.cumsum(h)
+            w_f_all = float(total) - w_b_all
+            sum_b_all = np.cumsum(h * np.arange(256))
+            valid = (w_b_all > 0) & (w_f_all > 0)
+            if not valid.any():
+                return 128
+            with np.errstate(divide="ignore", invalid="ignore"):
+                m_b_all = sum_b_all / w_b_all
+                m_f_all = (sum_b_all[-1] - sum_b_all) / w_f_all
+                var_all = w_b_all * w_f_all * (m_b_all - m_f_all) ** 2
+            return int(np.argmax(np.where(valid, var_all, -np.inf)))
+
         sum_total = sum(i * hist[i] for i in range(256))
         sum_b = 0.0
         w_b = 0.0
@@ -5,7 +5,7 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
 
 from doj_disclosures.core.ai_flagger import LinearFlaggerModel, load_ai_flagger_model
 from doj_disclosures.core.config import CrawlSettings
@@ -289,6 +289,12 @@ async def process_document(
     )
     await deps.db.add_fts_content(doc_id=doc_id, url=inp.url, title=parsed.title, content=parsed.text)
 
+    # Derived rows are collected here and written together in one transaction below.
+    page_flags: list[dict[str, Any]] = []
+    embeddings: list[dict[str, Any]] = []
+    entities: list[dict[str, Any]] = []
+    tables: list[dict[str, Any]] = []
+
     # Redaction flags (best-effort)
     if bool(getattr(s, "redaction_detection_enabled", True)) and (
         "pdf" in (inp.content_type or "").lower() or str(final_path).lower().endswith(".pdf")
@@ -299,7 +305,7 @@ async def process_document(
                 lambda: analyze_pdf_redactions(Path(str(final_path)), extracted_text=parsed.text),
             )
             thr = float(getattr(s, "redaction_page_score_threshold", 0.25) or 0.25)
-            flags = [
+            page_flags = [
                 {
                     "page_no": int(f.get("page_no") or 0),
                     "flag": "redaction",
@@ -309,8 +315,6 @@ async def process_document(
                 for f in (findings or [])
                 if float(f.get("score") or 0.0) >= thr
             ]
-            if flags:
-                await deps.db.add_page_flags(doc_id=doc_id, flags=flags, created_at=now)
         except Exception as e:
             log(f"WARN: redaction detection failed: {e}")
 
@@ -322,10 +326,12 @@ async def process_document(
             if idx_provider is not None:
                 embeddings = await asyncio.get_running_loop().run_in_executor(
                     None,
-                    lambda: build_embeddings_for_text(parsed.text, provider=idx_provider),
+                    lambda: build_embeddings_for_text(
+                        parsed.text,
+                        provider=idx_provider,
+                        quant=str(getattr(s, "embedding_quant", "int8")),
+                    ),
                 )
-                if embeddings:
-                    await deps.db.add_embeddings(doc_id=doc_id, embeddings=embeddings, created_at=now)
         except Exception as e:
             log(f"WARN: embedding index failed: {e}")
 
@@ -341,8 +347,6 @@ async def process_document(
                     spacy_model=str(getattr(s, "ner_spacy_model", "en_core_web_sm")),
                 ),
             )
-            if entities:
-                await deps.db.add_entities(doc_id=doc_id, entities=entities, created_at=now)
         except Exception as e:
             log(f"WARN: entity extraction failed: {e}")
 
@@ -353,17 +357,24 @@ async def process_document(
                 None,
                 lambda: extract_tables_from_pdf(Path(str(final_path))),
             )
-            if tables:
-                await deps.db.add_tables(doc_id=doc_id, tables=tables, created_at=now)
         except Exception as e:
             log(f"WARN: table extraction failed: {e}")
 
-    if hits:
-        await deps.db.add_matches(
+    try:
+        await deps.db.add_doc_bundle(
             doc_id=doc_id,
-            matches=[(h.method, h.pattern, h.score, h.snippet) for h in hits],
             created_at=now,
+            matches=hits,
+            page_flags=page_flags,
+            tables=tables or [],
+            entities=entities or [],
+            embeddings=embeddings or [],
         )
+    except Exception as e:
+        # The bundle rolled back as a whole. Page flags, embeddings, entities and tables
+        # are best-effort; the matches are not, so store them on their own (and let that raise).
+        log(f"WARN: storing derived rows failed: {e}")
+        await deps.db.add_matches(doc_id=doc_id, matches=hits, created_at=now)
 
     metrics = PipelineMetrics(
         topic_similarity=float(topic_sim),
@@ -80,6 +80,9 @@ def _drawing_black_area_ratio(page: fitz.Page) -> tuple[float, int]:
     return min(1.0, black_area / page_area), big_rects
 
 
+_DARK_BYTES = bytes(range(40))
+
+
 def _dark_pixel_ratio(page: fitz.Page, *, dpi: int = 50) -> float:
     # Rasterize low DPI and count very dark pixels; useful for black-box redactions embedded as images.
     try:
@@ -87,12 +90,9 @@ def _dark_pixel_ratio(page: fitz.Page, *, dpi: int = 50) -> float:
         samples = pix.samples
         if not samples:
             return 0.0
-        # samples are bytes 0..255.
-        dark = 0
+        # samples are bytes 0..255; deleting the dark ones (< 40) counts them in C.
         total = len(samples)
-        for b in samples:
-            if b < 40:
-                dark += 1
+        dark = total - len(samples.translate(None, _DARK_BYTES))
         return float(dark / max(1, total))
     except Exception:
         return 0.0
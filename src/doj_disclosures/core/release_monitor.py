@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterable
 
 from doj_disclosures.core.db import Database
+from doj_disclosures.core.utils import json_dumps, json_loads
 
 
 SNAPSHOT_KEY = "release_snapshot_v1"
@@ -39,27 +39,41 @@ def _key_fields(row: dict[str, Any]) -> tuple[Any, ...]:
     )
 
 
-def compute_release_diff(prev_rows: list[dict[str, Any]], cur_rows: list[dict[str, Any]]) -> ReleaseDiff:
-    now = datetime.now(timezone.utc).isoformat()
-    prev = {str(r.get("url")): r for r in prev_rows if r.get("url")}
-    cur = {str(r.get("url")): r for r in cur_rows if r.get("url")}
+class _ReleaseDiffBuilder:
+    """Compares current rows, fed one at a time, against the previous snapshot."""
 
-    added: list[dict[str, Any]] = []
-    removed: list[dict[str, Any]] = []
-    changed: list[dict[str, Any]] = []
+    def __init__(self, prev_rows: Iterable[dict[str, Any]]) -> None:
+        self._prev = {str(r.get("url")): r for r in prev_rows if r.get("url")}
+        self._seen: set[str] = set()
+        self._added: list[dict[str, Any]] = []
+        self._changed: list[dict[str, Any]] = []
 
-    for url, r in cur.items():
-        if url not in prev:
-            added.append(r)
-        else:
-            if _key_fields(prev[url]) != _key_fields(r):
-                changed.append({"url": url, "before": prev[url], "after": r})
+    def add(self, row: dict[str, Any]) -> None:
+        url = str(row.get("url") or "")
+        if not url or url in self._seen:
+            return
+        self._seen.add(url)
+        before = self._prev.get(url)
+        if before is None:
+            self._added.append(row)
+        elif _key_fields(before) != _key_fields(row):
+            self._changed.append({"url": url, "before": before, "after": row})
 
-    for url, r in prev.items():
-        if url not in cur:
-            removed.append(r)
+    def finish(self) -> ReleaseDiff:
+        removed = [r for url, r in self._prev.items() if url not in self._seen]
+        return ReleaseDiff(
+            created_at=datetime.now(timezone.utc).isoformat(),
+            added=self._added,
+            removed=removed,
+            changed=self._changed,
+        )
 
-    return ReleaseDiff(created_at=now, added=added, removed=removed, changed=changed)
+
+def compute_release_diff(prev_rows: Iterable[dict[str, Any]], cur_rows: Iterable[dict[str, Any]]) -> ReleaseDiff:
+    builder = _ReleaseDiffBuilder(prev_rows)
+    for r in cur_rows:
+        builder.add(r)
+    return builder.finish()
 
 
 async def load_previous_snapshot(db: Database) -> list[dict[str, Any]]:
@@ -67,19 +81,28 @@ async def load_previous_snapshot(db: Database) -> list[dict[str, Any]]:
     if not raw:
         return []
     try:
-        data = json.loads(raw)
+        data = json_loads(raw)
         return data if isinstance(data, list) else []
     except Exception:
         return []
 
 
 async def store_snapshot_and_diff(db: Database) -> ReleaseDiff:
-    prev_rows = await load_previous_snapshot(db)
-    cur_rows = await db.get_release_snapshot_rows()
-    diff = compute_release_diff(prev_rows, cur_rows)
+    """Diff the current URL table against the stored snapshot, then replace the snapshot.
+
+    Current rows are streamed from the DB: each is compared against the previous
+    snapshot and serialized as it arrives, so only the encoded JSON is kept in memory.
+    """
+
+    builder = _ReleaseDiffBuilder(await load_previous_snapshot(db))
+    encoded: list[str] = []
+    async for r in db.iter_release_snapshot_rows():
+        encoded.append(json_dumps(r))
+        builder.add(r)
+    diff = builder.finish()
 
-    await db.kv_set(LAST_DIFF_KEY, json.dumps(diff.to_dict()))
-    await db.kv_set(SNAPSHOT_KEY, json.dumps(cur_rows))
+    await db.kv_set(LAST_DIFF_KEY, json_dumps(diff.to_dict()))
+    await db.kv_set(SNAPSHOT_KEY, "[" + ", ".join(encoded) + "]")
     return diff
 
 
@@ -88,7 +111,7 @@ async def load_last_diff(db: Database) -> dict[str, Any] | None:
     if not raw:
         return None
     try:
-        data = json.loads(raw)
+        data = json_loads(raw)
         return data if isinstance(data, dict) else None
     except Exception:
         return None
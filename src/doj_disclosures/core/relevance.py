@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 import logging
 from dataclasses import dataclass
 from typing import Any
 from urllib.parse import urlparse
 
 from doj_disclosures.core.embeddings import EmbeddingProvider, cosine_similarity, vector_to_blob, blob_to_vector
+from doj_disclosures.core.utils import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +78,7 @@ def load_url_penalties(raw_json: str | None) -> dict[str, float]:
     if not raw_json:
         return {}
     try:
-        data = json.loads(raw_json)
+        data = json_loads(raw_json)
         if isinstance(data, dict):
             out: dict[str, float] = {}
             for k, v in data.items():
@@ -95,7 +95,7 @@ def load_url_penalties(raw_json: str | None) -> dict[str, float]:
 
 
 def dump_url_penalties(penalties: dict[str, float]) -> str:
-    return json.dumps(penalties, sort_keys=True)
+    return json_dumps(penalties, sort_keys=True)
 
 
 def compute_relevance(
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import errno
 import hashlib
+import json
+import mmap
 import os
 import random
 import re
+import shutil
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Callable, Iterator
 from urllib.parse import urljoin, urlparse, urlunparse
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 
 def normalize_url(url: str, base: str | None = None) -> str:
     if base:
@@ -32,15 +42,34 @@ def is_same_site(url: str, start_url: str) -> bool:
     return canon(urlparse(url).netloc) == canon(urlparse(start_url).netloc)
 
 
-def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    digest = hashlib.sha256()
+def file_digest(path: Path, name: str = "sha256", chunk_size: int = 4 * 1024 * 1024) -> Any:
+    """Return a hashlib digest object primed with the contents of `path`.
+
+    The file is memory-mapped and hashed in one `update` call, which hashlib runs
+    without holding the GIL. Files that cannot be mapped (empty, special) go through
+    `hashlib.file_digest` on Python 3.11+, or a `readinto` loop before that.
+    """
+
     with path.open("rb") as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            digest.update(chunk)
-    return digest.hexdigest()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest = hashlib.new(name)
+                digest.update(mm)
+                return digest
+        except (ValueError, OSError):
+            pass
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, name)
+        digest = hashlib.new(name)
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            digest.update(view[:n])
+        return digest
+
+
+def sha256_file(path: Path, chunk_size: int = 4 * 1024 * 1024) -> str:
+    return file_digest(path, "sha256", chunk_size).hexdigest()
 
 
 def safe_filename(name: str, max_len: int = 160) -> str:
@@ -54,6 +83,12 @@ def safe_filename(name: str, max_len: int = 160) -> str:
     return name
 
 
+def epoch_us() -> int:
+    """Current UTC time as integer microseconds since the Unix epoch."""
+
+    return time.time_ns() // 1000
+
+
 async def async_backoff_sleep(attempt: int, base_seconds: float) -> None:
     delay = base_seconds * (2 ** max(0, attempt - 1))
     delay *= random.uniform(0.85, 1.15)
@@ -87,4 +122,34 @@ def snippet_around(text: str, start: int, end: int, context: int = 90) -> MatchS
 
 def atomic_rename(src: Path, dst: Path) -> None:
     dst.parent.mkdir(parents=True, exist_ok=True)
-    os.replace(src, dst)
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Different filesystems (e.g. a tmpfs scratch dir): copy beside the target,
+        # then replace, so readers still never see a half-written file.
+        tmp = dst.with_name(f"{dst.name}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        src.unlink()
+
+
+def json_dumps(obj: Any, *, sort_keys: bool = False) -> str:
+    """Compact UTF-8 JSON text; uses orjson when installed (the 'speedups' extra).
+
+    The stdlib fallback uses the same separators and leaves non-ASCII unescaped, so
+    stored text doesn't depend on the extra (NaN/inf still differ: orjson writes null).
+    """
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            # orjson is stricter about exotic types (e.g. float subclasses); stdlib copes.
+            pass
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False)
+
+
+json_loads: Callable[[str | bytes], Any] = orjson.loads if orjson is not None else json.loads
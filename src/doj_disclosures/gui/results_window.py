@@ -24,7 +24,7 @@ from PySide6.QtWidgets import (
 from doj_disclosures.core.db import Database
 from doj_disclosures.core.config import AppConfig
 from doj_disclosures.core.embeddings import get_default_provider
-from doj_disclosures.core.feedback import apply_feedback
+from doj_disclosures.core.feedback import FeedbackContext, apply_feedback
 from doj_disclosures.core.hybrid_search import HybridSearcher
 
 
@@ -36,6 +36,9 @@ class ResultsWindow(QDialog):
         self._db = db
         self._doc_map: dict[int, dict] = {}
         self._searcher = HybridSearcher(db=db)
+        # Loading the embedding model takes seconds; keep it (and the storage dirs) between clicks.
+        self._feedback_provider: tuple[str, object] | None = None
+        self._feedback_ctx: FeedbackContext | None = None
 
         self.list = QListWidget()
         self.details = QTextEdit()
@@ -284,7 +287,7 @@ class ResultsWindow(QDialog):
         if not doc:
             return
         matches = asyncio.run(self._db.query_matches_for_doc(doc_id))
-        status = asyncio.run(self._db.get_review_status(doc_id=doc_id))
+        status = str(asyncio.run(self._db.get_document_full(doc_id=doc_id)).get("review_status") or "new")
         redactions = asyncio.run(self._db.query_page_flags_for_doc(doc_id=doc_id, flag="redaction"))
         content = asyncio.run(self._db.get_fts_content(doc_id=doc_id)) or ""
 
@@ -337,7 +340,11 @@ class ResultsWindow(QDialog):
         doc_id = int(item.data(256))
         cfg = AppConfig.load()
         model_name = str(getattr(cfg.crawl, "embedding_model_name", "sentence-transformers/all-MiniLM-L6-v2"))
-        provider = get_default_provider(model_name)
+        if self._feedback_provider is None or self._feedback_provider[0] != model_name:
+            self._feedback_provider = (model_name, get_default_provider(model_name))
+        provider = self._feedback_provider[1]
+        if self._feedback_ctx is None or self._feedback_ctx.output_dir != Path(cfg.paths.output_dir):
+            self._feedback_ctx = FeedbackContext.for_output_dir(cfg.paths.output_dir)
         asyncio.run(
             apply_feedback(
                 db=self._db,
@@ -347,13 +354,20 @@ class ResultsWindow(QDialog):
                 model_name=model_name,
                 output_dir=cfg.paths.output_dir,
                 storage_layout=str(getattr(cfg.crawl, "storage_layout", "flat")),
+                ctx=self._feedback_ctx,
             )
         )
 
         # Refresh label in UI
-        st = asyncio.run(self._db.get_review_status(doc_id=doc_id))
+        full = asyncio.run(self._db.get_document_full(doc_id=doc_id))
+        st = str(full.get("review_status") or "new")
         doc = self._doc_map.get(doc_id) or {}
         doc["review_status"] = st
+        if full.get("local_path"):
+            # apply_feedback may have moved the file into a Flagged subfolder.
+            doc["local_path"] = full["local_path"]
+        if full.get("redaction_max") is not None:
+            doc["redaction_max"] = float(full["redaction_max"])
         self._doc_map[doc_id] = doc
         title = str(doc.get("title") or "(untitled)")
         red = float(doc.get("redaction_max") or 0.0)
@@ -114,12 +114,15 @@ class SettingsDialog(QDialog):
             ocr_preprocess=bool(getattr(self._config.crawl, "ocr_preprocess", True)),
             ocr_median_filter=bool(getattr(self._config.crawl, "ocr_median_filter", True)),
             ocr_threshold=getattr(self._config.crawl, "ocr_threshold", None),
+            ocr_workers=int(getattr(self._config.crawl, "ocr_workers", 0)),
             ner_enabled=bool(getattr(self._config.crawl, "ner_enabled", True)),
             ner_engine=str(getattr(self._config.crawl, "ner_engine", "spacy")),
             ner_spacy_model=str(getattr(self._config.crawl, "ner_spacy_model", "en_core_web_sm")),
             embedding_index_enabled=bool(getattr(self._config.crawl, "embedding_index_enabled", False)),
             embedding_model_name=str(getattr(self._config.crawl, "embedding_model_name", "sentence-transformers/all-MiniLM-L6-v2")),
+            embedding_quant=str(getattr(self._config.crawl, "embedding_quant", "int8")),
             storage_layout=str(getattr(self._config.crawl, "storage_layout", "flat")),
+            scratch_dir=str(getattr(self._config.crawl, "scratch_dir", "") or ""),
             redaction_detection_enabled=bool(getattr(self._config.crawl, "redaction_detection_enabled", True)),
             redaction_page_score_threshold=float(getattr(self._config.crawl, "redaction_page_score_threshold", 0.25)),
             semantic_enabled=self.semantic.isChecked(),
@@ -130,6 +133,9 @@ class SettingsDialog(QDialog):
             reprocess_cached_on_not_modified=self.reprocess_cached.isChecked(),
             use_browser_for_blocked_pages=self.browser_fallback.isChecked(),
             cookie_header=self.cookie_header.text().strip(),
+            track_in_progress=bool(getattr(self._config.crawl, "track_in_progress", False)),
+            max_html_bytes=int(getattr(self._config.crawl, "max_html_bytes", 2_000_000)),
+            db_synchronous=str(getattr(self._config.crawl, "db_synchronous", "NORMAL")),
             stopwords=self.stopwords.text().strip(),
             query=self.query.text().strip(),
             feedback_auto_flag_enabled=bool(getattr(self._config.crawl, "feedback_auto_flag_enabled", True)),
@@ -43,6 +43,7 @@ async def test_crawler_discovers_links(tmp_db_path) -> None:
             assert any(u == "https://example.com/a.pdf" for u, _ in pending)
             assert not any(u == "https://example.com/page" for u, _ in pending)
             assert any(u == "https://example.com/start?page=1" for u, _ in pending)
+    await db.aclose()
 
 
 @pytest.mark.asyncio
@@ -69,3 +70,69 @@ async def test_crawler_discovers_links_recursive_mode(tmp_db_path) -> None:
             pending = await db.get_pending_urls(limit=10)
             assert any(u == "https://example.com/a.pdf" for u, _ in pending)
             assert any(u == "https://example.com/start/page" for u, _ in pending)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_crawler_buffers_links_until_flush(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    pause = asyncio.Event(); pause.set()
+    stop = asyncio.Event()
+    settings = CrawlSettings(start_url="https://example.com/start", allow_offsite=False, follow_discovered_pages=False)
+
+    with aioresponses() as m:
+        m.get("https://example.com/robots.txt", status=200, body="User-agent: *\nDisallow:\n")
+        for name in ("a", "b"):
+            m.get(
+                f"https://example.com/start?page={name}",
+                status=200,
+                body=f"<html><body><a href='/{name}.pdf'>pdf</a></body></html>",
+                headers={"Content-Type": "text/html"},
+            )
+
+        async with aiohttp.ClientSession() as session:
+            c = Crawler(db=db, settings=settings, session=session, pause_event=pause, stop_event=stop)
+            await c.initialize()
+            await c.process_page("https://example.com/start?page=a")
+            await c.process_page("https://example.com/start?page=b")
+            await c.flush_discovered()
+
+    pending = [u for u, _ in await db.get_pending_urls(limit=10)]
+    assert "https://example.com/a.pdf" in pending
+    assert "https://example.com/b.pdf" in pending
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stopping_iteration_flushes_buffered_links(tmp_db_path, monkeypatch) -> None:
+    from doj_disclosures.core import crawler as crawler_mod
+
+    # Freeze the flush clock so only the stop path can write the links.
+    monkeypatch.setattr(crawler_mod, "monotonic", lambda: 0.0)
+    monkeypatch.setattr(crawler_mod, "LINK_FLUSH_INTERVAL_SECONDS", 3600.0)
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    pause = asyncio.Event(); pause.set()
+    stop = asyncio.Event()
+    settings = CrawlSettings(start_url="https://example.com/start", allow_offsite=False, follow_discovered_pages=False)
+
+    with aioresponses() as m:
+        m.get("https://example.com/robots.txt", status=200, body="User-agent: *\nDisallow:\n")
+        m.get(
+            "https://example.com/start",
+            status=200,
+            body="<html><body><a href='/a.pdf'>pdf</a></body></html>",
+            headers={"Content-Type": "text/html"},
+        )
+
+        async with aiohttp.ClientSession() as session:
+            c = Crawler(db=db, settings=settings, session=session, pause_event=pause, stop_event=stop)
+            await c.initialize(seed_urls=["https://example.com/start"])
+            async for item in c.iter_discovered():
+                await c.process_page(item.url)
+                stop.set()
+
+    pending = [u for u, _ in await db.get_pending_urls(limit=10)]
+    assert "https://example.com/a.pdf" in pending
+    await db.aclose()
@@ -23,3 +23,256 @@ async def test_db_init_and_fts_insert(tmp_db_path) -> None:
     await db.add_matches(doc_id=doc_id, matches=[("keyword", "hello", 1.0, "hello")], created_at="2020-01-01T00:00:00Z")
     rows = await db.query_flagged(limit=10)
     assert rows and rows[0]["doc_id"] == doc_id
+    await db.aclose()
+
+
+def test_db_migrates_text_url_timestamps(tmp_db_path) -> None:
+    import sqlite3
+
+    conn = sqlite3.connect(tmp_db_path)
+    conn.execute(
+        "CREATE TABLE urls (url TEXT PRIMARY KEY, status TEXT NOT NULL, discovered_at TEXT NOT NULL, "
+        "last_attempt_at TEXT, http_status INTEGER, error TEXT, content_type TEXT, title TEXT, "
+        "final_url TEXT, local_path TEXT, sha256 TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO urls(url,status,discovered_at,last_attempt_at) VALUES(?,?,?,?)",
+        ("https://x/a.pdf", "done", "1970-01-01T00:00:01+00:00", None),
+    )
+    conn.commit()
+    conn.close()
+
+    Database(tmp_db_path).initialize_sync()
+
+    conn = sqlite3.connect(tmp_db_path)
+    try:
+        row = conn.execute("SELECT discovered_at, typeof(discovered_at), last_attempt_at, is_pdf FROM urls").fetchone()
+    finally:
+        conn.close()
+    assert row == (1_000_000, "integer", None, 1)
+
+
+@pytest.mark.asyncio
+async def test_url_attempts_are_buffered_until_next_read(tmp_db_path) -> None:
+    import sqlite3
+
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.upsert_urls(urls=["https://x/a", "https://x/b"], status="queued", discovered_at=1)
+    await db.update_url_attempt(url="https://x/a", status="done", last_attempt_at=2, http_status=200, error=None)
+    await db.update_url_attempt(url="https://x/b", status="retry", last_attempt_at=2, http_status=None, error="boom")
+
+    raw = sqlite3.connect(tmp_db_path)
+    try:
+        assert raw.execute("SELECT COUNT(*) FROM urls WHERE status='queued'").fetchone()[0] == 2
+    finally:
+        raw.close()
+
+    assert await db.get_url_debug_info(url="https://x/b") == ("retry", None, "boom")
+    assert await db.get_url_debug_info(url="https://x/a") == ("done", 200, None)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_background_flush_is_logged_and_kept_pending(tmp_db_path, monkeypatch, caplog) -> None:
+    import asyncio
+    import sqlite3
+
+    import doj_disclosures.core.db as db_mod
+
+    monkeypatch.setattr(db_mod, "URL_ATTEMPT_FLUSH_SECONDS", 0.0)
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.upsert_urls(urls=["https://x/a"], status="queued", discovered_at=1)
+
+    async def _fail(_self, _conn) -> None:
+        raise sqlite3.OperationalError("disk I/O error")
+
+    with monkeypatch.context() as m:
+        m.setattr(Database, "_apply_pending_attempts", _fail)
+        await db.update_url_attempt(url="https://x/a", status="done", last_attempt_at=2, http_status=200, error=None)
+        await asyncio.sleep(0.05)
+    assert "Background flush of buffered URL attempts failed" in caplog.text
+
+    assert await db.get_url_debug_info(url="https://x/a") == ("done", 200, None)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_status_and_redaction_maps_accept_long_id_lists(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.set_review_status(doc_id=7, status="reviewed", updated_at="2020-01-01T00:00:00Z")
+    await db.add_page_flags(
+        doc_id=7,
+        flags=[{"page_no": 1, "flag": "redaction", "score": 0.25}, {"page_no": 2, "flag": "redaction", "score": 0.5}],
+        created_at="2020-01-01T00:00:00Z",
+    )
+
+    ids = list(range(1, 40_001))
+    assert await db.get_review_status_map(doc_ids=ids) == {7: "reviewed"}
+    assert await db.get_redaction_max_map(doc_ids=ids) == {7: 0.5}
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fts_search_quotes_queries_with_fts_syntax(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.add_fts_content(doc_id=1, url="u", title="memo", content="the defendant's co-counsel filed it")
+
+    for query in ("defendant's", "co-counsel", "filed:"):
+        rows = await db.fts_search(query=query)
+        assert [r["doc_id"] for r in rows] == [1]
+        assert rows[0]["bm25"] != 0.0  # served by MATCH, not the LIKE fallback
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_url_cached_record_cache_is_invalidated_by_writes(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    url = "https://example.com/a.pdf"
+
+    assert await db.get_url_cached_record(url=url) is None
+    await db.upsert_url(url=url, status="queued", discovered_at=1)
+    rec = await db.get_url_cached_record(url=url)
+    assert rec is not None and rec.local_path is None
+
+    await db.update_url_attempt(
+        url=url, status="done", last_attempt_at=2, http_status=200, error=None, local_path="/x/a.pdf", sha256="b" * 64
+    )
+    rec = await db.get_url_cached_record(url=url)
+    assert rec is not None and rec.local_path == "/x/a.pdf"
+    assert await db.get_url_cached_record(url=url) is rec
+
+    await db.update_paths_for_sha256(sha256="b" * 64, local_path="/y/a.pdf")
+    rec = await db.get_url_cached_record(url=url)
+    assert rec is not None and rec.local_path == "/y/a.pdf"
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_document_full_includes_review_status_and_redaction_max(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    doc_id = await db.add_document(
+        url="u",
+        final_url="u",
+        title="t",
+        content_type="application/pdf",
+        file_size=None,
+        sha256="c" * 64,
+        local_path="/tmp/x",
+        fetched_at="2020-01-01T00:00:00Z",
+    )
+    full = await db.get_document_full(doc_id=doc_id)
+    assert full["review_status"] == "new"
+    assert full["redaction_max"] is None
+    assert {k: full[k] for k in await db.get_document(doc_id=doc_id)} == await db.get_document(doc_id=doc_id)
+
+    await db.set_review_status(doc_id=doc_id, status="high_value", updated_at="2020-01-02T00:00:00Z")
+    await db.add_page_flags(doc_id=doc_id, flags=[{"page_no": 3, "flag": "redaction", "score": 0.75}], created_at="x")
+    full = await db.get_document_full(doc_id=doc_id)
+    assert (full["review_status"], full["redaction_max"]) == ("high_value", 0.75)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_transaction_groups_writes_and_rolls_back_together(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    table = {"page_no": 1, "table_index": 0, "format": "rows", "data": [["a"]]}
+
+    with pytest.raises(RuntimeError):
+        async with db.transaction():
+            await db.add_matches(doc_id=1, matches=[("regex", "p", 1.0, "s")], created_at="x")
+            await db.add_tables(doc_id=1, tables=[table], created_at="x")
+            raise RuntimeError("boom")
+    assert await db.query_matches_for_doc(1) == []
+    assert await db.query_tables_for_doc(1) == []
+
+    await db.add_doc_bundle(doc_id=1, created_at="x", matches=[("regex", "p", 1.0, "s")], tables=[table])
+    assert len(await db.query_matches_for_doc(1)) == 1
+    assert len(await db.query_tables_for_doc(1)) == 1
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_export_flagged_json_groups_children_per_document(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    ids = []
+    for i in range(3):
+        ids.append(
+            await db.add_document(
+                url=f"u{i}",
+                final_url=f"u{i}",
+                title=f"t{i}",
+                content_type="application/pdf",
+                file_size=None,
+                sha256=str(i) * 64,
+                local_path=f"/tmp/{i}",
+                fetched_at=f"2020-01-0{i + 1}T00:00:00Z",
+            )
+        )
+    a, b, _unflagged = ids
+    await db.add_matches(doc_id=a, matches=[("regex", "p", 0.5, "s1"), ("regex", "q", 2.0, "s2")], created_at="x")
+    await db.add_matches(doc_id=b, matches=[("fuzzy", "r", 1.0, "s3")], created_at="x")
+    await db.add_tables(doc_id=a, tables=[{"page_no": 1, "table_index": 0, "format": "rows", "data": [["a"]]}], created_at="x")
+    await db.add_page_flags(doc_id=b, flags=[{"page_no": 2, "flag": "redaction", "score": 0.4}], created_at="x")
+    await db.set_review_status(doc_id=b, status="reviewed", updated_at="y")
+
+    exported = {d["doc_id"]: d for d in await db.export_flagged_json()}
+    assert set(exported) == {a, b}
+    for doc_id, d in exported.items():
+        assert d["matches"] == await db.query_matches_for_doc(doc_id)
+        assert d["tables"] == await db.query_tables_for_doc(doc_id)
+        assert d["entities"] == await db.query_entities_for_doc(doc_id)
+        assert d["redactions"] == await db.query_page_flags_for_doc(doc_id=doc_id, flag="redaction")
+    assert [m["pattern"] for m in exported[a]["matches"]] == ["q", "p"]
+    assert exported[b]["redactions"][0]["page_no"] == 2
+    assert (exported[a]["review_status"], exported[b]["review_status"]) == ("new", "reviewed")
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_feedback_centroid_round_trips_as_float32_array(tmp_db_path) -> None:
+    from array import array
+
+    from doj_disclosures.core.feedback import _update_centroid
+
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    first = _update_centroid(None, [1.0, 0.0, 0.1])
+    await db.set_feedback_centroid(label="high_value", model_name="m", centroid=first)
+    loaded = await db.get_feedback_centroid(label="high_value", model_name="m")
+    assert loaded == first
+    assert isinstance(loaded.vec, array) and loaded.vec.typecode == "f"
+
+    second = _update_centroid(loaded, [0.0, 1.0, 0.1])
+    assert second.count == 2
+    assert list(second.vec) == pytest.approx([0.5, 0.5, 0.1])
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_kv_get_many_returns_only_set_keys(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.kv_set("a", "1")
+    await db.kv_set("b", "2")
+    assert await db.kv_get_many(["a", "b", "missing"]) == {"a": "1", "b": "2"}
+    assert await db.kv_get_many([]) == {}
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_fts_content_can_truncate_in_sqlite(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.add_fts_content(doc_id=7, url="u", title="t", content="héllo world")
+    assert await db.get_fts_content(doc_id=7) == "héllo world"
+    assert await db.get_fts_content(doc_id=7, max_chars=5) == "héllo"
+    assert await db.get_fts_content(doc_id=8, max_chars=5) is None
+    await db.aclose()
@@ -29,6 +29,9 @@ async def test_resumable_download(tmp_path: Path) -> None:
             d = Downloader(settings=settings, session=s, output_dir=tmp_path, pause_event=pause, stop_event=stop)
             r1 = await d.download(url, title="file.txt")
             assert r1.local_path.read_bytes().startswith(body1)
+            assert (tmp_path / ".parts").is_dir()
+            await d.aclose()
+            assert not (tmp_path / ".parts").exists()
 
     part = tmp_path / ".parts" / "file.txt.part"
     part.parent.mkdir(parents=True, exist_ok=True)
@@ -39,6 +42,7 @@ async def test_resumable_download(tmp_path: Path) -> None:
             d = Downloader(settings=settings, session=s, output_dir=tmp_path, pause_event=pause, stop_event=stop)
             r2 = await d.download(url, title="file.txt")
             assert r2.local_path.read_bytes() == body1 + body2
+            assert r2.sha256 == hashlib.sha256(body1 + body2).hexdigest()
 
 
 @pytest.mark.asyncio
@@ -66,6 +70,24 @@ async def test_hashed_storage_layout_places_file_under_sha_prefix_dirs(tmp_path:
             assert rel.name == f"{sha}.txt"
 
 
+@pytest.mark.asyncio
+async def test_large_download_is_hashed_and_written_in_order(tmp_path: Path) -> None:
+    pause = asyncio.Event(); pause.set()
+    stop = asyncio.Event()
+    settings = CrawlSettings()
+
+    url = "https://example.com/big.bin"
+    body = bytes(range(256)) * (11 * 4096 + 7)  # spans several flush buffers plus a tail
+
+    with aioresponses() as m:
+        m.get(url, status=200, body=body, headers={"Content-Type": "application/octet-stream"})
+        async with aiohttp.ClientSession() as s:
+            d = Downloader(settings=settings, session=s, output_dir=tmp_path, pause_event=pause, stop_event=stop)
+            r = await d.download(url, title="big.bin")
+            assert r.local_path.read_bytes() == body
+            assert r.sha256 == hashlib.sha256(body).hexdigest()
+
+
 @pytest.mark.asyncio
 async def test_age_verify_opt_in_retries_and_downloads_pdf(tmp_path: Path) -> None:
     pause = asyncio.Event(); pause.set()
@@ -121,3 +143,74 @@ async def test_conditional_get_304_not_modified(tmp_path: Path) -> None:
             d = Downloader(settings=settings, session=s, output_dir=tmp_path, pause_event=pause, stop_event=stop)
             with pytest.raises(NotModifiedError):
                 await d.download(url, title="file.pdf", cache_headers={"If-None-Match": '"abc"'})
+
+
+@pytest.mark.asyncio
+async def test_non_pdf_body_is_rejected_without_downloading_the_rest(tmp_path: Path) -> None:
+    pause = asyncio.Event(); pause.set()
+    stop = asyncio.Event()
+    settings = CrawlSettings(max_retries=0)
+
+    url = "https://example.com/files/report.pdf"
+    body = b"<!doctype html><html><body>" + b"x" * (2 * 1024 * 1024) + b"</body></html>"
+
+    with aioresponses() as m:
+        m.get(url, status=200, body=body, headers={"Content-Type": "text/html"})
+        async with aiohttp.ClientSession() as s:
+            d = Downloader(settings=settings, session=s, output_dir=tmp_path, pause_event=pause, stop_event=stop)
+            with pytest.raises(RuntimeError, match=r"Expected PDF"):
+                await d.download(url, title="report.pdf")
+
+    diag = tmp_path / "report.pdf.not_pdf.html"
+    assert diag.read_bytes().startswith(b"<!doctype html>")
+    assert diag.stat().st_size < len(body)
+
+
+@pytest.mark.asyncio
+async def test_scratch_dir_holds_partial_downloads(tmp_path: Path) -> None:
+    pause = asyncio.Event(); pause.set()
+    stop = asyncio.Event()
+    scratch = tmp_path / "scratch"
+    out = tmp_path / "out"
+    settings = CrawlSettings(scratch_dir=str(scratch))
+
+    url = "https://example.com/file.txt"
+    body = b"scratch body"
+    with aioresponses() as m:
+        m.get(url, status=200, body=body, headers={"Content-Type": "text/plain"})
+        async with aiohttp.ClientSession() as s:
+            d = Downloader(settings=settings, session=s, output_dir=out, pause_event=pause, stop_event=stop)
+            r = await d.download(url, title="file.txt")
+            await d.aclose()
+
+    assert r.local_path == out / "file.txt"
+    assert r.local_path.read_bytes() == body
+    assert not (out / ".parts").exists()
+    assert scratch.is_dir() and not any(scratch.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_host_slot_wait_ends_on_stop_and_cancel_returns_slot(tmp_path: Path) -> None:
+    pause = asyncio.Event(); pause.set()
+    stop = asyncio.Event()
+    settings = CrawlSettings(requests_per_second=0.1)
+
+    async with aiohttp.ClientSession() as s:
+        d = Downloader(settings=settings, session=s, output_dir=tmp_path, pause_event=pause, stop_event=stop)
+        await d._await_host_slot("example.com")
+        first_free = d._host_throttle["example.com"].next_allowed_at
+
+        # A cancelled waiter gives its (still last) slot back.
+        waiter = asyncio.create_task(d._await_host_slot("example.com"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert d._host_throttle["example.com"].next_allowed_at == first_free
+
+        # A ~10 s wait for the next slot returns as soon as stop is set.
+        waiter = asyncio.create_task(d._await_host_slot("example.com"))
+        await asyncio.sleep(0.01)
+        stop.set()
+        await asyncio.wait_for(waiter, timeout=1.0)
+        await d.aclose()
@@ -48,6 +48,14 @@ async def test_store_and_query_entities(tmp_path: Path) -> None:
     assert got[0]["count"] == 2
     assert 1 in got[0]["page_nos"]
 
+    # Re-storing identical data leaves the row alone; a change rewrites it.
+    await db.add_entities(doc_id=doc_id, entities=entities, created_at="later")
+    assert (await db.query_entities_for_doc(doc_id))[0]["created_at"] == now
+    await db.add_entities(doc_id=doc_id, entities=[{**entities[0], "count": 3}], created_at="later")
+    got = await db.query_entities_for_doc(doc_id)
+    assert (got[0]["count"], got[0]["created_at"]) == (3, "later")
+    await db.aclose()
+
 
 def test_schema_contains_doc_entities(tmp_path: Path) -> None:
     db_path = tmp_path / "state.sqlite3"
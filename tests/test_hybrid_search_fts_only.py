@@ -7,6 +7,15 @@ from pathlib import Path
 import pytest
 
 from doj_disclosures.core.db import Database
+from doj_disclosures.core.embedding_index import build_embeddings_for_text
+from doj_disclosures.core.embeddings import (
+    BatchingEmbeddingProvider,
+    blob_to_vector,
+    cosine_similarity,
+    int8_blobs_from_array,
+    vector_to_blob,
+    vector_to_int8_blob,
+)
 from doj_disclosures.core.hybrid_search import HybridSearcher
 
 
@@ -33,3 +42,262 @@ async def test_hybrid_search_falls_back_to_fts_only(tmp_path: Path) -> None:
     rows = await searcher.search("hello", limit=10)
     assert rows
     assert rows[0]["doc_id"] == doc_id
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_embeddings_round_trip_as_int8(tmp_path: Path) -> None:
+    db = Database(path=tmp_path / "state.sqlite3")
+    db.initialize_sync()
+
+    vec = [0.5, -0.25, 0.0, 1.0]
+    blob, scale, norm = vector_to_int8_blob(vec)
+    assert len(blob) == len(vec)
+    await db.add_embeddings(
+        doc_id=1,
+        embeddings=[{"chunk_index": 0, "model_name": "m", "vector": blob, "scale": scale, "norm": norm}],
+        created_at="2024-01-01T00:00:00+00:00",
+    )
+    (row,) = await db.query_embeddings_for_doc(doc_id=1, model_name="m")
+    decoded = blob_to_vector(row["vector"], scale=row["scale"])
+    assert decoded == pytest.approx(vec, abs=1.0 / 127)
+    assert cosine_similarity(decoded, row["norm"], vec, norm) == pytest.approx(1.0, abs=1e-2)
+    await db.aclose()
+
+
+def test_int8_blobs_from_array_matches_per_vector_quantization() -> None:
+    np = pytest.importorskip("numpy")
+    vecs = np.array([[0.5, -0.25, 0.0, 1.0], [0.0, 0.0, 0.0, 0.0], [-3.0, 1.5, 2.25, 0.1]], dtype=np.float32)
+
+    batched = int8_blobs_from_array(vecs)
+    for row, (blob, scale, norm) in zip(vecs.tolist(), batched):
+        want_blob, want_scale, want_norm = vector_to_int8_blob(row)
+        assert blob == want_blob
+        assert (scale, norm) == pytest.approx((want_scale, want_norm))
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_packed_per_document_and_model(tmp_path: Path) -> None:
+    db = Database(path=tmp_path / "state.sqlite3")
+    db.initialize_sync()
+
+    chunks = []
+    for i, vec in enumerate(([1.0, 0.0, 0.5], [0.0, 2.0, -1.0])):
+        blob, norm = vector_to_blob(vec)
+        chunks.append({"chunk_index": i, "start_offset": i * 10, "model_name": "m", "vector": blob, "norm": norm})
+    await db.add_embeddings(doc_id=1, embeddings=chunks, created_at="2024-01-01T00:00:00+00:00")
+
+    rows = await db.query_embeddings_for_doc(doc_id=1, model_name="m")
+    assert [(r["chunk_index"], r["start_offset"], r["end_offset"], r["scale"]) for r in rows] == [
+        (0, 0, None, None),
+        (1, 10, None, None),
+    ]
+    assert blob_to_vector(rows[1]["vector"]) == [0.0, 2.0, -1.0]
+    conn = sqlite3.connect(db.path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM doc_embeddings_packed").fetchone() == (1,)
+        assert conn.execute("SELECT COUNT(*) FROM doc_embeddings").fetchone() == (0,)
+    finally:
+        conn.close()
+    await db.aclose()
+
+
+def test_build_embeddings_for_text_honours_quant() -> None:
+    class _Provider:
+        model_name = "fake"
+
+        def embed(self, texts: list[str]) -> list[list[float]]:
+            return [[1.0, -0.5, 0.25] for _ in texts]
+
+    int8 = build_embeddings_for_text("some text", provider=_Provider())
+    fp32 = build_embeddings_for_text("some text", provider=_Provider(), quant="fp32")
+    assert len(int8[0]["vector"]) == 3 and int8[0]["scale"] is not None
+    assert fp32[0]["scale"] is None
+    assert blob_to_vector(fp32[0]["vector"]) == [1.0, -0.5, 0.25]
+
+
+@pytest.mark.asyncio
+async def test_query_embeddings_for_docs_matches_per_doc_reads(tmp_path: Path) -> None:
+    db = Database(path=tmp_path / "state.sqlite3")
+    db.initialize_sync()
+
+    b1, s1, n1 = vector_to_int8_blob([1.0, 0.0])
+    f1, fn1 = vector_to_blob([0.0, 1.0])
+    # Doc 1 packs; doc 2 mixes int8/float32 chunks and falls back to legacy rows.
+    await db.add_embeddings(
+        doc_id=1,
+        embeddings=[{"chunk_index": 0, "model_name": "m", "vector": b1, "scale": s1, "norm": n1}],
+        created_at="x",
+    )
+    await db.add_embeddings(
+        doc_id=2,
+        embeddings=[
+            {"chunk_index": 0, "model_name": "m", "vector": b1, "scale": s1, "norm": n1},
+            {"chunk_index": 1, "model_name": "m", "vector": f1, "norm": fn1},
+        ],
+        created_at="x",
+    )
+
+    got = await db.query_embeddings_for_docs(doc_ids=[1, 2, 3], model_name="m")
+    assert set(got) == {1, 2}
+    for doc_id in (1, 2):
+        assert got[doc_id] == await db.query_embeddings_for_doc(doc_id=doc_id, model_name="m")
+    assert await db.query_embeddings_for_docs(doc_ids=[], model_name="m") == {}
+    await db.aclose()
+
+
+def test_cosine_similarity_without_cached_norms() -> None:
+    a, b = [1.0, 2.0, 3.0], [-1.0, 0.5, 2.0]
+    _blob, na = vector_to_blob(a)
+    _blob, nb = vector_to_blob(b)
+    want = cosine_similarity(a, na, b, nb)
+    assert cosine_similarity(a, None, b, None) == pytest.approx(want)
+    assert cosine_similarity(a, na, b, None) == pytest.approx(want)
+    assert cosine_similarity([0.0, 0.0], None, b, None) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_reuses_query_embeddings(tmp_path: Path) -> None:
+    db = Database(path=tmp_path / "state.sqlite3")
+    db.initialize_sync()
+    doc_id = await db.add_document(
+        url="https://example.com/a.txt",
+        final_url="https://example.com/a.txt",
+        title="Example A",
+        content_type="text/plain",
+        file_size=10,
+        sha256="2" * 64,
+        local_path=str(tmp_path / "a.txt"),
+        fetched_at="2024-01-01T00:00:00+00:00",
+    )
+    await db.add_fts_content(doc_id=doc_id, url="https://example.com/a.txt", title="Example A", content="hello world")
+    blob, scale, norm = vector_to_int8_blob([1.0, 0.0])
+    await db.add_embeddings(
+        doc_id=doc_id,
+        embeddings=[{"chunk_index": 0, "model_name": "fake", "vector": blob, "scale": scale, "norm": norm}],
+        created_at="x",
+    )
+
+    class _Provider:
+        model_name = "fake"
+        calls = 0
+
+        def embed(self, texts: list[str]) -> list[list[float]]:
+            _Provider.calls += 1
+            return [[1.0, 0.0] for _ in texts]
+
+    searcher = HybridSearcher(db=db, model_name="fake")
+    searcher._provider = _Provider()
+    first = await searcher.search("hello", limit=10)
+    second = await searcher.search("hello", limit=10)
+    assert _Provider.calls == 1
+    assert first == second
+    assert first[0]["semantic"] == pytest.approx(1.0, abs=1e-2)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_reuses_centroid_similarities_until_centroid_changes(tmp_path: Path) -> None:
+    from doj_disclosures.core.feedback import _update_centroid
+
+    db = Database(path=tmp_path / "state.sqlite3")
+    db.initialize_sync()
+    doc_id = await db.add_document(
+        url="https://example.com/a.txt",
+        final_url="https://example.com/a.txt",
+        title="Example A",
+        content_type="text/plain",
+        file_size=10,
+        sha256="2" * 64,
+        local_path=str(tmp_path / "a.txt"),
+        fetched_at="2024-01-01T00:00:00+00:00",
+    )
+    await db.add_fts_content(doc_id=doc_id, url="https://example.com/a.txt", title="Example A", content="hello world")
+    blob, scale, norm = vector_to_int8_blob([1.0, 0.0])
+    await db.add_embeddings(
+        doc_id=doc_id,
+        embeddings=[{"chunk_index": 0, "model_name": "fake", "vector": blob, "scale": scale, "norm": norm}],
+        created_at="x",
+    )
+    await db.set_feedback_centroid(label="high_value", model_name="fake", centroid=_update_centroid(None, [1.0, 0.0]))
+
+    class _Provider:
+        model_name = "fake"
+
+        def embed(self, texts: list[str]) -> list[list[float]]:
+            return [[0.0, 1.0] for _ in texts]
+
+    searcher = HybridSearcher(db=db, model_name="fake")
+    searcher._provider = _Provider()
+    first = await searcher.search("hello", limit=10)
+    assert first[0]["feedback_boost"] == pytest.approx(1.0, abs=1e-2)
+    assert dict(searcher._centroid_sims_cache["high_value"][1]) == {doc_id: ("x|1", pytest.approx(1.0, abs=1e-2))}
+
+    await db.set_feedback_centroid(label="high_value", model_name="fake", centroid=_update_centroid(None, [0.0, 1.0]))
+    second = await searcher.search("hello", limit=10)
+    assert second[0]["feedback_boost"] == pytest.approx(0.0, abs=1e-2)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_rescores_centroid_after_embeddings_rewritten(tmp_path: Path) -> None:
+    from doj_disclosures.core.feedback import _update_centroid
+
+    db = Database(path=tmp_path / "state.sqlite3")
+    db.initialize_sync()
+    doc_id = await db.add_document(
+        url="https://example.com/a.txt",
+        final_url="https://example.com/a.txt",
+        title="Example A",
+        content_type="text/plain",
+        file_size=10,
+        sha256="3" * 64,
+        local_path=str(tmp_path / "a.txt"),
+        fetched_at="2024-01-01T00:00:00+00:00",
+    )
+    await db.add_fts_content(doc_id=doc_id, url="https://example.com/a.txt", title="Example A", content="hello world")
+
+    async def _embed(vec: list[float], created_at: str) -> None:
+        blob, scale, norm = vector_to_int8_blob(vec)
+        await db.add_embeddings(
+            doc_id=doc_id,
+            embeddings=[{"chunk_index": 0, "model_name": "fake", "vector": blob, "scale": scale, "norm": norm}],
+            created_at=created_at,
+        )
+
+    await _embed([1.0, 0.0], "2024-01-01T00:00:00+00:00")
+    await db.set_feedback_centroid(label="high_value", model_name="fake", centroid=_update_centroid(None, [1.0, 0.0]))
+
+    class _Provider:
+        model_name = "fake"
+
+        def embed(self, texts: list[str]) -> list[list[float]]:
+            return [[0.0, 1.0] for _ in texts]
+
+    searcher = HybridSearcher(db=db, model_name="fake")
+    searcher._provider = _Provider()
+    first = await searcher.search("hello", limit=10)
+    assert first[0]["feedback_boost"] == pytest.approx(1.0, abs=1e-2)
+
+    await _embed([0.0, 1.0], "2024-01-02T00:00:00+00:00")
+    second = await searcher.search("hello", limit=10)
+    assert second[0]["feedback_boost"] == pytest.approx(0.0, abs=1e-2)
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batching_provider_coalesces_concurrent_embeds() -> None:
+    import asyncio
+
+    class _Provider:
+        model_name = "fake"
+        batches: list[list[str]] = []
+
+        def embed(self, texts: list[str]) -> list[list[float]]:
+            _Provider.batches.append(list(texts))
+            return [[float(len(t))] for t in texts]
+
+    batching = BatchingEmbeddingProvider(_Provider(), max_batch=3, max_wait_ms=50)
+    vecs = await asyncio.gather(*(batching.aembed("x" * n) for n in range(1, 6)))
+    assert vecs == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert [len(b) for b in _Provider.batches] == [3, 2]
@@ -43,3 +43,4 @@ async def test_end_to_end_mocked(tmp_path: Path, tmp_db_path: Path) -> None:
             matcher = KeywordMatcher(keywords=["flight log"], fuzzy_enabled=False)
             hits = matcher.match(parsed.text)
             assert hits
+    await db.aclose()
@@ -42,3 +42,9 @@ def test_phrase_matches_across_whitespace_and_near_is_phrase_aware() -> None:
     text2 = "flight log " + ("x " * 50) + "minor victim"
     hits2 = m.match(text2)
     assert not any(h.method == "query" for h in hits2)
+
+
+def test_literal_prefilter_keeps_case_insensitive_matches() -> None:
+    m = KeywordMatcher(keywords=["Flight Log", "İstanbul", "absent phrase"], fuzzy_enabled=False)
+    hits = m.match("FLIGHT\n  log entries from istanbul.")
+    assert {h.pattern for h in hits} == {"Flight Log", "İstanbul"}
@@ -33,3 +33,66 @@ def test_regex_ner_extracts_and_dedupes() -> None:
 
 def test_person_canonicalization_strips_honorific() -> None:
     assert canonicalize_entity("Dr. John Smith", label="PERSON") == "john smith"
+
+
+def test_spacy_model_is_loaded_once_without_unused_pipes(monkeypatch) -> None:
+    import sys
+    import types
+
+    from doj_disclosures.core import ner
+
+    loads: list[tuple[str, list[str]]] = []
+
+    class _Ent:
+        label_ = "person"
+        text = "John Smith"
+        start_char = 10
+        end_char = 20
+
+    def load(model: str, exclude: list[str]):
+        loads.append((model, exclude))
+        return lambda text: types.SimpleNamespace(ents=[_Ent()])
+
+    monkeypatch.setitem(sys.modules, "spacy", types.SimpleNamespace(load=load))
+    ner._load_spacy.cache_clear()
+    try:
+        for _ in range(3):
+            ents = extract_entities("[PAGE 2] John Smith met", engine="spacy", spacy_model="fake_model")
+            assert [(e["label"], e["canonical"], e["page_nos"]) for e in ents] == [("PERSON", "john smith", [2])]
+    finally:
+        ner._load_spacy.cache_clear()
+    assert len(loads) == 1
+    assert loads[0][0] == "fake_model" and "parser" in loads[0][1] and "ner" not in loads[0][1]
+
+
+def test_shared_spacy_pipeline_is_not_run_concurrently(monkeypatch) -> None:
+    import sys
+    import threading
+    import time
+    import types
+    from concurrent.futures import ThreadPoolExecutor
+
+    from doj_disclosures.core import ner
+
+    active = 0
+    peak = 0
+    guard = threading.Lock()
+
+    def nlp(text: str):
+        nonlocal active, peak
+        with guard:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with guard:
+            active -= 1
+        return types.SimpleNamespace(ents=[])
+
+    monkeypatch.setitem(sys.modules, "spacy", types.SimpleNamespace(load=lambda model, exclude: nlp))
+    ner._load_spacy.cache_clear()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _i: extract_entities("text", engine="spacy", spacy_model="fake_model"), range(8)))
+    finally:
+        ner._load_spacy.cache_clear()
+    assert peak == 1
@@ -44,3 +44,22 @@ async def test_pending_queue_prioritizes_pages_over_docs(tmp_db_path) -> None:
     assert "https://example.com/a.pdf" in urls
     # page should come before pdf
     assert urls.index("https://example.com/start?page=1") < urls.index("https://example.com/a.pdf")
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_urls_hands_out_each_url_once(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    await db.upsert_urls(urls=["https://example.com/a.pdf"], status="queued", discovered_at=1)
+    await db.upsert_urls(urls=["https://example.com/p2", "https://example.com/p1"], status="queued", discovered_at=2)
+
+    first = [u for u, _ct in await db.claim_pending_urls(limit=2, claimed_at=10)]
+    assert first == ["https://example.com/p2", "https://example.com/p1"]
+    second = [u for u, _ct in await db.claim_pending_urls(limit=10, claimed_at=11)]
+    assert second == ["https://example.com/a.pdf"]
+    assert await db.get_pending_urls(limit=10) == []
+
+    await db.release_claimed_urls(urls=["https://example.com/p1"])
+    assert [u for u, _ct in await db.get_pending_urls(limit=10)] == ["https://example.com/p1"]
+    await db.aclose()
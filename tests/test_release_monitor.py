@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+from doj_disclosures.core.db import Database
+from doj_disclosures.core.release_monitor import compute_release_diff, load_last_diff, store_snapshot_and_diff
+
+
+def test_compute_release_diff_accepts_iterables() -> None:
+    prev = [{"url": "a", "sha256": "1"}, {"url": "b", "sha256": "2"}]
+    cur = iter([{"url": "a", "sha256": "1"}, {"url": "b", "sha256": "3"}, {"url": "c", "sha256": "4"}])
+    diff = compute_release_diff(prev, cur)
+    assert [r["url"] for r in diff.added] == ["c"]
+    assert [c["url"] for c in diff.changed] == ["b"]
+    assert diff.removed == []
+
+
+@pytest.mark.asyncio
+async def test_store_snapshot_and_diff_reports_added_changed_and_removed(tmp_db_path) -> None:
+    db = Database(tmp_db_path)
+    db.initialize_sync()
+    urls = ["https://x/keep.pdf", "https://x/change.pdf", "https://x/gone.pdf"]
+    await db.upsert_urls(urls=urls, status="queued", discovered_at=1)
+    for url in urls:
+        await db.update_url_attempt(url=url, status="done", last_attempt_at=2, http_status=200, error=None, sha256="a" * 64)
+
+    first = await store_snapshot_and_diff(db)
+    assert sorted(r["url"] for r in first.added) == sorted(urls)
+    assert first.changed == [] and first.removed == []
+
+    await db.upsert_urls(urls=["https://x/new.pdf"], status="queued", discovered_at=3)
+    await db.update_url_attempt(
+        url="https://x/change.pdf", status="done", last_attempt_at=4, http_status=200, error=None, sha256="b" * 64
+    )
+    await db.update_url_attempt(url="https://x/gone.pdf", status="abandoned", last_attempt_at=4, http_status=404, error="gone")
+
+    second = await store_snapshot_and_diff(db)
+    assert [r["url"] for r in second.added] == ["https://x/new.pdf"]
+    assert [c["url"] for c in second.changed] == ["https://x/change.pdf"]
+    assert second.changed[0]["before"]["sha256"] == "a" * 64
+    assert second.changed[0]["after"]["sha256"] == "b" * 64
+    assert [r["url"] for r in second.removed] == ["https://x/gone.pdf"]
+
+    last = await load_last_diff(db)
+    assert last is not None and [r["url"] for r in last["removed"]] == ["https://x/gone.pdf"]
+    await db.aclose()
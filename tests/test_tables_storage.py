@@ -48,6 +48,7 @@ async def test_store_and_query_tables(tmp_path: Path) -> None:
     assert got[0]["format"] == "rows"
     assert got[0]["data"][0][0] == "A1"
     assert got[0]["bbox"][2] == 100.0
+    await db.aclose()
 
 
 def test_schema_contains_doc_tables(tmp_path: Path) -> None:
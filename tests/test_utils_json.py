@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from doj_disclosures.core import utils
+
+
+def test_json_dumps_fallback_matches_orjson_format(monkeypatch) -> None:
+    obj = {"b": [1, 2.5, None], "a": "café", "c": {"x": True}}
+    fast = utils.json_dumps(obj, sort_keys=True)
+    monkeypatch.setattr(utils, "orjson", None)
+    assert utils.json_dumps(obj, sort_keys=True) == fast == '{"a":"café","b":[1,2.5,null],"c":{"x":true}}'